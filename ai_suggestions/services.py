@@ -0,0 +1,447 @@
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, List, Optional, Union
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class SuggestionCache:
+    """
+    Cache for generated AI suggestions, kept in the Django cache.
+
+    Entries are keyed by a hash of the normalized trailing context window
+    together with the user role, meeting type and language, so repeated
+    requests for the same conversation state reuse the previous result
+    instead of calling the LLM again. Every key also holds the meeting's
+    version, stored under its own key: invalidate_meeting increments it, so
+    with CACHE_REDIS_URL set a new transcript saved by any process hides the
+    meeting's entries from all of them, and the stale entries expire after
+    ttl_seconds.
+    """
+
+    KEY_PREFIX = 'suggestion:'
+
+    def __init__(self, ttl_seconds: Optional[int] = None, context_lines: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else getattr(
+            settings, 'SUGGESTION_CACHE_TTL_SECONDS', 300)
+        self.context_lines = context_lines if context_lines is not None else getattr(
+            settings, 'SUGGESTION_CACHE_CONTEXT_LINES', 5)
+
+        self.lock = threading.Lock()
+
+        # Metrics for monitoring (this process)
+        self.metrics = {
+            'hits': 0,
+            'misses': 0,
+            'invalidations': 0,
+        }
+
+    def make_key(self, context: Union[str, List[Dict], None], user_role: str,
+                 meeting_type: str, language: str) -> str:
+        """
+        Build the cache key for a suggestion request.
+
+        Args:
+            context: Conversation context, either as text or as a list of transcript entries
+            user_role: Role of the user (interviewer, interviewee, etc.)
+            meeting_type: Type of meeting (interview, meeting, etc.)
+            language: Language the suggestions are generated in
+
+        Returns:
+            Hex digest identifying the request
+        """
+        window = self._normalize_context(context)
+        raw = "\x1f".join([window, user_role or '', meeting_type or '', language or ''])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, meeting_id, key: str) -> Optional[List[str]]:
+        """
+        Get cached suggestions for a meeting.
+
+        Args:
+            meeting_id: ID of the meeting
+            key: Key returned by make_key
+
+        Returns:
+            List of suggestions or None on a miss
+        """
+        version = cache.get(self._version_key(meeting_id))
+        suggestions = cache.get(self._entry_key(meeting_id, version, key)) if version is not None else None
+
+        with self.lock:
+            self.metrics['misses' if suggestions is None else 'hits'] += 1
+        return suggestions
+
+    def set(self, meeting_id, key: str, suggestions: List[str]) -> None:
+        """
+        Store suggestions for a meeting.
+
+        Args:
+            meeting_id: ID of the meeting
+            key: Key returned by make_key
+            suggestions: Generated suggestions
+        """
+        version_key = self._version_key(meeting_id)
+        # A new version starts from the clock, so it never reuses the number of an expired one
+        cache.add(version_key, time.time_ns(), timeout=self.ttl_seconds)
+        version = cache.get(version_key)
+        if version is None:
+            return
+
+        cache.set(self._entry_key(meeting_id, version, key), list(suggestions), timeout=self.ttl_seconds)
+        # The version lives at least as long as the entries stored under it
+        cache.touch(version_key, timeout=self.ttl_seconds)
+
+    def invalidate_meeting(self, meeting_id) -> None:
+        """
+        Drop all cached suggestions for a meeting (e.g. when new transcript lines arrive).
+
+        Args:
+            meeting_id: ID of the meeting
+        """
+        try:
+            cache.incr(self._version_key(meeting_id))
+        except ValueError:
+            # No version: nothing is cached for the meeting
+            return
+        with self.lock:
+            self.metrics['invalidations'] += 1
+
+    def get_metrics(self) -> Dict:
+        """
+        Get cache metrics.
+
+        Returns:
+            Dictionary with cache metrics
+        """
+        with self.lock:
+            lookups = self.metrics['hits'] + self.metrics['misses']
+            return {
+                'hits': self.metrics['hits'],
+                'misses': self.metrics['misses'],
+                'invalidations': self.metrics['invalidations'],
+                'hit_ratio': self.metrics['hits'] / max(1, lookups),
+            }
+
+    def _version_key(self, meeting_id) -> str:
+        return f"{self.KEY_PREFIX}version:{meeting_id}"
+
+    def _entry_key(self, meeting_id, version: int, key: str) -> str:
+        return f"{self.KEY_PREFIX}{meeting_id}:{version}:{key}"
+
+    def _normalize_context(self, context: Union[str, List[Dict], None]) -> str:
+        """
+        Reduce the context to its trailing window in a canonical form.
+
+        Args:
+            context: Conversation context, either as text or as a list of transcript entries
+
+        Returns:
+            Normalized text of the last context lines
+        """
+        if not context:
+            return ''
+
+        if isinstance(context, str):
+            lines = context.splitlines()
+        else:
+            lines = [
+                f"{item.get('participant_name', 'Unknown')}: {item.get('text', item.get('original_text', ''))}"
+                for item in context
+            ]
+
+        lines = [re.sub(r'\s+', ' ', line).strip().lower() for line in lines]
+        lines = [line for line in lines if line]
+
+        return "\n".join(lines[-self.context_lines:])
+
+
+# Initialize a singleton instance
+suggestion_cache = SuggestionCache()
+
+
+class SuggestionJobLimiter:
+    """
+    Caps the number of suggestion jobs running concurrently in one meeting.
+
+    Jobs over the limit wait for a free slot; semaphores are created on first
+    use and dropped once no job of the meeting is running or waiting.
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = None):
+        self.max_concurrent = max_concurrent if max_concurrent is not None else getattr(
+            settings, 'SUGGESTION_MAX_CONCURRENT_PER_MEETING', 2)
+
+        self.meetings = {}  # meeting_id -> {'semaphore', 'waiting', 'running'}
+
+        # Metrics for monitoring
+        self.metrics = {
+            'jobs_started': 0,
+            'jobs_delayed': 0,
+        }
+
+    @asynccontextmanager
+    async def slot(self, meeting_id):
+        """
+        Wait for a free job slot in a meeting and hold it for the duration of the block.
+
+        Args:
+            meeting_id: ID of the meeting
+        """
+        key = str(meeting_id)
+        state = self.meetings.get(key)
+        if state is None:
+            state = self.meetings[key] = {
+                'semaphore': asyncio.Semaphore(self.max_concurrent),
+                'waiting': 0,
+                'running': 0,
+            }
+
+        if state['semaphore'].locked():
+            self.metrics['jobs_delayed'] += 1
+
+        state['waiting'] += 1
+        try:
+            await state['semaphore'].acquire()
+        except asyncio.CancelledError:
+            state['waiting'] -= 1
+            self._release_state(key, state)
+            raise
+        state['waiting'] -= 1
+
+        state['running'] += 1
+        self.metrics['jobs_started'] += 1
+        try:
+            yield
+        finally:
+            state['running'] -= 1
+            state['semaphore'].release()
+            self._release_state(key, state)
+
+    def _release_state(self, key: str, state: Dict) -> None:
+        """Drop the semaphore of a meeting once it has no running or waiting jobs."""
+        if state['running'] == 0 and state['waiting'] == 0 and self.meetings.get(key) is state:
+            del self.meetings[key]
+
+    def get_metrics(self) -> Dict:
+        """
+        Get limiter metrics.
+
+        Returns:
+            Dictionary with limiter metrics
+        """
+        return {
+            'jobs_started': self.metrics['jobs_started'],
+            'jobs_delayed': self.metrics['jobs_delayed'],
+            'running': sum(state['running'] for state in self.meetings.values()),
+            'waiting': sum(state['waiting'] for state in self.meetings.values()),
+        }
+
+
+# Initialize a singleton instance
+suggestion_job_limiter = SuggestionJobLimiter()
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (about 4 characters per token for LLM tokenizers).
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated number of tokens
+    """
+    return max(1, len(text) // 4) if text else 0
+
+
+class ConversationContextWindow:
+    """
+    Rolling conversation context for one meeting.
+
+    Recent turns are kept verbatim up to a token budget. When the budget is
+    exceeded, the oldest turns are folded into a compressed summary (first
+    sentence of each turn), which is itself capped, so the prompt built from
+    the window stays bounded however long the meeting runs.
+    """
+
+    SUMMARY_WORDS_PER_TURN = 20
+
+    def __init__(self, token_budget: int, summary_token_budget: int):
+        self.token_budget = token_budget
+        self.summary_token_budget = summary_token_budget
+
+        self.turns = deque()  # (speaker, text, tokens)
+        self.turn_tokens = 0
+        self.summary = deque()  # compressed lines of folded turns
+        self.summary_tokens = 0
+
+    def append(self, speaker: str, text: str) -> None:
+        """
+        Add a turn to the window.
+
+        Args:
+            speaker: Name of the participant who spoke
+            text: Text of the turn
+        """
+        text = re.sub(r'\s+', ' ', text or '').strip()
+        if not text:
+            return
+
+        tokens = estimate_tokens(f"{speaker}: {text}")
+        self.turns.append((speaker, text, tokens))
+        self.turn_tokens += tokens
+
+        if self.turn_tokens > self.token_budget:
+            self._fold()
+
+    def render(self) -> str:
+        """
+        Build the context text used in suggestion prompts.
+
+        Returns:
+            Summary of older turns followed by the recent turns
+        """
+        lines = []
+        if self.summary:
+            lines.append("Rezumat: " + " ".join(self.summary))
+        lines.extend(f"{speaker}: {text}" for speaker, text, _ in self.turns)
+        return "\n".join(lines)
+
+    def _fold(self) -> None:
+        """Fold the oldest turns into the summary until the window is at 3/4 of its budget."""
+        # Folding below the budget means it runs once per batch of turns, not on every append
+        target = self.token_budget * 3 // 4
+
+        while self.turns and self.turn_tokens > target and len(self.turns) > 1:
+            speaker, text, tokens = self.turns.popleft()
+            self.turn_tokens -= tokens
+
+            line = self._compress(speaker, text)
+            self.summary.append(line)
+            self.summary_tokens += estimate_tokens(line)
+
+        while self.summary and self.summary_tokens > self.summary_token_budget:
+            self.summary_tokens -= estimate_tokens(self.summary.popleft())
+
+    def to_state(self) -> Dict:
+        """State of the window as plain lists (stored in the cache)."""
+        return {'turns': [list(turn) for turn in self.turns], 'summary': list(self.summary)}
+
+    @classmethod
+    def from_state(cls, state: Optional[Dict], token_budget: int,
+                   summary_token_budget: int) -> 'ConversationContextWindow':
+        """Rebuild a window from to_state(); an empty window for None."""
+        window = cls(token_budget, summary_token_budget)
+        if state:
+            window.turns.extend(tuple(turn) for turn in state['turns'])
+            window.turn_tokens = sum(tokens for _, _, tokens in window.turns)
+            window.summary.extend(state['summary'])
+            window.summary_tokens = sum(estimate_tokens(line) for line in window.summary)
+        return window
+
+    def _compress(self, speaker: str, text: str) -> str:
+        """Reduce a turn to its first sentence, capped to a few words."""
+        sentence = re.split(r'(?<=[.!?])\s', text, maxsplit=1)[0]
+        words = sentence.split()
+        if len(words) > self.SUMMARY_WORDS_PER_TURN:
+            sentence = " ".join(words[:self.SUMMARY_WORDS_PER_TURN]) + "..."
+        return f"{speaker}: {sentence}"
+
+
+class ConversationContextStore:
+    """
+    Server-side conversation context of the meetings, kept in the Django cache.
+
+    Transcripts are appended as they are saved, so suggestion requests no
+    longer need the client to send the conversation over the socket. With
+    CACHE_REDIS_URL set the windows are shared by every process (consumers
+    and Celery workers); each append refreshes the timeout, so the window of
+    an abandoned meeting expires after idle_seconds without new turns.
+    Appends to one meeting are serialized with a short lock in the cache.
+    """
+
+    KEY_PREFIX = 'suggestion:context:'
+    LOCK_SECONDS = 2
+    LOCK_ATTEMPTS = 50
+
+    def __init__(self, token_budget: Optional[int] = None, summary_token_budget: Optional[int] = None,
+                 idle_seconds: Optional[int] = None):
+        self.token_budget = token_budget if token_budget is not None else getattr(
+            settings, 'SUGGESTION_CONTEXT_TOKEN_BUDGET', 800)
+        self.summary_token_budget = summary_token_budget if summary_token_budget is not None else getattr(
+            settings, 'SUGGESTION_SUMMARY_TOKEN_BUDGET', 200)
+        self.idle_seconds = idle_seconds if idle_seconds is not None else getattr(
+            settings, 'SUGGESTION_CONTEXT_IDLE_SECONDS', 3600)
+
+        self.lock = threading.Lock()
+
+    def append(self, meeting_id, speaker: str, text: str) -> None:
+        """
+        Add a turn to the context of a meeting.
+
+        Args:
+            meeting_id: ID of the meeting
+            speaker: Name of the participant who spoke
+            text: Text of the turn
+        """
+        key = self.KEY_PREFIX + str(meeting_id)
+        with self.lock, self._cache_lock(key):
+            window = ConversationContextWindow.from_state(cache.get(key), self.token_budget,
+                                                          self.summary_token_budget)
+            window.append(speaker, text)
+            cache.set(key, window.to_state(), timeout=self.idle_seconds)
+
+    def get_context(self, meeting_id) -> str:
+        """
+        Get the context text of a meeting.
+
+        Args:
+            meeting_id: ID of the meeting
+
+        Returns:
+            Context text, empty if nothing was recorded for the meeting
+        """
+        state = cache.get(self.KEY_PREFIX + str(meeting_id))
+        if state is None:
+            return ''
+        return ConversationContextWindow.from_state(state, self.token_budget, self.summary_token_budget).render()
+
+    def clear(self, meeting_id) -> None:
+        """
+        Drop the context of a meeting (e.g. when the session ends).
+
+        Args:
+            meeting_id: ID of the meeting
+        """
+        cache.delete(self.KEY_PREFIX + str(meeting_id))
+
+    @contextmanager
+    def _cache_lock(self, key: str):
+        lock_key = key + ':lock'
+        for _ in range(self.LOCK_ATTEMPTS):
+            if cache.add(lock_key, 1, timeout=self.LOCK_SECONDS):
+                break
+            time.sleep(0.01)
+        else:
+            # A crashed holder: its lock expires after LOCK_SECONDS, append without it
+            logger.warning(f"Conversation context lock {lock_key} busy, appending without it")
+            yield
+            return
+        try:
+            yield
+        finally:
+            cache.delete(lock_key)
+
+
+# Initialize a singleton instance
+conversation_context = ConversationContextStore()
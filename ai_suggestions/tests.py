@@ -1,3 +1,144 @@
-from django.test import TestCase
+import asyncio
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from ai_suggestions.services import (ConversationContextStore, ConversationContextWindow, SuggestionCache,
+                                     SuggestionJobLimiter, estimate_tokens)
+
+
+class SuggestionCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.cache = SuggestionCache(ttl_seconds=60, context_lines=2)
+        self.key = self.cache.make_key("Ana: Hello\nIon: Hi Ana", 'interviewee', 'interview', 'en')
+
+    def test_hit_for_the_same_conversation_state(self):
+        self.assertIsNone(self.cache.get(1, self.key))
+
+        self.cache.set(1, self.key, ["Ask about the role"])
+
+        # Older lines outside the window and whitespace do not change the key
+        key = self.cache.make_key("Old line\nAna:  hello\nIon: Hi Ana", 'interviewee', 'interview', 'en')
+        self.assertEqual(self.cache.get(1, key), ["Ask about the role"])
+        self.assertIsNone(self.cache.get(2, key))
+        self.assertEqual(self.cache.get_metrics()['hits'], 1)
+
+    def test_invalidation_reaches_other_processes(self):
+        # Two instances stand for two processes using the same cache
+        other = SuggestionCache(ttl_seconds=60, context_lines=2)
+        self.cache.set(1, self.key, ["Ask about the role"])
+        self.cache.set(2, self.key, ["Ask about the team"])
+
+        other.invalidate_meeting(1)
+
+        self.assertIsNone(self.cache.get(1, self.key))
+        self.assertEqual(self.cache.get(2, self.key), ["Ask about the team"])
+
+        self.cache.set(1, self.key, ["Ask about the salary"])
+        self.assertEqual(other.get(1, self.key), ["Ask about the salary"])
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.set(1, self.key, ["Ask about the role"])
+
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=time.time() + 61):
+            self.assertIsNone(self.cache.get(1, self.key))
+
+
+class SuggestionJobLimiterTests(SimpleTestCase):
+    async def hold(self, limiter, meeting_id, started, release):
+        async with limiter.slot(meeting_id):
+            started.append(meeting_id)
+            await release.wait()
+
+    async def test_jobs_over_the_limit_wait_for_a_slot(self):
+        limiter = SuggestionJobLimiter(max_concurrent=2)
+        started, release = [], asyncio.Event()
+
+        jobs = [asyncio.ensure_future(self.hold(limiter, 1, started, release)) for _ in range(3)]
+        other = asyncio.ensure_future(self.hold(limiter, 2, started, release))
+        await asyncio.sleep(0.01)
+
+        # Meeting 1 is capped at two jobs; other meetings have their own slots
+        self.assertEqual(sorted(started), [1, 1, 2])
+        self.assertEqual(limiter.get_metrics(), {'jobs_started': 3, 'jobs_delayed': 1, 'running': 3, 'waiting': 1})
+
+        release.set()
+        await asyncio.gather(*jobs, other)
+
+        self.assertEqual(sorted(started), [1, 1, 1, 2])
+        self.assertEqual(limiter.meetings, {})
+
+    async def test_cancelled_jobs_release_their_slot(self):
+        limiter = SuggestionJobLimiter(max_concurrent=1)
+        started, release = [], asyncio.Event()
+
+        running = asyncio.ensure_future(self.hold(limiter, 1, started, release))
+        waiting = asyncio.ensure_future(self.hold(limiter, 1, started, release))
+        await asyncio.sleep(0.01)
+
+        # A job cancelled while waiting leaves no waiter behind
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        self.assertEqual(limiter.get_metrics()['waiting'], 0)
+
+        # A job cancelled while running frees its slot for the next one
+        running.cancel()
+        await asyncio.gather(running, return_exceptions=True)
+        self.assertEqual(limiter.meetings, {})
+
+        release.set()
+        await asyncio.wait_for(self.hold(limiter, 1, started, release), timeout=1)
+        self.assertEqual(started, [1, 1])
+
+
+class ConversationContextStoreTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.store = ConversationContextStore(token_budget=60, summary_token_budget=20, idle_seconds=60)
+
+    def test_old_turns_are_folded_within_budget(self):
+        for turn in range(30):
+            self.store.append(1, "Ana", f"Turn {turn} is about the billing migration. More details follow here.")
+
+        state = cache.get(ConversationContextStore.KEY_PREFIX + '1')
+        window = ConversationContextWindow.from_state(state, 60, 20)
+        self.assertLessEqual(window.turn_tokens, 60)
+        self.assertLessEqual(window.summary_tokens, 20)
+        self.assertEqual(window.turn_tokens, sum(estimate_tokens(f"Ana: {text}") for _, text, _ in window.turns))
+
+        context = self.store.get_context(1)
+        self.assertTrue(context.startswith("Rezumat: Ana: Turn"))
+        self.assertTrue(context.endswith("Ana: Turn 29 is about the billing migration. More details follow here."))
+        self.assertNotIn("More details", context.splitlines()[0])
+
+    def test_context_is_shared_between_stores(self):
+        # Two instances stand for two processes using the same cache
+        other = ConversationContextStore(token_budget=60, summary_token_budget=20, idle_seconds=60)
+
+        self.store.append(1, "Ana", "Hello")
+        other.append(1, "Ion", "Hi Ana")
+
+        self.assertEqual(self.store.get_context(1), "Ana: Hello\nIon: Hi Ana")
+        self.assertEqual(other.get_context(2), '')
+
+    def test_idle_meetings_expire(self):
+        with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            self.store.append(1, "Ana", "Hello")
+        self.assertEqual(cache_set.call_args.kwargs['timeout'], 60)
+
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=10 ** 10):
+            self.assertEqual(self.store.get_context(1), '')
+
+    def test_clear_drops_the_meeting(self):
+        self.store.append(1, "Ana", "Hello")
+        self.store.append(2, "Ion", "Salut")
+
+        self.store.clear(1)
+
+        self.assertEqual(self.store.get_context(1), '')
+        self.assertEqual(self.store.get_context(2), "Ion: Salut")
@@ -0,0 +1,276 @@
+import contextlib
+import fcntl
+import json
+import logging
+import mmap
+import os
+import threading
+import zlib
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from meetings.models import Meeting, Transcript, Translation
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveRunInProgress(Exception):
+    """Another process is archiving meetings into the same directory."""
+
+
+class TranscriptArchive:
+    """
+    Append-only segment files holding the transcripts of archived meetings.
+
+    Each meeting is written as one zlib-compressed block of JSONL (one line
+    per transcript, translations included), appended to the current segment
+    file. The block's segment, offset and length are stored on the Meeting
+    row and in a sidecar .idx file, so a meeting is read back with a single
+    slice of the memory-mapped segment. Segments rotate once they reach
+    max_segment_bytes.
+
+    The directory must be storage shared by every host that serves
+    transcripts (a volume mounted on all web and worker hosts): a meeting
+    archived on one host is read on any other. Appends are serialized across
+    processes with an fcntl.flock on a lock file in the directory, and a
+    whole archiving run holds a second lock, so two runs never interleave.
+    """
+
+    SEGMENT_PREFIX = 'segment-'
+    SEGMENT_SUFFIX = '.jsonl.z'
+    INDEX_SUFFIX = '.idx'
+    WRITE_LOCK = 'append.lock'
+    RUN_LOCK = 'run.lock'
+
+    def __init__(self, directory: Optional[str] = None, max_segment_bytes: Optional[int] = None):
+        self.directory = directory or settings.TRANSCRIPT_ARCHIVE_DIR
+        self.max_segment_bytes = max_segment_bytes if max_segment_bytes is not None else (
+            settings.TRANSCRIPT_ARCHIVE_SEGMENT_MB * 1024 * 1024)
+
+        self.maps: Dict[str, Tuple[object, mmap.mmap]] = {}  # segment -> (file, mmap)
+        self.write_lock = threading.Lock()
+        self.map_lock = threading.Lock()
+
+    def write_meeting(self, meeting_id, records: List[Dict]) -> Tuple[str, int, int]:
+        """
+        Append the transcripts of a meeting to the current segment.
+
+        The block is flushed to disk before returning, so the database rows
+        can be deleted once the location is recorded.
+
+        Args:
+            meeting_id: ID of the meeting
+            records: Transcript dictionaries (see get_session_transcripts)
+
+        Returns:
+            Tuple (segment name, offset, length)
+        """
+        data = "".join(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n"
+                       for record in records)
+        block = zlib.compress(data.encode('utf-8'), 6)
+
+        with self.write_lock, self.file_lock(self.WRITE_LOCK):
+            segment = self._current_segment(len(block))
+            path = os.path.join(self.directory, segment)
+
+            with open(path, 'ab') as segment_file:
+                offset = segment_file.tell()
+                segment_file.write(block)
+                segment_file.flush()
+                os.fsync(segment_file.fileno())
+
+            with open(path[:-len(self.SEGMENT_SUFFIX)] + self.INDEX_SUFFIX, 'a', encoding='utf-8') as index_file:
+                index_file.write(json.dumps({'meeting_id': meeting_id, 'offset': offset,
+                                             'length': len(block), 'rows': len(records)}) + "\n")
+
+        return segment, offset, len(block)
+
+    def read_meeting(self, segment: str, offset: int, length: int) -> List[Dict]:
+        """
+        Read the transcripts of an archived meeting.
+
+        Args:
+            segment: Segment name stored on the meeting
+            offset: Offset of the meeting's block
+            length: Length of the block
+
+        Returns:
+            Transcript dictionaries in their original order
+        """
+        # Slice under the lock: another read may remap (and close) the segment once it grew
+        with self.map_lock:
+            block = self._map(segment, offset + length)[offset:offset + length]
+        data = zlib.decompress(block).decode('utf-8')
+        return [json.loads(line) for line in data.splitlines() if line]
+
+    @contextlib.contextmanager
+    def file_lock(self, name: str, blocking: bool = True):
+        """
+        Hold an exclusive fcntl.flock on a lock file of the archive directory.
+
+        Args:
+            name: Lock file name (WRITE_LOCK or RUN_LOCK)
+            blocking: Wait for the lock; otherwise raise BlockingIOError if it is held
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, name), 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        """Unmap all segments."""
+        with self.map_lock:
+            for segment_file, segment_map in self.maps.values():
+                segment_map.close()
+                segment_file.close()
+            self.maps = {}
+
+    def _map(self, segment: str, end: int) -> mmap.mmap:
+        if os.path.basename(segment) != segment or not segment.startswith(self.SEGMENT_PREFIX):
+            raise ValueError(f"Invalid archive segment: {segment}")
+
+        # Called with map_lock held
+        mapped = self.maps.get(segment)
+        if mapped is not None and len(mapped[1]) >= end:
+            return mapped[1]
+
+        # Not mapped yet, or the segment grew since it was mapped
+        if mapped is not None:
+            mapped[1].close()
+            mapped[0].close()
+        path = os.path.join(self.directory, segment)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Archive segment {segment} not found in {self.directory}: "
+                                    f"TRANSCRIPT_ARCHIVE_DIR must be shared by all hosts")
+        segment_file = open(path, 'rb')
+        segment_map = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.maps[segment] = (segment_file, segment_map)
+        return segment_map
+
+    def _current_segment(self, block_size: int) -> str:
+        segments = sorted(name for name in os.listdir(self.directory)
+                          if name.startswith(self.SEGMENT_PREFIX) and name.endswith(self.SEGMENT_SUFFIX))
+        if segments:
+            last = segments[-1]
+            if os.path.getsize(os.path.join(self.directory, last)) + block_size <= self.max_segment_bytes:
+                return last
+            number = int(last[len(self.SEGMENT_PREFIX):-len(self.SEGMENT_SUFFIX)]) + 1
+        else:
+            number = 1
+        return f"{self.SEGMENT_PREFIX}{number:06d}{self.SEGMENT_SUFFIX}"
+
+
+def transcript_records(meeting_id) -> List[Dict]:
+    """
+    Build the archive records of a meeting from the hot tables.
+
+    Args:
+        meeting_id: ID of the meeting
+
+    Returns:
+        Transcript dictionaries, in the format of get_session_transcripts
+    """
+    records = []
+    by_id = {}
+
+    transcripts = (Transcript.objects.filter(meeting_id=meeting_id).select_related('participant')
+                   .order_by('timestamp', 'id'))
+    for transcript in transcripts:
+        record = {
+            'id': transcript.id,
+            'participant_id': transcript.participant.id,
+            'participant_name': transcript.participant.name,
+            'original_text': transcript.original_text,
+            'original_language': transcript.source_language,
+            'timestamp': transcript.timestamp.isoformat(),
+            'translations': {}
+        }
+        records.append(record)
+        by_id[transcript.id] = record
+
+    for translation in Translation.objects.filter(transcript__meeting_id=meeting_id).order_by('id'):
+        by_id[translation.transcript_id]['translations'][translation.target_language] = {
+            'id': translation.id,
+            'text': translation.translated_text,
+            'timestamp': translation.timestamp.isoformat()
+        }
+
+    return records
+
+
+def archive_meeting(meeting: Meeting) -> int:
+    """
+    Move the transcripts of a completed meeting to the archive.
+
+    Args:
+        meeting: Meeting to archive
+
+    Returns:
+        Number of archived transcripts
+    """
+    records = transcript_records(meeting.id)
+    segment, offset, length = transcript_archive.write_meeting(meeting.id, records)
+
+    # The block is on disk: record its location and empty the hot tables in one transaction
+    with transaction.atomic():
+        Meeting.objects.filter(id=meeting.id).update(
+            archive_segment=segment, archive_offset=offset, archive_length=length,
+            archived_at=timezone.now())
+        Translation.objects.filter(transcript__meeting_id=meeting.id).delete()
+        Transcript.objects.filter(meeting_id=meeting.id).delete()
+
+    return len(records)
+
+
+def archive_completed_meetings(older_than_days: Optional[int] = None, limit: Optional[int] = None) -> List[Dict]:
+    """
+    Archive completed meetings that ended more than older_than_days ago.
+
+    Args:
+        older_than_days: Age threshold (default TRANSCRIPT_ARCHIVE_AFTER_DAYS)
+        limit: Maximum number of meetings archived in this run
+
+    Returns:
+        List of {'meeting_id', 'rows'} for the archived meetings
+
+    Raises:
+        ArchiveRunInProgress: If another run holds the archive
+    """
+    if older_than_days is None:
+        older_than_days = settings.TRANSCRIPT_ARCHIVE_AFTER_DAYS
+
+    try:
+        with transcript_archive.file_lock(TranscriptArchive.RUN_LOCK, blocking=False):
+            return _archive_completed_meetings(older_than_days, limit)
+    except BlockingIOError:
+        raise ArchiveRunInProgress(f"Another archiving run holds {transcript_archive.directory}")
+
+
+def _archive_completed_meetings(older_than_days: int, limit: Optional[int]) -> List[Dict]:
+
+    meetings = Meeting.objects.filter(
+        status='completed',
+        end_time__lt=timezone.now() - timedelta(days=older_than_days),
+        archived_at__isnull=True
+    ).order_by('end_time')
+    if limit:
+        meetings = meetings[:limit]
+
+    archived = []
+    for meeting in meetings:
+        try:
+            archived.append({'meeting_id': meeting.id, 'rows': archive_meeting(meeting)})
+        except Exception as e:
+            logger.error(f"Error archiving meeting {meeting.id}: {str(e)}")
+    return archived
+
+
+# Initialize a singleton instance
+transcript_archive = TranscriptArchive()
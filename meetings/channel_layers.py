@@ -0,0 +1,458 @@
+import asyncio
+import bisect
+import hashlib
+import logging
+import time
+from typing import Dict, List, Optional, Sequence, Set
+
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+from channels_redis.core import RedisChannelLayer
+
+from meetings.metrics import (
+    CHANNEL_LAYER_DELIVERIES, REDIS_SHARD_GROUPS, REDIS_SHARD_PING_SECONDS, REDIS_SHARD_UP,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class HybridChannelLayer(RedisChannelLayer):
+    """
+    Redis channel layer that delivers group messages in-process when it can.
+
+    Group members that live in this process (consumer channels created by
+    new_channel) are tracked in memory and receive group_send messages
+    directly, without a Redis round trip. Redis only stores which nodes
+    (processes) have members in a group: a group_send publishes one message
+    per remote node, and that node fans it out to its own local members.
+    Channels that do not belong to any node (e.g. named worker channels) are
+    stored in the same Redis set and receive the message directly.
+
+    A node refreshes its membership every node_ttl / 3 seconds while it has
+    local members; a node that stops (crash, kill) drops out of its groups
+    after node_ttl instead of group_expiry. A member whose channel is full
+    is skipped and counted, the rest of the group still gets the message.
+
+    The Channels layer API is unchanged; configure it in CHANNEL_LAYERS with
+    the same CONFIG as RedisChannelLayer, plus optionally
+    membership_cache_seconds (how long the list of remote nodes of a group
+    is cached; nodes announce themselves when they join a group, so the
+    cache only bounds how long departed nodes keep receiving messages),
+    node_ttl and node_channel_capacity (capacity of the node channels, which
+    carry the fan-out of every group a node serves).
+    """
+
+    NODE_CHANNEL_MARKER = '!hybrid.node'
+
+    def __init__(self, *args, membership_cache_seconds: float = 30, client_prefix: Optional[str] = None,
+                 node_suffix: str = '', node_ttl: float = 30, node_channel_capacity: int = 1000,
+                 channel_capacity=None, **kwargs):
+        # Node channels first: the first matching pattern gives the capacity
+        capacities = {f"specific.*{self.NODE_CHANNEL_MARKER}*": node_channel_capacity}
+        capacities.update(channel_capacity or {})
+        super().__init__(*args, channel_capacity=capacities, **kwargs)
+        self.membership_cache_seconds = membership_cache_seconds
+        self.node_ttl = node_ttl
+
+        # Several layers of one process (see ShardedChannelLayer) share the client prefix
+        if client_prefix is not None:
+            self.client_prefix = client_prefix
+
+        # Channel through which other nodes reach this process
+        self.node_channel = f"specific.{self.client_prefix}{self.NODE_CHANNEL_MARKER}{node_suffix}"
+        self.local_groups: Dict[str, Set[str]] = {}  # group -> local channels
+        self.remote_members: Dict[str, tuple] = {}  # group -> (expires_at, [node/foreign channels])
+        self.node_task = None
+        self.heartbeat_task = None
+
+    # Channels layer API
+
+    async def group_add(self, group, channel):
+        assert self.valid_group_name(group), "Group name not valid"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+
+        if not self.is_local_channel(channel):
+            await self._add_member(group, channel)
+            return
+
+        self._ensure_node_task()
+        members = self.local_groups.setdefault(group, set())
+        first_member = not members
+        members.add(channel)
+
+        # Refresh the node's membership on every join (and every node_ttl / 3, see _heartbeat)
+        await self._add_member(group, self.node_channel)
+        if first_member:
+            await self._announce(group)
+
+    async def group_discard(self, group, channel):
+        assert self.valid_group_name(group), "Group name not valid"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+
+        if not self.is_local_channel(channel):
+            await self._remove_member(group, channel)
+            return
+
+        members = self.local_groups.get(group)
+        if members is None:
+            return
+        members.discard(channel)
+        if not members:
+            del self.local_groups[group]
+            await self._remove_member(group, self.node_channel)
+
+    async def group_send(self, group, message):
+        assert self.valid_group_name(group), "Group name not valid"
+
+        self._deliver_local(group, message)
+
+        for member in await self._remote_members(group):
+            if member == self.node_channel:
+                continue
+            try:
+                if self.NODE_CHANNEL_MARKER in member:
+                    await self.send(member, {'type': 'hybrid.fanout', 'group': group, 'message': message})
+                else:
+                    await self.send(member, message)
+            except ChannelFull:
+                # Like RedisChannelLayer.group_send: a full member does not stop delivery to the others
+                CHANNEL_LAYER_DELIVERIES.labels('full').inc()
+                logger.warning(f"Channel {member} full, group message for {group} dropped")
+                continue
+            CHANNEL_LAYER_DELIVERIES.labels('remote').inc()
+
+    async def flush(self):
+        self.local_groups = {}
+        self.remote_members = {}
+        for task in (self.node_task, self.heartbeat_task):
+            if task is not None:
+                task.cancel()
+        self.node_task = None
+        self.heartbeat_task = None
+        await super().flush()
+
+    # Helpers
+
+    def is_local_channel(self, channel: str) -> bool:
+        """Whether a channel was created by this process (new_channel)."""
+        return "!" in channel and self.non_local_name(channel) == f"specific.{self.client_prefix}!"
+
+    def _deliver_local(self, group: str, message: Dict) -> None:
+        """Put a message straight into the receive buffers of local group members."""
+        for channel in list(self.local_groups.get(group, ())):
+            # A copy per member, as if each had deserialized it from Redis
+            self.receive_buffer[channel].put_nowait(dict(message))
+            CHANNEL_LAYER_DELIVERIES.labels('local').inc()
+
+    def _group_members_key(self, group: str) -> str:
+        return f"{self.prefix}:hybrid:group:{group}"
+
+    async def _add_member(self, group: str, member: str) -> None:
+        connection = self.connection(self.consistent_hash(group))
+        await connection.zadd(self._group_members_key(group), {member: time.time()})
+        self.remote_members.pop(group, None)
+
+    async def _remove_member(self, group: str, member: str) -> None:
+        connection = self.connection(self.consistent_hash(group))
+        await connection.zrem(self._group_members_key(group), member)
+        self.remote_members.pop(group, None)
+
+    async def _remote_members(self, group: str) -> List[str]:
+        """Nodes and foreign channels registered in a group (cached)."""
+        cached = self.remote_members.get(group)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        connection = self.connection(self.consistent_hash(group))
+        key = self._group_members_key(group)
+        now = time.time()
+        members = []
+        expired = []
+        for member, joined_at in await connection.zrange(key, 0, -1, withscores=True):
+            member = member.decode('utf8')
+            # Nodes heartbeat, so they expire after node_ttl; other channels after group_expiry
+            ttl = self.node_ttl if self.NODE_CHANNEL_MARKER in member else self.group_expiry
+            (expired if joined_at < now - ttl else members).append(member)
+        if expired:
+            await connection.zrem(key, *expired)
+
+        self.remote_members[group] = (time.monotonic() + self.membership_cache_seconds, members)
+        return members
+
+    async def has_members(self, group: str) -> bool:
+        """Whether any node or channel is registered in a group on this layer's Redis."""
+        return bool(self.local_groups.get(group)) or bool(await self._remote_members(group))
+
+    async def ping(self) -> None:
+        """Round trip to this layer's (first) Redis host."""
+        await self.connection(0).ping()
+
+    async def _announce(self, group: str) -> None:
+        """Tell the other nodes of a group to refresh their member cache."""
+        self.remote_members.pop(group, None)
+        for member in await self._remote_members(group):
+            if member != self.node_channel and self.NODE_CHANNEL_MARKER in member:
+                await self.send(member, {'type': 'hybrid.join', 'group': group})
+
+    def _ensure_node_task(self) -> None:
+        if self.node_task is None or self.node_task.done():
+            self.node_task = asyncio.ensure_future(self._receive_node_messages())
+        if self.heartbeat_task is None or self.heartbeat_task.done():
+            self.heartbeat_task = asyncio.ensure_future(self._heartbeat())
+
+    async def _heartbeat(self) -> None:
+        """Refresh the node's membership in its groups while it has local members."""
+        while True:
+            await asyncio.sleep(self.node_ttl / 3)
+            for group in list(self.local_groups):
+                try:
+                    connection = self.connection(self.consistent_hash(group))
+                    await connection.zadd(self._group_members_key(group), {self.node_channel: time.time()})
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error refreshing node membership of {group}: {str(e)}")
+
+    async def _receive_node_messages(self) -> None:
+        """Handle messages other nodes send to this process."""
+        while True:
+            try:
+                message = await self.receive(self.node_channel)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error receiving node message: {str(e)}")
+                await asyncio.sleep(1)
+                continue
+
+            if message.get('type') == 'hybrid.fanout':
+                self._deliver_local(message['group'], message['message'])
+            elif message.get('type') == 'hybrid.join':
+                self.remote_members.pop(message['group'], None)
+
+
+class ConsistentHashRing:
+    """
+    Consistent hash ring with virtual nodes.
+
+    Each node is placed on the ring many times, so keys spread evenly and
+    adding a node moves only about 1/N of the keys (to the new node).
+    """
+
+    def __init__(self, nodes: Sequence[str], vnodes: int = 128):
+        self.nodes = list(nodes)
+        self.vnodes = vnodes
+
+        self.points = []  # sorted hashes
+        self.owners = {}  # hash -> index in nodes
+        for index, node in enumerate(self.nodes):
+            for replica in range(vnodes):
+                point = self._hash(f"{node}#{replica}")
+                self.owners[point] = index
+                bisect.insort(self.points, point)
+
+    def get(self, key: str) -> int:
+        """
+        Get the node responsible for a key.
+
+        Returns:
+            Index of the node in the list given to the constructor
+        """
+        if not self.points:
+            raise ValueError("Empty hash ring")
+        position = bisect.bisect(self.points, self._hash(key)) % len(self.points)
+        return self.owners[self.points[position]]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+
+def host_label(host) -> str:
+    """Readable name of a Redis host entry ((host, port), URL or dict)."""
+    if isinstance(host, (tuple, list)):
+        return ":".join(str(part) for part in host)
+    if isinstance(host, dict):
+        return str(host.get('address', host))
+    return str(host)
+
+
+class ShardedChannelLayer(BaseChannelLayer):
+    """
+    Channel layer that shards groups and their channels across Redis hosts.
+
+    Each host is served by its own HybridChannelLayer; a consistent hash ring
+    over the hosts maps every group (meeting_{id}) to one shard. A channel is
+    bound to the shard of the group it joins, so all traffic of a meeting
+    (membership, group sends and direct sends to its consumers) stays on one
+    Redis host and keeps its ordering.
+
+    Rebalancing: when hosts are added (add_host at runtime, or a new
+    CONFIG['hosts'] with the old list in CONFIG['previous_hosts'] on
+    deploy), only about 1/N of the groups map to a different shard. A group
+    that still has members on its previous shard stays there until the
+    meeting ends, so live meetings are never split; new meetings use the new
+    ring.
+
+    Per-shard health (up, ping latency, local groups) is exported to Prometheus.
+    """
+
+    extensions = ['groups', 'flush']
+
+    def __init__(self, hosts=None, previous_hosts=None, vnodes: int = 128, health_interval: float = 15,
+                 expiry=60, group_expiry=86400, capacity=100, channel_capacity=None, **kwargs):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity)
+        hosts = hosts or [('localhost', 6379)]
+
+        self.vnodes = vnodes
+        self.health_interval = health_interval
+        self.layer_kwargs = dict(expiry=expiry, group_expiry=group_expiry, capacity=capacity,
+                                 channel_capacity=channel_capacity, **kwargs)
+
+        self.shards: List[HybridChannelLayer] = []
+        self.labels: List[str] = []
+        for host in hosts:
+            self._create_shard(host)
+
+        self.client_prefix = self.shards[0].client_prefix
+        self.receive_buffer = self.shards[0].receive_buffer
+
+        self.ring = ConsistentHashRing(self.labels, vnodes)
+        # Rings used before hosts were added; groups still living there are not moved
+        self.previous_rings: List[ConsistentHashRing] = []
+        if previous_hosts:
+            labels = [host_label(host) for host in previous_hosts]
+            self.previous_rings.append(ConsistentHashRing(labels, vnodes))
+
+        self.group_shards: Dict[str, int] = {}  # resolved shard of groups with local members
+        self.channel_shards: Dict[str, int] = {}  # channel -> shard of the group it joined
+        self.health_task = None
+
+    def add_host(self, host) -> int:
+        """
+        Add a Redis host at runtime.
+
+        Groups with local members keep their shard; new groups (and groups
+        whose members are gone) follow the new ring.
+
+        Returns:
+            Index of the new shard
+        """
+        self.previous_rings.insert(0, self.ring)
+        index = self._create_shard(host)
+        self.ring = ConsistentHashRing(self.labels, self.vnodes)
+        return index
+
+    # Channels layer API
+
+    async def new_channel(self, prefix="specific"):
+        return await self.shards[0].new_channel(prefix)
+
+    async def send(self, channel, message):
+        await self.shards[self._channel_shard(channel)].send(channel, message)
+
+    async def receive(self, channel):
+        self._ensure_started()
+
+        if self.shards[0].is_local_channel(channel):
+            # Shards push into the shared receive buffer (local deliveries and
+            # messages their node tasks read from Redis)
+            queue = self.receive_buffer[channel]
+            try:
+                return await queue.get()
+            finally:
+                if queue.empty() and channel not in self.channel_shards:
+                    self.receive_buffer.pop(channel, None)
+
+        return await self.shards[self._channel_shard(channel)].receive(channel)
+
+    async def group_add(self, group, channel):
+        self._ensure_started()
+        index = await self._group_shard(group)
+        self.group_shards[group] = index
+        self.channel_shards[channel] = index
+        await self.shards[index].group_add(group, channel)
+
+    async def group_discard(self, group, channel):
+        index = await self._group_shard(group)
+        await self.shards[index].group_discard(group, channel)
+        self.channel_shards.pop(channel, None)
+        if not self.shards[index].local_groups.get(group):
+            self.group_shards.pop(group, None)
+
+    async def group_send(self, group, message):
+        index = await self._group_shard(group)
+        await self.shards[index].group_send(group, message)
+
+    async def flush(self):
+        if self.health_task is not None:
+            self.health_task.cancel()
+            self.health_task = None
+        self.group_shards = {}
+        self.channel_shards = {}
+        for shard in self.shards:
+            await shard.flush()
+
+    # Helpers
+
+    def _create_shard(self, host) -> int:
+        index = len(self.shards)
+        shard = HybridChannelLayer(
+            hosts=[host],
+            client_prefix=self.shards[0].client_prefix if self.shards else None,
+            node_suffix=f".{index}",
+            **self.layer_kwargs
+        )
+        if self.shards:
+            # One receive buffer per process, whichever shard delivers the message
+            shard.receive_buffer = self.shards[0].receive_buffer
+        self.shards.append(shard)
+        self.labels.append(host_label(host))
+        return index
+
+    async def _group_shard(self, group: str) -> int:
+        """Resolve the shard of a group, keeping live groups on their previous shard."""
+        index = self.group_shards.get(group)
+        if index is not None:
+            return index
+
+        index = self.ring.get(group)
+        for ring in self.previous_rings:
+            label = ring.nodes[ring.get(group)]
+            if label not in self.labels:
+                # Removed hosts are not drained; their groups start over on the new ring
+                continue
+            previous = self.labels.index(label)
+            if previous != index and await self.shards[previous].has_members(group):
+                return previous
+        return index
+
+    def _channel_shard(self, channel: str) -> int:
+        index = self.channel_shards.get(channel)
+        return index if index is not None else self.ring.get(channel)
+
+    def _ensure_started(self) -> None:
+        """Start the node task of every shard and the health checks."""
+        for shard in self.shards:
+            shard._ensure_node_task()
+        if self.health_task is None or self.health_task.done():
+            self.health_task = asyncio.ensure_future(self._check_health())
+
+    async def _check_health(self) -> None:
+        while True:
+            for index, shard in enumerate(self.shards):
+                label = self.labels[index]
+                start_time = time.perf_counter()
+                try:
+                    await asyncio.wait_for(shard.ping(), timeout=5)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    REDIS_SHARD_UP.labels(label).set(0)
+                    logger.warning(f"Redis shard {label} unhealthy: {str(e)}")
+                else:
+                    REDIS_SHARD_UP.labels(label).set(1)
+                    REDIS_SHARD_PING_SECONDS.labels(label).set(time.perf_counter() - start_time)
+                REDIS_SHARD_GROUPS.labels(label).set(len(shard.local_groups))
+
+            await asyncio.sleep(self.health_interval)
@@ -1,14 +1,32 @@
 # meetings/consumers.py
-import json
+import time
 import logging
 import asyncio
 from uuid import uuid4
 from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import database_sync_to_async
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 
+from ai_suggestions.services import conversation_context, suggestion_cache, suggestion_job_limiter
+from meetings.db_executor import database_sync_to_async
+from meetings.ingress import LaneScheduler
+from meetings.metrics import (
+    PIPELINE_MESSAGES, PIPELINE_QUEUE_DEPTH, PIPELINE_STAGE_SECONDS, PROVIDER_ERRORS,
+    observe_stage, socket_opened, socket_closed,
+)
 from meetings.models import Meeting, MeetingParticipant, Transcript, Translation
-from translate_api.services import TranslationService, AISuggestionService, SpeechProcessingService
+from meetings.tasks import flush_speech_task, process_speech_task
+from meetings.outbound import OutboundBatcher
+from meetings.segmentation import ChunkAligner, UtteranceBuffer
+from meetings.summarization import meeting_summarizer
+from meetings.serialization import frame_event, negotiate_codec
+from meetings.tracing import span, current_trace_id, current_span_id
+from translate_api.glossary import glossary_cache
+from translate_api.services import (
+    TranslationService, AISuggestionService, SpeechProcessingService, LanguageDetectionService,
+)
+from translate_interview_platform.db_routers import set_current_user
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +37,37 @@ class MeetingConsumer(AsyncWebsocketConsumer):
         self.user = self.scope['user']
         self.participant_id = None
         
+        # Scrierile făcute pentru acest utilizator țin citirile lui pe primary o vreme (read-your-writes)
+        if self.user.is_authenticated:
+            set_current_user(self.user.id)
+        self.suggestion_task = None
+        
+        # Formatul frame-urilor (JSON implicit, MessagePack și/sau compresie la cerere)
+        self.codec, subprotocol = negotiate_codec(self.scope)
+        
+        # Batching opțional al evenimentelor de grup (un frame per tick, indiferent de activitate)
+        self.batcher = None
+        if settings.OUTBOUND_BATCHING_ENABLED:
+            self.batcher = OutboundBatcher(self.send_encoded, self.codec,
+                                           tick_seconds=settings.OUTBOUND_BATCH_TICK_MS / 1000)
+        
+        # Câte o coadă limitată și un worker pentru fiecare tip de mesaj (vezi LaneScheduler):
+        # fragmentele speech rămân ordonate după `seq`, iar chat-ul și cererile de control
+        # nu mai așteaptă după traducerea unui fragment audio
+        self.scheduler = LaneScheduler(self.process_queued)
+        self.scheduler.add_lane('speech', settings.INGRESS_QUEUE_SIZE,
+                                policy=settings.INGRESS_OVERLOAD_POLICY, sequence_key='seq')
+        self.scheduler.add_lane('chat', settings.INGRESS_QUEUE_SIZE, policy='slow_down')
+        self.scheduler.add_lane('control', settings.INGRESS_QUEUE_SIZE, policy='drop_oldest')
+        
+        # Fragmentele transcrise sunt unite în propoziții, traduse și salvate o singură dată
+        self.utterances = UtteranceBuffer(max_chars=settings.SPEECH_UTTERANCE_MAX_CHARS)
+        self.utterance_lock = asyncio.Lock()
+        self.utterance_timer = None
+        self.utterance_offloaded = False  # Mod celery: propoziția deschisă este păstrată de workeri
+        self.aligner = ChunkAligner(min_overlap=settings.SPEECH_OVERLAP_MIN_TOKENS,
+                                    gap_seconds=settings.SPEECH_OVERLAP_RESET_MS / 1000)
+        
         # Verificare meeting și adăugare participant
         meeting_exists = await self.check_meeting_exists()
         if not meeting_exists:
@@ -37,31 +86,42 @@ class MeetingConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
         
-        await self.accept()
+        await self.accept(subprotocol=subprotocol)
+        socket_opened(self.meeting_id)
+        self.scheduler.start()
         
         # Notificare alți participanți despre conectare
         await self.channel_layer.group_send(
             self.meeting_group_name,
-            {
+            frame_event('participant_joined', {
                 'type': 'participant_joined',
                 'participant_id': self.participant_id,
                 'name': await self.get_participant_name()
-            }
+            })
         )
     
     async def disconnect(self, close_code):
+        # Oprire generare sugestii în curs
+        await self.cancel_suggestions()
+        await self.stop_scheduler()
+        await self.flush_utterance()
+        if getattr(self, 'batcher', None):
+            self.batcher.discard()
+        
         if self.participant_id:
+            socket_closed(self.meeting_id)
+            
             # Marcare participant ca deconectat
             await self.mark_participant_left()
             
             # Notificare alți participanți despre deconectare
             await self.channel_layer.group_send(
                 self.meeting_group_name,
-                {
+                frame_event('participant_left', {
                     'type': 'participant_left',
                     'participant_id': self.participant_id,
                     'name': await self.get_participant_name()
-                }
+                })
             )
         
         # Eliminare din grup
@@ -70,31 +130,85 @@ class MeetingConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
     
-    async def receive(self, text_data):
+    async def receive(self, text_data=None, bytes_data=None):
         """Primire date de la client."""
         try:
-            data = json.loads(text_data)
+            with observe_stage('decode'):
+                data = self.codec.decode(text_data, bytes_data)
             message_type = data.get('type')
+            PIPELINE_MESSAGES.labels(str(message_type)).inc()
             
-            if message_type == 'speech':
-                # Procesare audio speech
+            # Fiecare mesaj primește un trace ID la intrare, propagat prin tot pipeline-ul
+            with span('receive', message_type=message_type, meeting_id=str(self.meeting_id),
+                      participant_id=self.participant_id):
+                # receive doar pune mesajul în coada lane-ului; procesarea rulează în worker
+                if message_type == 'speech':
+                    # Procesare audio speech
+                    await self.schedule('speech', data)
+                elif message_type == 'chat_message':
+                    # Procesare mesaj text
+                    await self.schedule('chat', data)
+                elif message_type == 'request_suggestions':
+                    # Generare sugestii AI (rulează deja într-un task separat)
+                    await self.generate_suggestions(data)
+                elif message_type in ('request_meeting_info', 'request_participants'):
+                    # Cereri de control
+                    await self.schedule('control', data)
+        except ValueError:
+            # JSONDecodeError, zlib și msgpack semnalează frame-urile invalide tot prin ValueError
+            logger.error(f"Eroare decodare mesaj ({self.codec.name}): {text_data or bytes_data!r}")
+        except Exception as e:
+            logger.error(f"Eroare la primire mesaj: {str(e)}")
+    
+    async def schedule(self, lane, data):
+        """Adaugă un mesaj în coada unui lane, aplicând politica de suprasarcină."""
+        # Worker-ul continuă trace-ul mesajului din momentul în care îl scoate din coadă
+        data['trace'] = {'trace_id': current_trace_id(), 'parent_span_id': current_span_id()}
+        
+        action = self.scheduler.submit(lane, data)
+        if action == 'rejected':
+            # Mesajul respins se pierde (coada îi sare seq-ul, nu îl așteaptă); clientul face o pauză,
+            # iar audio-ul înregistrat între timp pleacă într-un singur fragment după pauză
+            await self.send_payload({
+                'type': 'slow_down',
+                'lane': lane,
+                'queue_depth': self.scheduler.queues[lane].qsize(),
+                'retry_after_ms': settings.INGRESS_SLOW_DOWN_MS
+            })
+    
+    async def process_queued(self, lane, item):
+        """Procesează un mesaj scos din coada unui lane (apelat de LaneScheduler)."""
+        data = item['message']
+        trace = data.pop('trace', {})
+        queue_wait = time.perf_counter() - item['enqueued_at']
+        PIPELINE_STAGE_SECONDS.labels('ingress_wait').observe(queue_wait)
+        
+        with PIPELINE_QUEUE_DEPTH.labels(lane).track_inprogress(), \
+                span(f'process_{lane}', trace_id=trace.get('trace_id'),
+                     parent_id=trace.get('parent_span_id'),
+                     queue_wait_ms=round(queue_wait * 1000, 3),
+                     merged_chunks=data.get('merged_chunks', 1)):
+            if lane == 'speech':
                 await self.process_speech(data)
-            elif message_type == 'chat_message':
-                # Procesare mesaj text
+            elif lane == 'chat':
                 await self.process_chat_message(data)
-            elif message_type == 'request_suggestions':
-                # Generare sugestii AI
-                await self.generate_suggestions(data)
-            elif message_type == 'request_meeting_info':
-                # Trimitere informații despre meeting
+            elif data.get('type') == 'request_meeting_info':
                 await self.send_meeting_info()
-            elif message_type == 'request_participants':
-                # Trimitere lista participanți
+            elif data.get('type') == 'request_participants':
                 await self.send_participants_list()
-        except json.JSONDecodeError:
-            logger.error(f"Eroare decodare JSON: {text_data}")
-        except Exception as e:
-            logger.error(f"Eroare la primire mesaj: {str(e)}")
+    
+    async def stop_scheduler(self):
+        """Oprește worker-ele lane-urilor și golește cozile conexiunii."""
+        scheduler = getattr(self, 'scheduler', None)
+        if scheduler is None:
+            return
+        
+        await scheduler.stop()
+        
+        for lane, metrics in scheduler.get_metrics().items():
+            if metrics['merged'] or metrics['dropped'] or metrics['rejected'] or metrics['late']:
+                logger.info(f"Coadă {lane} suprasolicitată (meeting {self.meeting_id}, "
+                            f"participant {self.participant_id}): {metrics}")
     
     async def process_speech(self, data):
         """Procesează un fragment audio, extrage text și traduce."""
@@ -104,161 +218,413 @@ class MeetingConsumer(AsyncWebsocketConsumer):
         if not audio_data:
             return
         
+        # Un fragment nou: pauza din vorbire nu s-a încheiat încă
+        self.cancel_utterance_timer()
+        
+        # Mod opțional: STT, traducerea și salvarea rulează în workerii Celery, iar rezultatul
+        # ajunge la participanți prin channel layer (grupul meeting_{id}); workerii unesc fragmentele
+        # în propoziții, iar după pauză consumer-ul trimite în aceeași coadă cererea de finalizare
+        if settings.SPEECH_PROCESSING_MODE == 'celery':
+            await self.offload_speech(data)
+            if settings.SPEECH_SEGMENTATION_ENABLED:
+                self.utterance_offloaded = True
+                self.utterance_timer = self.scheduler.submit_task(self.flush_utterance_after_pause())
+            return
+        
         # Procesare audio în text
-        text = SpeechProcessingService.process_speech_chunk(audio_data, source_language)
+        try:
+            with observe_stage('stt'), span('stt', language=source_language):
+                # Apelurile sincrone către furnizori rulează în thread-uri, ca să nu blocheze celelalte lane-uri
+                text = await sync_to_async(SpeechProcessingService.process_speech_chunk,
+                                           thread_sensitive=False)(audio_data, source_language)
+        except Exception:
+            PROVIDER_ERRORS.labels('stt').inc()
+            raise
         
+        # Ferestrele audio suprapuse (sau retrimise) repetă cuvintele de la graniță: păstrăm doar continuarea
+        text = self.aligner.align(text or '')
         if not text:
             return
         
-        # Salvare transcript
-        transcript_id = await self.save_transcript(text, source_language)
+        if settings.SPEECH_SEGMENTATION_ENABLED:
+            await self.buffer_speech(text, source_language, data.get('timestamp'))
+        else:
+            await self.finalize_speech(text, source_language, data.get('timestamp'))
+    
+    async def buffer_speech(self, text, source_language, timestamp):
+        """Adaugă textul unui fragment la propoziția curentă; o finalizează la semnul de punctuație final."""
+        async with self.utterance_lock:
+            utterance = self.utterances.append(text, source_language, timestamp)
+            if utterance is not None:
+                # Propoziția nouă nu se compară cu finalul celei încheiate
+                self.aligner.reset()
+                await self.finalize_speech(utterance['text'], utterance['language'], utterance['timestamp'],
+                                           utterance_id=utterance['id'])
+                return
+            
+            # Propoziția nu s-a încheiat: participanții văd textul provizoriu, netradus
+            interim = self.utterances.interim()
+            with observe_stage('fanout'), span('group_send'):
+                await self.channel_layer.group_send(
+                    self.meeting_group_name,
+                    frame_event('speech_message', {
+                        'type': 'speech_interim',
+                        'participant_id': self.participant_id,
+                        'name': await self.get_participant_name(),
+                        'utterance_id': interim['id'],
+                        'text': interim['text'],
+                        'original_language': interim['language'],
+                        'timestamp': interim['timestamp']
+                    }, participant_id=self.participant_id, **self.trace_context())
+                )
         
-        # Obținere meeting și limbi țintă
-        meeting_info = await self.get_meeting_info()
-        participant_languages = await self.get_participant_languages()
+        # După o pauză fără fragmente noi, propoziția este finalizată așa cum este
+        self.utterance_timer = self.scheduler.submit_task(self.flush_utterance_after_pause())
+    
+    def cancel_utterance_timer(self):
+        if self.utterance_timer is not None:
+            self.utterance_timer.cancel()
+            self.utterance_timer = None
+    
+    async def flush_utterance_after_pause(self):
+        await asyncio.sleep(settings.SPEECH_UTTERANCE_PAUSE_MS / 1000)
+        # De aici finalizarea nu mai poate fi anulată de un fragment nou
+        self.utterance_timer = None
+        await self.flush_utterance()
+    
+    async def flush_utterance(self):
+        """Finalizează propoziția începută (pauză în vorbire sau deconectare)."""
+        utterances = getattr(self, 'utterances', None)
+        if utterances is None or not self.participant_id:
+            return
+        
+        self.cancel_utterance_timer()
+        try:
+            if self.utterance_offloaded:
+                self.utterance_offloaded = False
+                await self.offload_flush()
+                return
+            
+            async with self.utterance_lock:
+                utterance = utterances.flush()
+                self.aligner.reset()
+                if utterance is not None:
+                    await self.finalize_speech(utterance['text'], utterance['language'], utterance['timestamp'],
+                                               utterance_id=utterance['id'])
+        except Exception as e:
+            logger.error(f"Eroare la finalizarea propoziției: {str(e)}")
+    
+    async def finalize_speech(self, text, source_language, timestamp, utterance_id=None):
+        """Detectează limba, salvează și traduce un text (fragment sau propoziție) și îl trimite participanților."""
+        # Limba textului recunoscut; limba trimisă de client este doar o indicație
+        source_language = await self.detect_language(text, hint=source_language)
+        
+        # Salvare transcript
+        with observe_stage('db'), span('db.save_transcript'):
+            transcript_id = await self.save_transcript(text, source_language)
+            
+            # Actualizare context conversație folosit pentru sugestii
+            name = await self.get_participant_name()
+            await sync_to_async(conversation_context.append, thread_sensitive=False)(self.meeting_id, name, text)
+            
+            # Obținere meeting și limbi țintă
+            meeting_info = await self.get_meeting_info()
+            participant_languages = await self.get_participant_languages()
+            glossaries = await self.get_glossaries()
         
         # Traducere pentru fiecare limbă țintă
         translations = {}
         for lang in participant_languages:
-            if lang != source_language.split('-')[0]:  # Nu traducem în aceeași limbă
-                translated_text = TranslationService.translate_text(
-                    text, 
-                    source_lang=source_language.split('-')[0],
-                    target_lang=lang
-                )
+            if lang != source_language:  # Nu traducem în aceeași limbă
+                with observe_stage('translation'), span('translation', source_language=source_language,
+                                                         target_language=lang):
+                    translated_text = await sync_to_async(TranslationService.translate_text,
+                                                          thread_sensitive=False)(
+                        text, 
+                        source_lang=source_language or 'auto',
+                        target_lang=lang,
+                        glossary=glossaries.matcher(lang) if glossaries else None
+                    )
                 translations[lang] = translated_text
                 
                 # Salvare traducere în baza de date
                 if transcript_id:
-                    await self.save_translation(transcript_id, translated_text, lang)
+                    with observe_stage('db'), span('db.save_translation', target_language=lang):
+                        await self.save_translation(transcript_id, translated_text, lang)
         
         # Trimitere mesaj către toți participanții
-        await self.channel_layer.group_send(
-            self.meeting_group_name,
-            {
-                'type': 'speech_message',
+        # Frame-ul este serializat o singură dată aici; destinatarii îl trimit mai departe ca atare
+        with observe_stage('fanout'), span('group_send'):
+            await self.channel_layer.group_send(
+                self.meeting_group_name,
+                frame_event('speech_message', {
+                    'type': 'speech',
+                    'participant_id': self.participant_id,
+                    'name': name,
+                    'original_text': text,
+                    'original_language': source_language,
+                    'translations': translations,
+                    'utterance_id': utterance_id,
+                    'timestamp': timestamp
+                }, participant_id=self.participant_id, **self.trace_context())
+            )
+    
+    async def get_glossaries(self):
+        """Glosarele meeting-ului și ale vorbitorului, compilate (din cache cât timp nu se schimbă)."""
+        user_id = self.user.id if self.user.is_authenticated else None
+        glossaries = glossary_cache.get(self.meeting_id, user_id)
+        if glossaries is None:
+            glossaries = await database_sync_to_async(glossary_cache.load)(self.meeting_id, user_id)
+        return glossaries
+    
+    async def detect_language(self, text, hint=None):
+        """Identifică limba unui text (cod canonic); rezultatele sunt păstrate în cache."""
+        with observe_stage('language_detection'), span('language_detection'):
+            return await sync_to_async(LanguageDetectionService.detect_language,
+                                       thread_sensitive=False)(text, hint=hint)
+    
+    async def offload_speech(self, data):
+        """Trimite un fragment audio către workerii Celery (coada meeting-ului)."""
+        # Lane-ul speech publică fragmentele unul câte unul, deci ordinea din coadă este ordinea seq
+        with observe_stage('offload'), span('celery.enqueue'):
+            await sync_to_async(process_speech_task.apply_async, thread_sensitive=False)(kwargs={
+                'meeting_id': self.meeting_id,
                 'participant_id': self.participant_id,
-                'name': await self.get_participant_name(),
-                'original_text': text,
-                'original_language': source_language,
-                'translations': translations,
-                'timestamp': data.get('timestamp')
-            }
-        )
+                'user_id': self.user.id if self.user.is_authenticated else None,
+                'audio_data': data['audio_data'],
+                'source_language': data.get('language', 'en-US'),
+                'timestamp': data.get('timestamp'),
+                'trace': {'trace_id': current_trace_id(), 'parent_span_id': current_span_id()}
+            })
+    
+    async def offload_flush(self):
+        """Cere workerilor Celery finalizarea propoziției începute (după fragmentele deja trimise)."""
+        with observe_stage('offload'), span('celery.enqueue'):
+            await sync_to_async(flush_speech_task.apply_async, thread_sensitive=False)(kwargs={
+                'meeting_id': self.meeting_id,
+                'participant_id': self.participant_id,
+                'user_id': self.user.id if self.user.is_authenticated else None,
+                'trace': {'trace_id': current_trace_id(), 'parent_span_id': current_span_id()}
+            })
     
     async def process_chat_message(self, data):
         """Procesează un mesaj text din chat și îl traduce."""
         text = data.get('message')
-        source_language = data.get('language', 'en')
         
         if not text:
             return
         
-        # Obținere limbi țintă
+        # Limba mesajului este detectată din conținut; limba clientului este doar o indicație
+        source_language = await self.detect_language(text, hint=data.get('language'))
+        
+        # Actualizare context conversație folosit pentru sugestii
+        name = await self.get_participant_name()
+        await sync_to_async(conversation_context.append, thread_sensitive=False)(self.meeting_id, name, text)
+        
+        # Obținere limbi țintă și glosare
         participant_languages = await self.get_participant_languages()
+        glossaries = await self.get_glossaries()
         
         # Traducere pentru fiecare limbă țintă
         translations = {}
         for lang in participant_languages:
             if lang != source_language:  # Nu traducem în aceeași limbă
-                translated_text = TranslationService.translate_text(
-                    text, 
-                    source_lang=source_language,
-                    target_lang=lang
-                )
+                with observe_stage('translation'), span('translation', source_language=source_language,
+                                                         target_language=lang):
+                    translated_text = await sync_to_async(TranslationService.translate_text,
+                                                          thread_sensitive=False)(
+                        text, 
+                        source_lang=source_language or 'auto',
+                        target_lang=lang,
+                        glossary=glossaries.matcher(lang) if glossaries else None
+                    )
                 translations[lang] = translated_text
         
         # Trimitere mesaj către toți participanții
-        await self.channel_layer.group_send(
-            self.meeting_group_name,
-            {
-                'type': 'chat_message',
-                'participant_id': self.participant_id,
-                'name': await self.get_participant_name(),
-                'original_text': text,
-                'original_language': source_language,
-                'translations': translations,
-                'timestamp': data.get('timestamp')
-            }
-        )
+        # Frame-ul este serializat o singură dată aici; destinatarii îl trimit mai departe ca atare.
+        # Mesajele de chat sunt urgente: nu așteaptă tick-ul de batching
+        with observe_stage('fanout'), span('group_send'):
+            await self.channel_layer.group_send(
+                self.meeting_group_name,
+                frame_event('chat_message', {
+                    'type': 'chat',
+                    'participant_id': self.participant_id,
+                    'name': name,
+                    'original_text': text,
+                    'original_language': source_language,
+                    'translations': translations,
+                    'timestamp': data.get('timestamp')
+                }, participant_id=self.participant_id, urgent=True, **self.trace_context())
+            )
     
     async def generate_suggestions(self, data):
-        """Generează sugestii AI pentru un participant."""
-        context = data.get('context', '')
+        """
+        Pornește generarea de sugestii AI pentru un participant.
+        
+        Generarea rulează într-un task separat, astfel încât `receive` nu
+        blochează procesarea speech/chat. O cerere nouă anulează cererea
+        aflată în curs (sau în așteptare) pentru același participant, deci
+        clientul primește doar rezultatul ultimei cereri.
+        """
+        await self.cancel_suggestions()
+        
+        request_id = uuid4().hex
+        self.suggestion_task = asyncio.ensure_future(
+            self.stream_suggestions(data, request_id)
+        )
+    
+    async def cancel_suggestions(self):
+        """Anulează generarea de sugestii aflată în curs, dacă există."""
+        task = getattr(self, 'suggestion_task', None)
+        self.suggestion_task = None
+        
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    
+    async def stream_suggestions(self, data, request_id):
+        """Transmite sugestiile către client pe măsură ce modelul le generează."""
+        # Contextul este menținut pe server; cel trimis de client rămâne doar
+        # ca rezervă (de ex. meeting început înainte de repornirea procesului)
+        context = (await sync_to_async(conversation_context.get_context, thread_sensitive=False)(self.meeting_id)
+                   or data.get('context', ''))
         language = data.get('language', 'ro')
         meeting_type = data.get('meeting_type', 'interview')
         user_role = data.get('user_role', 'interviewee')
+        num_suggestions = 3
         
-        # Generare sugestii
-        suggestions = AISuggestionService.generate_suggestions(
-            context, language, meeting_type, user_role
-        )
+        # Cerere repetată pentru aceeași stare a conversației: răspundem din cache
+        cache_key = suggestion_cache.make_key(context, user_role, meeting_type, language)
+        cached = await sync_to_async(suggestion_cache.get, thread_sensitive=False)(self.meeting_id, cache_key)
+        if cached is not None:
+            await self.send_payload({
+                'type': 'suggestions',
+                'request_id': request_id,
+                'suggestions': cached,
+                'cached': True
+            })
+            return
+        
+        # Debounce: o cerere nouă sosită în această fereastră anulează task-ul curent,
+        # deci doar ultima cerere dintr-o rafală ajunge la model
+        await asyncio.sleep(settings.SUGGESTION_DEBOUNCE_SECONDS)
+        
+        chunks = []
+        try:
+            # Limităm numărul de generări simultane din același meeting
+            async with suggestion_job_limiter.slot(self.meeting_id):
+                async for delta in AISuggestionService.stream_suggestions(
+                    context, language, meeting_type, user_role, num_suggestions
+                ):
+                    chunks.append(delta)
+                    
+                    # Trimitere fragment doar către participantul care a cerut sugestiile
+                    await self.send_payload({
+                        'type': 'suggestion_delta',
+                        'request_id': request_id,
+                        'delta': delta
+                    })
+            
+            suggestions = AISuggestionService.parse_suggestions(''.join(chunks), num_suggestions)
+            await sync_to_async(suggestion_cache.set, thread_sensitive=False)(self.meeting_id, cache_key, suggestions)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            PROVIDER_ERRORS.labels('openai').inc()
+            logger.error(f"Eroare la generarea sugestiilor: {str(e)}")
+            suggestions = [f"Nu s-au putut genera sugestii: {str(e)}"]
         
-        # Trimitere sugestii doar către participantul care le-a cerut
-        await self.send(text_data=json.dumps({
+        # Mesajul final conține lista completă de sugestii
+        await self.send_payload({
             'type': 'suggestions',
+            'request_id': request_id,
             'suggestions': suggestions
-        }))
+        })
     
     async def speech_message(self, event):
         """Transmite un mesaj de tip speech către client."""
-        # Trimite doar către client
-        await self.send(text_data=json.dumps({
-            'type': 'speech',
-            'participant_id': event['participant_id'],
-            'name': event['name'],
-            'original_text': event['original_text'],
-            'original_language': event['original_language'],
-            'translations': event['translations'],
-            'timestamp': event['timestamp']
-        }))
+        # Trimite doar către client frame-ul deja serializat de expeditor
+        with observe_stage('client_send'), self.delivery_span(event):
+            await self.send_frame(event['frame'], urgent=event.get('urgent', False))
     
     async def chat_message(self, event):
         """Transmite un mesaj de chat către client."""
-        # Trimite doar către client
-        await self.send(text_data=json.dumps({
-            'type': 'chat',
-            'participant_id': event['participant_id'],
-            'name': event['name'],
-            'original_text': event['original_text'],
-            'original_language': event['original_language'],
-            'translations': event['translations'],
-            'timestamp': event['timestamp']
-        }))
+        # Trimite doar către client frame-ul deja serializat de expeditor
+        with observe_stage('client_send'), self.delivery_span(event):
+            await self.send_frame(event['frame'], urgent=event.get('urgent', False))
+    
+    async def send_payload(self, payload):
+        """Trimite un frame către client, în formatul negociat la conectare."""
+        text_data, bytes_data = self.codec.encode(payload)
+        await self.send(text_data=text_data, bytes_data=bytes_data)
+    
+    async def send_frame(self, frame, urgent=False):
+        """
+        Trimite către client un frame deja serializat ca JSON (vezi frame_event).
+        
+        Cu batching activat, frame-ul așteaptă tick-ul curent; un frame urgent
+        golește imediat buffer-ul (ordinea se păstrează) și pleacă fără întârziere.
+        """
+        if self.batcher is not None:
+            await self.batcher.add(frame)
+            if urgent:
+                await self.batcher.flush()
+            return
+        
+        text_data, bytes_data = self.codec.encode_json(frame)
+        await self.send_encoded(text_data, bytes_data)
+    
+    async def send_encoded(self, text_data, bytes_data):
+        """Trimite un frame deja codificat în formatul conexiunii."""
+        await self.send(text_data=text_data, bytes_data=bytes_data)
+    
+    def trace_context(self):
+        """Câmpurile de tracing adăugate evenimentelor trimise prin channel layer."""
+        return {
+            'trace_id': current_trace_id(),
+            'parent_span_id': current_span_id(),
+            'sent_at': time.time()
+        }
+    
+    def delivery_span(self, event):
+        """Span pentru livrarea unui eveniment de grup către acest client."""
+        sent_at = event.get('sent_at')
+        return span(
+            'deliver',
+            trace_id=event.get('trace_id'),
+            parent_id=event.get('parent_span_id'),
+            recipient_participant_id=self.participant_id,
+            channel_layer_ms=round((time.time() - sent_at) * 1000, 3) if sent_at else None
+        )
     
     async def participant_joined(self, event):
         """Notifică clienții că un participant s-a alăturat."""
-        await self.send(text_data=json.dumps({
-            'type': 'participant_joined',
-            'participant_id': event['participant_id'],
-            'name': event['name']
-        }))
+        await self.send_frame(event['frame'])
     
     async def participant_left(self, event):
         """Notifică clienții că un participant a plecat."""
-        await self.send(text_data=json.dumps({
-            'type': 'participant_left',
-            'participant_id': event['participant_id'],
-            'name': event['name']
-        }))
+        await self.send_frame(event['frame'])
     
     async def send_meeting_info(self):
         """Trimite informații despre meeting către client."""
         meeting_info = await self.get_meeting_info()
         
-        await self.send(text_data=json.dumps({
+        await self.send_payload({
             'type': 'meeting_info',
             'meeting': meeting_info
-        }))
+        })
     
     async def send_participants_list(self):
         """Trimite lista de participanți către client."""
         participants = await self.get_participants()
         
-        await self.send(text_data=json.dumps({
+        await self.send_payload({
             'type': 'participants_list',
             'participants': participants
-        }))
+        })
     
     # Metode auxiliare pentru interacțiunea cu baza de date
     
@@ -345,7 +711,7 @@ class MeetingConsumer(AsyncWebsocketConsumer):
             languages = set()
             
             for participant in participants:
-                languages.add(participant.preferred_language)
+                languages.add(LanguageDetectionService.canonical_language(participant.preferred_language))
             
             return list(languages)
         except Exception:
@@ -375,8 +741,15 @@ class MeetingConsumer(AsyncWebsocketConsumer):
                 meeting_id=self.meeting_id,
                 participant_id=self.participant_id,
                 original_text=text,
-                source_language=source_language.split('-')[0]
+                source_language=source_language or ''
             )
+            
+            # Transcrierile noi invalidează sugestiile din cache
+            suggestion_cache.invalidate_meeting(self.meeting_id)
+            
+            # Rezumatul întâlnirii se actualizează în fundal, câte o fereastră completă de transcrieri
+            meeting_summarizer.note_transcript(self.meeting_id, text)
+            
             return transcript.id
         except Exception as e:
             logger.error(f"Eroare la salvare transcript: {str(e)}")
@@ -0,0 +1,134 @@
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from meetings.metrics import DB_EXECUTOR_BUSY, DB_EXECUTOR_QUEUED, DB_EXECUTOR_WAIT_SECONDS, LatencyHistogram
+
+
+class DatabaseExecutor:
+    """
+    Dedicated thread pool for the database calls of the consumers.
+
+    Every thread holds its own Django connection (kept for CONN_MAX_AGE), so
+    max_workers is also the number of connections a process opens for
+    consumer queries: size it to the share of the Postgres / PgBouncer pool
+    given to each process. Calls beyond max_workers wait in the executor
+    queue instead of competing with STT, translation and other blocking work
+    in asgiref's default pool. The queue length and the time calls wait for a
+    thread are exported, so saturation is visible before it shows up as
+    latency.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or settings.DB_EXECUTOR_WORKERS
+        self.executor = None
+        self.lock = threading.Lock()
+
+        self.wait_times = LatencyHistogram()
+
+        # Metrics for monitoring
+        self.metrics = {
+            'calls': 0,
+            'queued': 0,
+            'busy': 0,
+            'errors': 0,
+        }
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Run a synchronous database function in the pool and wait for its result.
+
+        Context variables (trace, current user for the database router) are
+        visible to the function, as with asgiref's sync_to_async.
+
+        Args:
+            func: Synchronous function
+            *args: Positional arguments of func
+            **kwargs: Keyword arguments of func
+
+        Returns:
+            The result of func
+        """
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='db')
+            self.metrics['calls'] += 1
+            self.metrics['queued'] += 1
+        DB_EXECUTOR_QUEUED.inc()
+
+        context = contextvars.copy_context()
+        future = self.executor.submit(context.run, self._call, func, time.monotonic(), args, kwargs)
+        future.add_done_callback(self._discard_if_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def get_metrics(self) -> Dict:
+        """
+        Get executor metrics.
+
+        Returns:
+            Dictionary with executor metrics (wait_time: p50/p90/p99/max over the last window)
+        """
+        with self.lock:
+            metrics = dict(self.metrics, max_workers=self.max_workers)
+        metrics['wait_time'] = self.wait_times.snapshot()
+        return metrics
+
+    def shutdown(self) -> None:
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _call(self, func, queued_at: float, args, kwargs):
+        wait = time.monotonic() - queued_at
+        self.wait_times.record(wait)
+        DB_EXECUTOR_WAIT_SECONDS.observe(wait)
+        with self.lock:
+            self.metrics['queued'] -= 1
+            self.metrics['busy'] += 1
+        DB_EXECUTOR_QUEUED.dec()
+        DB_EXECUTOR_BUSY.inc()
+
+        # Like channels' database_sync_to_async: drop connections that are broken or past CONN_MAX_AGE
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            with self.lock:
+                self.metrics['errors'] += 1
+            raise
+        finally:
+            close_old_connections()
+            with self.lock:
+                self.metrics['busy'] -= 1
+            DB_EXECUTOR_BUSY.dec()
+
+    def _discard_if_cancelled(self, future) -> None:
+        # A call cancelled while still queued never reaches _call
+        if future.cancelled():
+            with self.lock:
+                self.metrics['queued'] -= 1
+            DB_EXECUTOR_QUEUED.dec()
+
+
+def database_sync_to_async(func):
+    """
+    Drop-in replacement for channels' database_sync_to_async that runs func in db_executor.
+
+    Works on functions and on consumer methods (self is passed through).
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await db_executor.run(func, *args, **kwargs)
+    return wrapper
+
+
+# Initialize a singleton instance
+db_executor = DatabaseExecutor()
@@ -0,0 +1,329 @@
+import asyncio
+import base64
+import binascii
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional
+
+from meetings.metrics import INGRESS_OVERLOAD, INGRESS_QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+
+class IngressQueue:
+    """
+    Bounded per-connection queue of client messages waiting to be processed.
+
+    When the queue is full, the overload policy decides what happens to a new
+    message:
+
+    - merge: audio is appended to the newest queued chunk of the same
+      language, so nothing is lost but the number of STT calls stays bounded
+    - drop_oldest: the oldest queued partial is discarded
+    - slow_down: the new message is rejected and the caller should tell the
+      client to reduce its send rate
+
+    With sequence_key set, messages are handed out in ascending order of that
+    field (starting at 0) instead of arrival order. When a number is missing,
+    get() waits up to reorder_timeout for it before skipping the gap; a
+    message whose number was already skipped or handed out is rejected as late.
+    The numbers of dropped and rejected messages are skipped right away, so
+    overload never makes get() wait for a message that will not come.
+    """
+
+    POLICY_MERGE = 'merge'
+    POLICY_DROP_OLDEST = 'drop_oldest'
+    POLICY_SLOW_DOWN = 'slow_down'
+    POLICIES = (POLICY_MERGE, POLICY_DROP_OLDEST, POLICY_SLOW_DOWN)
+
+    def __init__(self, maxsize: int, policy: str = POLICY_MERGE, lane: str = 'speech',
+                 sequence_key: Optional[str] = None, reorder_timeout: float = 0.5):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown ingress overload policy: {policy}")
+
+        self.maxsize = maxsize
+        self.policy = policy
+        self.lane = lane
+        self.sequence_key = sequence_key
+        self.reorder_timeout = reorder_timeout
+        self.next_sequence = 0  # next sequence number expected by get()
+        self.skipped = set()  # numbers of rejected messages, not waited for
+
+        self.items = deque()
+        self.not_empty = asyncio.Event()
+
+        # Metrics for monitoring
+        self.metrics = {
+            'enqueued': 0,
+            'merged': 0,
+            'dropped': 0,
+            'rejected': 0,
+            'late': 0,
+            'gaps': 0,
+            'max_depth': 0,
+        }
+
+    def put(self, message: Dict) -> Optional[str]:
+        """
+        Add a message, applying the overload policy when the queue is full.
+
+        Args:
+            message: Decoded client message
+
+        Returns:
+            None if the message was queued normally, otherwise the action
+            taken: 'merged', 'dropped_oldest', 'rejected' or 'late'
+        """
+        action = None
+
+        sequence = self._sequence(message)
+        if sequence is not None and sequence < self.next_sequence:
+            self.metrics['late'] += 1
+            INGRESS_OVERLOAD.labels(self.lane, 'late').inc()
+            return 'late'
+
+        if len(self.items) >= self.maxsize:
+            if self.policy == self.POLICY_MERGE and self._merge_into_last(message):
+                self.metrics['merged'] += 1
+                INGRESS_OVERLOAD.labels(self.lane, 'merged').inc()
+                return 'merged'
+
+            if self.policy == self.POLICY_SLOW_DOWN:
+                if sequence is not None:
+                    self.skipped.add(sequence)
+                self.metrics['rejected'] += 1
+                INGRESS_OVERLOAD.labels(self.lane, 'rejected').inc()
+                return 'rejected'
+
+            # drop_oldest, or merge not possible for this message
+            dropped = self.items.popleft()
+            if dropped['sequence'] is not None:
+                self._advance(dropped.get('merged_until', dropped['sequence']) + 1)
+            INGRESS_QUEUE_DEPTH.labels(self.lane).dec()
+            self.metrics['dropped'] += 1
+            INGRESS_OVERLOAD.labels(self.lane, 'dropped_oldest').inc()
+            action = 'dropped_oldest'
+
+        item = {'message': message, 'enqueued_at': time.perf_counter(), 'sequence': sequence}
+        if sequence is not None and self.items and self._last_sequence_in_queue() > sequence:
+            # Arrived out of order: insert before the first queued message with a higher number
+            index = next((i for i, queued in enumerate(self.items)
+                          if queued['sequence'] is not None and queued['sequence'] > sequence),
+                         len(self.items))
+            self.items.insert(index, item)
+        else:
+            self.items.append(item)
+        INGRESS_QUEUE_DEPTH.labels(self.lane).inc()
+        self.metrics['enqueued'] += 1
+        self.metrics['max_depth'] = max(self.metrics['max_depth'], len(self.items))
+        self.not_empty.set()
+
+        return action
+
+    async def get(self) -> Dict:
+        """
+        Wait for the next message.
+
+        Returns:
+            Dictionary with the message and enqueued_at (perf_counter timestamp)
+        """
+        while True:
+            while not self.items:
+                self.not_empty.clear()
+                await self.not_empty.wait()
+
+            while self.next_sequence in self.skipped:
+                self._advance(self.next_sequence + 1)
+
+            head = self.items[0]
+            if head['sequence'] is None or head['sequence'] <= self.next_sequence:
+                break
+
+            # Gap in the sequence: give the missing messages a moment to arrive
+            remaining = self.reorder_timeout - (time.perf_counter() - head['enqueued_at'])
+            if remaining <= 0:
+                self.metrics['gaps'] += 1
+                break
+
+            self.not_empty.clear()
+            try:
+                await asyncio.wait_for(self.not_empty.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+
+        INGRESS_QUEUE_DEPTH.labels(self.lane).dec()
+        item = self.items.popleft()
+        if item['sequence'] is not None:
+            self._advance(item.get('merged_until', item['sequence']) + 1)
+        return item
+
+    def qsize(self) -> int:
+        return len(self.items)
+
+    def clear(self) -> None:
+        """Drop all queued messages (e.g. when the connection closes)."""
+        if self.items:
+            INGRESS_QUEUE_DEPTH.labels(self.lane).dec(len(self.items))
+            self.items.clear()
+
+    def _merge_into_last(self, message: Dict) -> bool:
+        """
+        Append the audio of message to the newest queued chunk.
+
+        Returns:
+            True if the message was merged
+        """
+        if not self.items:
+            return False
+
+        sequence = self._sequence(message)
+        last_item = self.items[-1]
+        if sequence is not None and (last_item['sequence'] is None or
+                                     sequence < last_item.get('merged_until', last_item['sequence'])):
+            # Merging an older chunk into a newer one would reorder the audio
+            return False
+
+        last = last_item['message']
+        if last.get('type') != message.get('type') or last.get('language') != message.get('language'):
+            return False
+        if not last.get('audio_data') or not message.get('audio_data'):
+            return False
+
+        try:
+            audio = base64.b64decode(last['audio_data']) + base64.b64decode(message['audio_data'])
+        except (binascii.Error, ValueError):
+            return False
+
+        # The merged chunk keeps the timestamp (and trace) of its first part
+        last['audio_data'] = base64.b64encode(audio).decode('ascii')
+        last['merged_chunks'] = last.get('merged_chunks', 1) + 1
+        if sequence is not None:
+            last_item['merged_until'] = sequence
+        return True
+
+    def _sequence(self, message: Dict) -> Optional[int]:
+        if not self.sequence_key:
+            return None
+        try:
+            return int(message[self.sequence_key])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def _advance(self, sequence: int) -> None:
+        """Move next_sequence forward (never back) and forget the skipped numbers below it."""
+        self.next_sequence = max(self.next_sequence, sequence)
+        if self.skipped:
+            self.skipped = {number for number in self.skipped if number >= self.next_sequence}
+
+    def _last_sequence_in_queue(self) -> int:
+        for queued in reversed(self.items):
+            if queued['sequence'] is not None:
+                return queued.get('merged_until', queued['sequence'])
+        return -1
+
+
+class LaneScheduler:
+    """
+    Per-connection scheduler with one ingress queue and one worker task per lane.
+
+    Ordering guarantees:
+
+    - within a lane, messages are processed one at a time, in arrival order
+      (or in sequence-number order for lanes created with sequence_key, see
+      IngressQueue)
+    - across lanes there is no ordering: a slow message in one lane never
+      delays the others, e.g. chat and control requests are answered while a
+      speech chunk is still being translated
+    - messages submitted with submit_task() run immediately in their own task
+      and are not ordered at all
+
+    A failing message is logged and does not stop its lane.
+    """
+
+    def __init__(self, handler: Callable[[str, Dict], Awaitable[None]]):
+        """
+        Args:
+            handler: Coroutine function called as handler(lane, item) for each
+                queued item (dictionary with message and enqueued_at)
+        """
+        self.handler = handler
+        self.queues = {}  # lane -> IngressQueue
+        self.workers = {}  # lane -> asyncio.Task
+        self.tasks = set()  # unordered tasks still running
+
+    def add_lane(self, lane: str, maxsize: int, policy: str = IngressQueue.POLICY_DROP_OLDEST,
+                 sequence_key: Optional[str] = None, reorder_timeout: float = 0.5) -> IngressQueue:
+        """
+        Create a lane; its worker starts with start().
+
+        Args:
+            lane: Lane name (speech, chat, control, ...)
+            maxsize: Maximum number of queued messages
+            policy: Overload policy of the lane's queue
+            sequence_key: Message field that orders the lane (optional)
+            reorder_timeout: Seconds to wait for a missing sequence number
+
+        Returns:
+            The lane's IngressQueue
+        """
+        queue = self.queues[lane] = IngressQueue(maxsize, policy=policy, lane=lane,
+                                                 sequence_key=sequence_key,
+                                                 reorder_timeout=reorder_timeout)
+        return queue
+
+    def start(self) -> None:
+        """Start one worker task per lane."""
+        for lane in self.queues:
+            if lane not in self.workers:
+                self.workers[lane] = asyncio.ensure_future(self._run_lane(lane))
+
+    def submit(self, lane: str, message: Dict) -> Optional[str]:
+        """
+        Queue a message on a lane.
+
+        Returns:
+            None or the overload action taken (see IngressQueue.put)
+        """
+        return self.queues[lane].put(message)
+
+    def submit_task(self, coroutine) -> asyncio.Task:
+        """Run a coroutine outside of any lane."""
+        task = asyncio.ensure_future(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    def get_metrics(self) -> Dict[str, Dict]:
+        """
+        Get queue metrics per lane.
+
+        Returns:
+            Dictionary keyed by lane with queue depth and overload counters
+        """
+        return {lane: dict(queue.metrics, depth=queue.qsize()) for lane, queue in self.queues.items()}
+
+    async def stop(self) -> None:
+        """Cancel all workers and tasks and drop queued messages."""
+        tasks = list(self.workers.values()) + list(self.tasks)
+        self.workers = {}
+        self.tasks = set()
+
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        for queue in self.queues.values():
+            queue.clear()
+
+    async def _run_lane(self, lane: str) -> None:
+        queue = self.queues[lane]
+        while True:
+            item = await queue.get()
+            try:
+                await self.handler(lane, item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error processing {lane} message: {str(e)}")
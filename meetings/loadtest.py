@@ -0,0 +1,342 @@
+import asyncio
+import itertools
+import json
+import logging
+import random
+import resource
+import time
+from typing import Dict, List, Optional
+from unittest import mock
+
+from channels.layers import channel_layers
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import AnonymousUser
+from django.test import override_settings
+from django.urls import re_path
+
+from meetings.consumers import MeetingConsumer
+from meetings.metrics import LatencyHistogram
+from meetings.serialization import encode_frame, frame_event, orjson
+from translate_api.services import SpeechProcessingService, TranslationService
+
+logger = logging.getLogger(__name__)
+
+
+class LoadTestConsumer(MeetingConsumer):
+    """
+    MeetingConsumer with the database helpers replaced by in-memory state,
+    so the socket/pipeline path can be measured without Postgres.
+    """
+
+    participant_ids = itertools.count(1)
+    transcript_ids = itertools.count(1)
+    languages = ['en', 'ro']
+
+    async def check_meeting_exists(self):
+        return True
+
+    async def add_participant(self):
+        self.loadtest_participant_id = next(self.participant_ids)
+        return self.loadtest_participant_id
+
+    async def mark_participant_left(self):
+        pass
+
+    async def get_participant_name(self):
+        return f"Participant-{self.participant_id}"
+
+    async def get_meeting_info(self):
+        return {'id': self.meeting_id, 'title': f"Load test {self.meeting_id}", 'status': 'live',
+                'source_language': 'en', 'target_language': 'ro'}
+
+    async def get_participant_languages(self):
+        return list(self.languages)
+
+    async def get_participants(self):
+        return []
+
+    async def get_glossaries(self):
+        return None
+
+    async def save_transcript(self, text, source_language):
+        return next(self.transcript_ids)
+
+    async def save_translation(self, transcript_id, translated_text, target_language):
+        return True
+
+
+class AnonymousUserMiddleware:
+    """Adds an anonymous user to the scope (the consumer expects scope['user'])."""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    async def __call__(self, scope, receive, send):
+        return await self.inner(dict(scope, user=AnonymousUser()), receive, send)
+
+
+class MeetingLoadTest:
+    """
+    Simulates N meetings x M participants against MeetingConsumer.
+
+    Clients connect through Channels' WebsocketCommunicator over an
+    InMemoryChannelLayer, so the run needs neither Redis nor Postgres. STT
+    and translation are replaced by stubs that block for a configurable
+    time, like the real synchronous providers do. Every client sends speech
+    and chat at a jittered rate and measures delivery latency of the frames
+    it receives from the other participants.
+    """
+
+    def __init__(self, meetings: int = 5, participants: int = 4, duration: float = 30,
+                 speech_interval: float = 2.0, chat_interval: float = 15.0,
+                 stt_latency: float = 0.05, translation_latency: float = 0.03,
+                 languages: Optional[List[str]] = None):
+        self.meetings = meetings
+        self.participants = participants
+        self.duration = duration
+        self.speech_interval = speech_interval
+        self.chat_interval = chat_interval
+        self.stt_latency = stt_latency
+        self.translation_latency = translation_latency
+        self.languages = languages or ['en', 'ro']
+
+        self.transcript_numbers = itertools.count(1)
+        self.delivery_latency = LatencyHistogram(window_seconds=None)
+        self.loop_lag = LatencyHistogram(window_seconds=None)
+        self.counters = {
+            'connected': 0,
+            'connect_failures': 0,
+            'sent_speech': 0,
+            'sent_chat': 0,
+            'received': 0,
+        }
+
+    def run(self) -> Dict:
+        """
+        Run the simulation.
+
+        Returns:
+            Dictionary with throughput, latency, event-loop lag and memory figures
+        """
+        layers = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer',
+                              'CONFIG': {'capacity': 10000}}}
+
+        with override_settings(CHANNEL_LAYERS=layers), \
+                mock.patch.object(SpeechProcessingService, 'process_speech_chunk',
+                                  staticmethod(self._stub_stt)), \
+                mock.patch.object(TranslationService, 'translate_text',
+                                  staticmethod(self._stub_translate)), \
+                mock.patch.object(LoadTestConsumer, 'languages', self.languages):
+            channel_layers.backends = {}
+            try:
+                return asyncio.run(self._run())
+            finally:
+                channel_layers.backends = {}
+
+    async def _run(self) -> Dict:
+        application = AnonymousUserMiddleware(URLRouter([
+            re_path(r'^ws/meeting/(?P<meeting_id>\w+)/$', LoadTestConsumer.as_asgi()),
+        ]))
+
+        clients = []
+        for meeting in range(1, self.meetings + 1):
+            for _ in range(self.participants):
+                communicator = WebsocketCommunicator(application, f"/ws/meeting/{meeting}/")
+                connected, _ = await communicator.connect()
+                if connected:
+                    self.counters['connected'] += 1
+                    clients.append(communicator)
+                else:
+                    self.counters['connect_failures'] += 1
+
+        stop = asyncio.Event()
+        lag_task = asyncio.ensure_future(self._measure_loop_lag(stop))
+        tasks = []
+        for communicator in clients:
+            tasks.append(asyncio.ensure_future(self._receive(communicator, stop)))
+            tasks.append(asyncio.ensure_future(self._send(communicator, stop)))
+
+        started = time.perf_counter()
+        await asyncio.sleep(self.duration)
+        stop.set()
+        elapsed = time.perf_counter() - started
+
+        await asyncio.gather(*tasks, lag_task, return_exceptions=True)
+        for communicator in clients:
+            await communicator.disconnect()
+
+        return self._report(elapsed)
+
+    async def _send(self, communicator: WebsocketCommunicator, stop: asyncio.Event) -> None:
+        """Send speech chunks and chat messages at jittered intervals."""
+        next_speech = time.perf_counter() + random.uniform(0, self.speech_interval)
+        next_chat = time.perf_counter() + random.uniform(0, self.chat_interval)
+        speech_seq = itertools.count()
+
+        while not stop.is_set():
+            now = time.perf_counter()
+            if now >= next_speech:
+                await communicator.send_to(text_data=json.dumps({
+                    'type': 'speech',
+                    'seq': next(speech_seq),
+                    'audio_data': 'UklGRiQAAABXQVZFZm10IBAAAAABAAEA',
+                    'language': 'en-US',
+                    'timestamp': time.perf_counter()
+                }))
+                self.counters['sent_speech'] += 1
+                next_speech = now + self.speech_interval * random.uniform(0.8, 1.2)
+
+            if self.chat_interval and now >= next_chat:
+                await communicator.send_to(text_data=json.dumps({
+                    'type': 'chat_message',
+                    'message': 'Load test chat message',
+                    'language': 'en',
+                    'timestamp': time.perf_counter()
+                }))
+                self.counters['sent_chat'] += 1
+                next_chat = now + self.chat_interval * random.uniform(0.8, 1.2)
+
+            wake_at = min(next_speech, next_chat) if self.chat_interval else next_speech
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=max(0, wake_at - time.perf_counter()))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _receive(self, communicator: WebsocketCommunicator, stop: asyncio.Event) -> None:
+        """Read frames and record delivery latency of speech/chat broadcasts."""
+        while not stop.is_set():
+            # receive_output() cancels the application on timeout, so read the queue directly
+            try:
+                output = await asyncio.wait_for(communicator.output_queue.get(), timeout=0.5)
+            except asyncio.TimeoutError:
+                continue
+
+            if output.get('type') != 'websocket.send' or not output.get('text'):
+                continue
+
+            frames = json.loads(output['text'])
+            # With outbound batching several frames arrive as one array
+            for frame in frames if isinstance(frames, list) else [frames]:
+                self._record_frame(frame)
+
+    def _record_frame(self, frame: Dict) -> None:
+        if frame.get('type') in ('speech', 'chat') and isinstance(frame.get('timestamp'), float):
+            self.counters['received'] += 1
+            self.delivery_latency.record(time.perf_counter() - frame['timestamp'])
+
+    async def _measure_loop_lag(self, stop: asyncio.Event, interval: float = 0.01) -> None:
+        """Measure how late the event loop wakes up a sleeping task."""
+        while not stop.is_set():
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            self.loop_lag.record(max(0.0, time.perf_counter() - expected))
+
+    def _stub_stt(self, audio_data, language='en-US'):
+        time.sleep(self.stt_latency)
+        # Distinct text per chunk: identical chunks would be dropped as overlap repeats
+        return f"This is load test transcript {next(self.transcript_numbers)}."
+
+    def _stub_translate(self, text, source_lang='auto', target_lang='en', glossary=None):
+        time.sleep(self.translation_latency)
+        return f"[{target_lang}] {text}"
+
+    def _report(self, elapsed: float) -> Dict:
+        sent = self.counters['sent_speech'] + self.counters['sent_chat']
+        return {
+            'meetings': self.meetings,
+            'participants_per_meeting': self.participants,
+            'duration_seconds': round(elapsed, 2),
+            'connected': self.counters['connected'],
+            'connect_failures': self.counters['connect_failures'],
+            'messages_sent': sent,
+            'messages_delivered': self.counters['received'],
+            'sent_per_second': round(sent / elapsed, 2) if elapsed else 0,
+            'delivered_per_second': round(self.counters['received'] / elapsed, 2) if elapsed else 0,
+            'delivery_latency': self.delivery_latency.snapshot(),
+            'event_loop_lag': self.loop_lag.snapshot(),
+            # ru_maxrss is reported in kilobytes on Linux
+            'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        }
+
+
+class FanoutBenchmark:
+    """
+    Microbenchmark of the CPU spent serializing one broadcast, by meeting size.
+
+    Compares the per-recipient path (every consumer rebuilds the frame and
+    encodes it) with the serialize-once path (the sender encodes the frame
+    and every consumer forwards the text). Both paths use encode_frame, so
+    the result measures only the number of encodings, not the encoder.
+    """
+
+    def __init__(self, sizes: Optional[List[int]] = None, iterations: int = 2000,
+                 languages: Optional[List[str]] = None, text_length: int = 200):
+        self.sizes = sizes or [2, 5, 10, 20, 50]
+        self.iterations = iterations
+        self.languages = languages or ['en', 'ro', 'de']
+        self.text_length = text_length
+
+    def run(self) -> Dict:
+        """
+        Run the benchmark.
+
+        Returns:
+            Dictionary with the encoder used and CPU microseconds per broadcast per meeting size
+        """
+        text = ("Acesta este un mesaj de test pentru traducere în timp real. " * 10)[:self.text_length]
+        event = {
+            'type': 'speech_message',
+            'participant_id': 17,
+            'name': 'Participant-17',
+            'original_text': text,
+            'original_language': 'ro-RO',
+            'translations': {lang: f"[{lang}] {text}" for lang in self.languages},
+            'timestamp': time.time(),
+        }
+
+        results = []
+        for size in self.sizes:
+            per_recipient = self._measure(lambda: self._per_recipient(event, size))
+            serialize_once = self._measure(lambda: self._serialize_once(event, size))
+            results.append({
+                'participants': size,
+                'per_recipient_us': round(per_recipient * 1e6, 2),
+                'serialize_once_us': round(serialize_once * 1e6, 2),
+                'speedup': round(per_recipient / serialize_once, 2) if serialize_once else None,
+            })
+
+        return {'encoder': 'orjson' if orjson is not None else 'json', 'results': results}
+
+    def _measure(self, broadcast) -> float:
+        """CPU seconds per broadcast (process time, so waits are not counted)."""
+        broadcast()  # warm up
+        started = time.process_time()
+        for _ in range(self.iterations):
+            broadcast()
+        return (time.process_time() - started) / self.iterations
+
+    def _per_recipient(self, event: Dict, size: int) -> None:
+        for _ in range(size):
+            encode_frame({
+                'type': 'speech',
+                'participant_id': event['participant_id'],
+                'name': event['name'],
+                'original_text': event['original_text'],
+                'original_language': event['original_language'],
+                'translations': event['translations'],
+                'timestamp': event['timestamp']
+            })
+
+    def _serialize_once(self, event: Dict, size: int) -> None:
+        outbound = frame_event('speech_message', {
+            'type': 'speech',
+            'participant_id': event['participant_id'],
+            'name': event['name'],
+            'original_text': event['original_text'],
+            'original_language': event['original_language'],
+            'translations': event['translations'],
+            'timestamp': event['timestamp']
+        })
+        for _ in range(size):
+            outbound['frame']  # each recipient forwards the ready-made text
@@ -0,0 +1,30 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from meetings.archive import ArchiveRunInProgress, archive_completed_meetings
+
+
+class Command(BaseCommand):
+    help = ("Mută transcrierile și traducerile meeting-urilor încheiate mai vechi de N zile "
+            "în arhiva comprimată (segmente JSONL), golind tabelele Transcript/Translation.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help="Vechimea minimă în zile (implicit TRANSCRIPT_ARCHIVE_AFTER_DAYS)")
+        parser.add_argument('--limit', type=int, default=None, help="Număr maxim de meeting-uri arhivate")
+        parser.add_argument('--json', action='store_true', help="Afișează raportul ca JSON")
+
+    def handle(self, *args, **options):
+        try:
+            archived = archive_completed_meetings(older_than_days=options['days'], limit=options['limit'])
+        except ArchiveRunInProgress as e:
+            raise CommandError(f"Arhivarea rulează deja: {e}")
+
+        if options['json']:
+            self.stdout.write(json.dumps(archived, indent=2))
+            return
+
+        for item in archived:
+            self.stdout.write(f"meeting {item['meeting_id']}: {item['rows']} transcrieri arhivate")
+        self.stdout.write(self.style.SUCCESS(f"{len(archived)} meeting-uri arhivate"))
@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from meetings.loadtest import FanoutBenchmark
+
+
+class Command(BaseCommand):
+    help = ("Măsoară CPU-ul consumat pentru serializarea unui broadcast în funcție de mărimea "
+            "meeting-ului: encodare per destinatar vs. frame serializat o singură dată (același encoder).")
+
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='2,5,10,20,50', help="Mărimi de meeting, separate prin virgulă")
+        parser.add_argument('--iterations', type=int, default=2000, help="Broadcast-uri per mărime")
+        parser.add_argument('--languages', default='en,ro,de', help="Limbile traducerilor din frame")
+        parser.add_argument('--text-length', type=int, default=200, help="Lungimea textului (caractere)")
+        parser.add_argument('--json', action='store_true', help="Afișează raportul ca JSON")
+
+    def handle(self, *args, **options):
+        report = FanoutBenchmark(
+            sizes=[int(size) for size in options['sizes'].split(',') if size.strip()],
+            iterations=options['iterations'],
+            languages=[lang.strip() for lang in options['languages'].split(',') if lang.strip()],
+            text_length=options['text_length'],
+        ).run()
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"encoder: {report['encoder']}")
+        self.stdout.write(f"{'participants':>12} {'per recipient (us)':>20} {'serialize once (us)':>20} {'speedup':>8}")
+        for row in report['results']:
+            self.stdout.write(f"{row['participants']:>12} {row['per_recipient_us']:>20} "
+                              f"{row['serialize_once_us']:>20} {row['speedup']:>8}")
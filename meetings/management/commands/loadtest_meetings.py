@@ -0,0 +1,48 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from meetings.loadtest import MeetingLoadTest
+
+
+class Command(BaseCommand):
+    help = ("Simulează N meeting-uri x M participanți pe MeetingConsumer (channel layer în memorie, "
+            "STT/traducere simulate) și raportează throughput, latență, lag event loop și memorie.")
+
+    # Rulează fără Redis/Postgres, deci fără verificările de sistem care ating baza de date
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--meetings', type=int, default=5)
+        parser.add_argument('--participants', type=int, default=4, help="Participanți per meeting")
+        parser.add_argument('--duration', type=float, default=30, help="Durata rulării (secunde)")
+        parser.add_argument('--speech-interval', type=float, default=2.0,
+                            help="Secunde între fragmentele audio trimise de un participant")
+        parser.add_argument('--chat-interval', type=float, default=15.0,
+                            help="Secunde între mesajele de chat (0 = fără chat)")
+        parser.add_argument('--stt-latency', type=float, default=0.05, help="Latența STT simulată (secunde)")
+        parser.add_argument('--translation-latency', type=float, default=0.03,
+                            help="Latența traducerii simulate (secunde)")
+        parser.add_argument('--languages', default='en,ro', help="Limbile participanților, separate prin virgulă")
+        parser.add_argument('--json', action='store_true', help="Afișează raportul ca JSON")
+
+    def handle(self, *args, **options):
+        report = MeetingLoadTest(
+            meetings=options['meetings'],
+            participants=options['participants'],
+            duration=options['duration'],
+            speech_interval=options['speech_interval'],
+            chat_interval=options['chat_interval'],
+            stt_latency=options['stt_latency'],
+            translation_latency=options['translation_latency'],
+            languages=[lang.strip() for lang in options['languages'].split(',') if lang.strip()],
+        ).run()
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        for key, value in report.items():
+            if isinstance(value, dict):
+                value = ', '.join(f"{k}={v}" for k, v in value.items())
+            self.stdout.write(f"{key:>26}: {value}")
@@ -0,0 +1,44 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from meetings.partitions import drop_expired_partitions, ensure_partitions
+
+
+class Command(BaseCommand):
+    help = ("Creează partițiile lunare viitoare pentru Transcript/Translation și detașează/șterge "
+            "partițiile expirate (Postgres). Rulat periodic, de exemplu zilnic din cron.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, default=None,
+                            help="Luni create în avans (implicit TRANSCRIPT_PARTITION_MONTHS_AHEAD)")
+        parser.add_argument('--retention-months', type=int, default=None,
+                            help="Luni păstrate (implicit TRANSCRIPT_PARTITION_RETENTION_MONTHS; 0 = toate)")
+        parser.add_argument('--detach-only', action='store_true',
+                            help="Doar detașează partițiile expirate, fără DROP")
+        parser.add_argument('--force', action='store_true',
+                            help="Șterge și partițiile cu meeting-uri nearhivate")
+        parser.add_argument('--dry-run', action='store_true', help="Afișează doar ce s-ar schimba")
+        parser.add_argument('--json', action='store_true', help="Afișează raportul ca JSON")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write("Partiționarea este disponibilă doar pe Postgres; nimic de făcut.")
+            return
+
+        created = ensure_partitions(months_ahead=options['months_ahead'], dry_run=options['dry_run'])
+        removed = drop_expired_partitions(retention_months=options['retention_months'],
+                                          detach_only=options['detach_only'], force=options['force'],
+                                          dry_run=options['dry_run'])
+
+        if options['json']:
+            self.stdout.write(json.dumps({'created': created, 'removed': removed}, indent=2))
+            return
+
+        for name in created:
+            self.stdout.write(f"creat: {name}")
+        for item in removed:
+            self.stdout.write(f"{item['action']}: {item['partition']}")
+        self.stdout.write(self.style.SUCCESS(f"{len(created)} partiții create, "
+                                             f"{sum(item['action'] != 'skipped' for item in removed)} eliminate"))
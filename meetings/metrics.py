@@ -0,0 +1,361 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Sequence, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+
+
+class LatencyHistogram:
+    """
+    Fixed-memory streaming histogram for latencies (in seconds).
+
+    Values are counted in logarithmic buckets, each about 9% wider than the
+    previous one, so percentiles have a bounded relative error and memory
+    does not grow with the number of samples. Samples are kept for a
+    rolling window: the histogram rotates every `window_seconds` and reports
+    cover the current and the previous window.
+    """
+
+    MIN_VALUE = 0.0001  # 0.1 ms
+    MAX_VALUE = 600.0  # 10 minutes
+    BUCKETS_PER_DOUBLING = 8
+
+    def __init__(self, window_seconds: Optional[float] = 300):
+        self.window_seconds = window_seconds
+
+        self.growth = 2 ** (1 / self.BUCKETS_PER_DOUBLING)
+        self.num_buckets = int(math.ceil(math.log(self.MAX_VALUE / self.MIN_VALUE, self.growth))) + 2
+
+        self.lock = threading.Lock()
+        self.current = self._empty_window()
+        self.previous = self._empty_window()
+        self.window_started = time.monotonic()
+
+    def record(self, value: float) -> None:
+        """
+        Record one latency sample.
+
+        Args:
+            value: Duration in seconds
+        """
+        index = self._bucket_index(value)
+
+        with self.lock:
+            self._rotate_if_needed()
+            window = self.current
+            window['buckets'][index] += 1
+            window['count'] += 1
+            window['sum'] += value
+            if value > window['max']:
+                window['max'] = value
+
+    def snapshot(self) -> Dict:
+        """
+        Get percentiles for the current reporting window.
+
+        Returns:
+            Dictionary with count, mean, p50, p90, p99 and max (seconds)
+        """
+        with self.lock:
+            self._rotate_if_needed()
+            buckets = [a + b for a, b in zip(self.current['buckets'], self.previous['buckets'])]
+            count = self.current['count'] + self.previous['count']
+            total = self.current['sum'] + self.previous['sum']
+            maximum = max(self.current['max'], self.previous['max'])
+
+        if not count:
+            return {'count': 0, 'mean': 0, 'p50': 0, 'p90': 0, 'p99': 0, 'max': 0}
+
+        return {
+            'count': count,
+            'mean': round(total / count, 4),
+            'p50': round(min(self._percentile(buckets, count, 0.50), maximum), 4),
+            'p90': round(min(self._percentile(buckets, count, 0.90), maximum), 4),
+            'p99': round(min(self._percentile(buckets, count, 0.99), maximum), 4),
+            'max': round(maximum, 4),
+        }
+
+    def reset(self) -> None:
+        """Drop all recorded samples."""
+        with self.lock:
+            self.current = self._empty_window()
+            self.previous = self._empty_window()
+            self.window_started = time.monotonic()
+
+    def _empty_window(self) -> Dict:
+        return {'buckets': [0] * self.num_buckets, 'count': 0, 'sum': 0.0, 'max': 0.0}
+
+    def _rotate_if_needed(self) -> None:
+        """Start a new window once the current one is older than window_seconds (lock held)."""
+        if not self.window_seconds:
+            return
+
+        now = time.monotonic()
+        elapsed = now - self.window_started
+        if elapsed < self.window_seconds:
+            return
+
+        # More than two windows without samples: nothing worth keeping
+        self.previous = self.current if elapsed < 2 * self.window_seconds else self._empty_window()
+        self.current = self._empty_window()
+        self.window_started = now
+
+    def _bucket_index(self, value: float) -> int:
+        if value <= self.MIN_VALUE:
+            return 0
+        index = int(math.log(value / self.MIN_VALUE, self.growth)) + 1
+        return min(index, self.num_buckets - 1)
+
+    def _bucket_upper_bound(self, index: int) -> float:
+        return self.MIN_VALUE * self.growth ** index
+
+    def _percentile(self, buckets, count: int, quantile: float) -> float:
+        rank = max(1, math.ceil(quantile * count))
+        seen = 0
+        for index, bucket_count in enumerate(buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return self._bucket_upper_bound(index)
+        return self._bucket_upper_bound(len(buckets) - 1)
+
+
+class LabeledLatencyHistograms:
+    """
+    A set of LatencyHistogram instances keyed by label values
+    (e.g. meeting type and user role).
+    """
+
+    def __init__(self, label_names: Sequence[str], window_seconds: Optional[float] = 300):
+        self.label_names = tuple(label_names)
+        self.window_seconds = window_seconds
+
+        self.histograms = {}  # label values -> LatencyHistogram
+        self.lock = threading.Lock()
+
+    def labels(self, *values) -> LatencyHistogram:
+        """
+        Get the histogram for a combination of label values.
+
+        Args:
+            values: One value for each label name
+
+        Returns:
+            LatencyHistogram for these labels
+        """
+        key = tuple(str(value) for value in values)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(key, LatencyHistogram(self.window_seconds))
+        return histogram
+
+    def record(self, value: float, *values) -> None:
+        """
+        Record one latency sample for a combination of label values.
+
+        Args:
+            value: Duration in seconds
+            values: One value for each label name
+        """
+        self.labels(*values).record(value)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Get percentiles for every label combination.
+
+        Returns:
+            Dictionary keyed by "value1/value2/..." with histogram snapshots
+        """
+        with self.lock:
+            items = list(self.histograms.items())
+        return {"/".join(key): histogram.snapshot() for key, histogram in items}
+
+    def totals(self) -> Tuple[int, float]:
+        """
+        Get the number of samples and their sum across all labels.
+
+        Returns:
+            Tuple (count, sum in seconds)
+        """
+        count = 0
+        total = 0.0
+        with self.lock:
+            items = list(self.histograms.values())
+        for histogram in items:
+            with histogram.lock:
+                histogram._rotate_if_needed()
+                count += histogram.current['count'] + histogram.previous['count']
+                total += histogram.current['sum'] + histogram.previous['sum']
+        return count, total
+
+    def reset(self) -> None:
+        """Drop all recorded samples."""
+        with self.lock:
+            self.histograms = {}
+
+
+# Prometheus metrics for the real-time path, exposed on /metrics by django-prometheus
+
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+PIPELINE_STAGE_SECONDS = Histogram(
+    'meeting_pipeline_stage_seconds',
+    'Duration of each stage of the real-time meeting pipeline',
+    ['stage'],
+    buckets=STAGE_BUCKETS,
+)
+
+TRANSLATION_SECONDS = Histogram(
+    'meeting_translation_seconds',
+    'Duration of translation provider calls per language pair',
+    ['source_language', 'target_language'],
+    buckets=STAGE_BUCKETS,
+)
+
+PIPELINE_MESSAGES = Counter(
+    'meeting_pipeline_messages_total',
+    'Messages received from meeting clients',
+    ['message_type'],
+)
+
+PIPELINE_QUEUE_DEPTH = Gauge(
+    'meeting_pipeline_queue_depth',
+    'Client messages received but not yet fully processed',
+    ['lane'],
+)
+
+INGRESS_QUEUE_DEPTH = Gauge(
+    'meeting_ingress_queue_depth',
+    'Client messages waiting in per-connection ingress queues',
+    ['lane'],
+)
+
+INGRESS_OVERLOAD = Counter(
+    'meeting_ingress_overload_total',
+    'Messages merged, dropped or rejected because an ingress queue was full',
+    ['lane', 'action'],
+)
+
+OUTBOUND_BATCH_SIZE = Histogram(
+    'meeting_outbound_batch_frames',
+    'Frames sent to a client in one WebSocket frame when outbound batching is enabled',
+    buckets=(1, 2, 5, 10, 20, 50, 100),
+)
+
+CHANNEL_LAYER_DELIVERIES = Counter(
+    'meeting_channel_layer_deliveries_total',
+    'Group messages delivered in-process (local), published to Redis for another node (remote) '
+    'or dropped because the member channel was full (full)',
+    ['path'],
+)
+
+REDIS_SHARD_UP = Gauge(
+    'meeting_redis_shard_up',
+    'Whether the last health check of a channel layer Redis shard succeeded',
+    ['shard'],
+)
+
+REDIS_SHARD_PING_SECONDS = Gauge(
+    'meeting_redis_shard_ping_seconds',
+    'Round-trip time of the last health check of a channel layer Redis shard',
+    ['shard'],
+)
+
+REDIS_SHARD_GROUPS = Gauge(
+    'meeting_redis_shard_groups',
+    'Groups with members in this process, per channel layer Redis shard',
+    ['shard'],
+)
+
+LANGUAGE_DETECTIONS = Counter(
+    'meeting_language_detections_total',
+    'Language identification runs (cache misses), by outcome',
+    ['result'],
+)
+
+TRANSLATIONS_SKIPPED = Counter(
+    'meeting_translations_skipped_total',
+    'Translations not sent to the provider because the text is already in the target language',
+    ['target_language'],
+)
+
+TRANSCRIPT_OVERLAP_TOKENS = Counter(
+    'meeting_transcript_overlap_tokens_total',
+    'Transcribed tokens dropped because they repeat the end of the previous chunk',
+)
+
+PROVIDER_ERRORS = Counter(
+    'meeting_provider_errors_total',
+    'Errors returned by external providers (STT, translation, LLM)',
+    ['provider'],
+)
+
+DB_EXECUTOR_QUEUED = Gauge(
+    'meeting_db_executor_queued',
+    'Consumer database calls waiting for a thread of the database executor',
+)
+
+DB_EXECUTOR_BUSY = Gauge(
+    'meeting_db_executor_busy',
+    'Database executor threads running a call',
+)
+
+DB_EXECUTOR_WAIT_SECONDS = Histogram(
+    'meeting_db_executor_wait_seconds',
+    'Time consumer database calls wait in the queue of the database executor',
+    buckets=STAGE_BUCKETS,
+)
+
+# No meeting_id label: one series per meeting would grow with every meeting ever held
+ACTIVE_SOCKETS = Gauge(
+    'meeting_active_sockets',
+    'Open meeting WebSocket connections',
+)
+
+ACTIVE_MEETINGS = Gauge(
+    'meeting_active_meetings',
+    'Meetings with at least one open WebSocket connection in this process',
+)
+
+_active_socket_counts = {}  # meeting_id -> open connections in this process
+_active_socket_lock = threading.Lock()
+
+
+@contextmanager
+def observe_stage(stage: str):
+    """
+    Time a block of code as one pipeline stage.
+
+    Args:
+        stage: Stage name (decode, stt, translation, db, fanout, client_send, ...)
+    """
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        PIPELINE_STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start_time)
+
+
+def socket_opened(meeting_id) -> None:
+    """Count an accepted WebSocket connection for a meeting."""
+    with _active_socket_lock:
+        count = _active_socket_counts.get(str(meeting_id), 0) + 1
+        _active_socket_counts[str(meeting_id)] = count
+        ACTIVE_SOCKETS.inc()
+        ACTIVE_MEETINGS.set(len(_active_socket_counts))
+
+
+def socket_closed(meeting_id) -> None:
+    """Count a closed WebSocket connection; the meeting is forgotten at zero."""
+    with _active_socket_lock:
+        count = _active_socket_counts.get(str(meeting_id), 0)
+        if count == 0:
+            return
+        if count > 1:
+            _active_socket_counts[str(meeting_id)] = count - 1
+        else:
+            _active_socket_counts.pop(str(meeting_id))
+        ACTIVE_SOCKETS.dec()
+        ACTIVE_MEETINGS.set(len(_active_socket_counts))
@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("meetings", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="meeting",
+            name="summary",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="meeting",
+            name="summary_transcript_id",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("meetings", "0002_meeting_summary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="meeting",
+            name="archived_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="meeting",
+            name="archive_segment",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="meeting",
+            name="archive_offset",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="meeting",
+            name="archive_length",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
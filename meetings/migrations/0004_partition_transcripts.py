@@ -0,0 +1,152 @@
+from datetime import date
+
+from django.db import migrations, models, transaction
+import django.db.models.deletion
+
+# Transcript and Translation become Postgres tables partitioned by month on "timestamp".
+# The primary key of a partitioned table must include the partition key, so it is
+# (id, timestamp); ids still come from one sequence and stay unique. Translation.transcript
+# can no longer be a database foreign key (it would need a unique constraint on id alone).
+# Other databases keep plain tables.
+#
+# The migration is not atomic, so it does not hold locks for the whole copy:
+# 1. one short transaction renames each table to <table>_legacy and puts the new table in
+#    its place, so the application writes to the new table from then on;
+# 2. the legacy rows are copied in batches of COPY_BATCH_SIZE ids, one transaction each;
+# 3. the legacy table is dropped.
+# Until step 2 finishes, reads miss the rows not copied yet (transcripts of past meetings
+# look incomplete), so run it when few meetings are live and do not archive meetings
+# meanwhile. If it is interrupted, the copy is resumed by running copy_rows for the
+# remaining ids; the legacy table is only dropped after a complete copy.
+
+TABLES = {
+    'meetings_transcript': {
+        'indexes': ['meeting_id', 'participant_id'],
+        'foreign_keys': {'meeting_id': 'meetings_meeting', 'participant_id': 'meetings_meetingparticipant'},
+    },
+    'meetings_translation': {
+        'indexes': ['transcript_id'],
+        'foreign_keys': {},
+    },
+}
+
+MONTHS_AHEAD = 3
+COPY_BATCH_SIZE = 10000
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def swap_table(cursor, table, spec, partitioned):
+    """Rename table to <table>_legacy and create the new (partitioned or plain) table in its place."""
+    legacy = f"{table}_legacy"
+
+    cursor.execute("SELECT attidentity FROM pg_attribute WHERE attrelid = %s::regclass AND attname = 'id'", [table])
+    is_identity = cursor.fetchone()[0] in ('a', 'd')
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+    sequence = cursor.fetchone()[0]
+
+    cursor.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    suffix = '_part' if partitioned else ''
+    partition_clause = ' PARTITION BY RANGE ("timestamp")' if partitioned else ''
+    cursor.execute(f'CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING IDENTITY){partition_clause}')
+    primary_key = 'id, "timestamp"' if partitioned else 'id'
+    cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}{suffix}_pkey PRIMARY KEY ({primary_key})')
+    for column in spec['indexes']:
+        cursor.execute(f"CREATE INDEX {table}{suffix}_{column} ON {table} ({column})")
+    for column, target in spec['foreign_keys'].items():
+        cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}{suffix}_{column}_fk FOREIGN KEY ({column}) "
+                       f"REFERENCES {target} (id) DEFERRABLE INITIALLY DEFERRED")
+
+    if partitioned:
+        # Monthly partitions from the oldest row to a few months ahead, plus a default partition
+        cursor.execute(f'SELECT MIN("timestamp") FROM {legacy}')
+        oldest = cursor.fetchone()[0]
+        today = date.today()
+        month = date(oldest.year, oldest.month, 1) if oldest else date(today.year, today.month, 1)
+        last = add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+        while month <= last:
+            upper = add_months(month, 1)
+            cursor.execute(f"CREATE TABLE {table}_p{month.year:04d}_{month.month:02d} PARTITION OF {table} "
+                           f"FOR VALUES FROM ('{month.isoformat()} 00:00:00') TO ('{upper.isoformat()} 00:00:00')")
+            month = upper
+        cursor.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    # New rows written during the copy must not reuse the ids of legacy rows
+    if is_identity:
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+        new_sequence = cursor.fetchone()[0]
+        cursor.execute(f"SELECT setval(%s, COALESCE((SELECT MAX(id) FROM {legacy}), 0) + 1, false)",
+                       [new_sequence])
+    elif sequence:
+        # serial column: the copied default still uses the old sequence, which must outlive the legacy table
+        cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+
+
+def copy_rows(connection, table, batch_size=COPY_BATCH_SIZE):
+    """Copy <table>_legacy into table in id ranges, one transaction per batch; returns the copied row count."""
+    legacy = f"{table}_legacy"
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT MIN(id), MAX(id) FROM {legacy}")
+        lowest, highest = cursor.fetchone()
+    if lowest is None:
+        return 0
+
+    copied = 0
+    for start in range(lowest, highest + 1, batch_size):
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {table} SELECT * FROM {legacy} WHERE id >= %s AND id < %s "
+                           f"ON CONFLICT DO NOTHING", [start, start + batch_size])
+            copied += cursor.rowcount
+    return copied
+
+
+def rebuild_tables(connection, partitioned, batch_size=COPY_BATCH_SIZE):
+    # The plain tables of the reverse direction get their own constraint and index names
+    # (no "_part" suffix), so they never clash with the names of the table being replaced
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        for table, spec in TABLES.items():
+            swap_table(cursor, table, spec, partitioned)
+
+    for table in TABLES:
+        copy_rows(connection, table, batch_size)
+
+    with connection.cursor() as cursor:
+        for table in TABLES:
+            cursor.execute(f"DROP TABLE {table}_legacy")
+
+
+def partition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    rebuild_tables(schema_editor.connection, partitioned=True)
+
+
+def unpartition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    rebuild_tables(schema_editor.connection, partitioned=False)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("meetings", "0003_meeting_archive"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="translation",
+            name="transcript",
+            field=models.ForeignKey(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="translations",
+                to="meetings.transcript",
+            ),
+        ),
+        migrations.RunPython(partition_tables, unpartition_tables),
+    ]
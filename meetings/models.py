@@ -19,6 +19,13 @@ class Meeting(models.Model):
     target_language = models.CharField(max_length=10, default='ro')
     meeting_url = models.CharField(max_length=255, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    summary = models.TextField(blank=True, default='')  # Rezumat construit pe parcursul întâlnirii
+    summary_transcript_id = models.BigIntegerField(null=True, blank=True)  # Ultima transcriere inclusă în rezumat
+    # Transcrierile meeting-urilor vechi sunt mutate în arhivă (segment comprimat, offset și lungime)
+    archived_at = models.DateTimeField(null=True, blank=True)
+    archive_segment = models.CharField(max_length=64, blank=True, default='')
+    archive_offset = models.BigIntegerField(null=True, blank=True)
+    archive_length = models.BigIntegerField(null=True, blank=True)
     
     def __str__(self):
         return self.title
@@ -46,7 +53,8 @@ class Transcript(models.Model):
         return f"Transcriere: {self.meeting.title} - {self.participant.name}"
 
 class Translation(models.Model):
-    transcript = models.ForeignKey(Transcript, on_delete=models.CASCADE, related_name='translations')
+    # Fără constrângere în baza de date: tabelele sunt partiționate pe timestamp (cheia primară este (id, timestamp))
+    transcript = models.ForeignKey(Transcript, on_delete=models.CASCADE, related_name='translations', db_constraint=False)
     translated_text = models.TextField()
     target_language = models.CharField(max_length=10)
     timestamp = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from meetings.metrics import OUTBOUND_BATCH_SIZE
+from meetings.serialization import FrameCodec
+
+logger = logging.getLogger(__name__)
+
+
+class OutboundBatcher:
+    """
+    Collects the frames sent to one client over a short tick and sends them
+    as a single array frame.
+
+    The first frame of a tick starts a timer; when it fires, everything
+    collected so far goes out in one WebSocket frame (a tick with a single
+    frame sends that frame unchanged). The number of frames per client then
+    stays at most one per tick however busy the meeting is. Frames are
+    flushed early once max_frames are waiting.
+    """
+
+    def __init__(self, send: Callable[[Optional[str], Optional[bytes]], Awaitable[None]],
+                 codec: FrameCodec, tick_seconds: float = 0.05, max_frames: int = 100):
+        """
+        Args:
+            send: Coroutine function called as send(text_data, bytes_data)
+            codec: Wire format of the connection
+            tick_seconds: How long frames are collected before they are sent
+            max_frames: Flush immediately once this many frames are waiting
+        """
+        self.send = send
+        self.codec = codec
+        self.tick_seconds = tick_seconds
+        self.max_frames = max_frames
+
+        self.frames: List[str] = []
+        self.flush_task = None
+
+    async def add(self, frame: str) -> None:
+        """
+        Queue a frame serialized as JSON (see frame_event).
+
+        Args:
+            frame: JSON text of the frame
+        """
+        self.frames.append(frame)
+
+        if len(self.frames) >= self.max_frames:
+            await self.flush()
+        elif self.flush_task is None:
+            self.flush_task = asyncio.ensure_future(self._flush_after_tick())
+
+    async def flush(self) -> None:
+        """Send the collected frames now."""
+        if self.flush_task is not None and self.flush_task is not asyncio.current_task():
+            self.flush_task.cancel()
+        self.flush_task = None
+
+        frames, self.frames = self.frames, []
+        if not frames:
+            return
+
+        OUTBOUND_BATCH_SIZE.observe(len(frames))
+        if len(frames) == 1:
+            text_data, bytes_data = self.codec.encode_json(frames[0])
+        else:
+            text_data, bytes_data = self.codec.encode_json_batch(frames)
+        await self.send(text_data, bytes_data)
+
+    def discard(self) -> None:
+        """Stop the timer and drop waiting frames (the connection is closing)."""
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+        self.flush_task = None
+        self.frames = []
+
+    async def _flush_after_tick(self) -> None:
+        await asyncio.sleep(self.tick_seconds)
+        try:
+            await self.flush()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending outbound batch: {str(e)}")
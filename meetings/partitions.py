@@ -0,0 +1,205 @@
+import logging
+import re
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Tables partitioned by month on "timestamp" (migration 0004)
+PARTITIONED_TABLES = ('meetings_transcript', 'meetings_translation')
+
+BOUNDS_PATTERN = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+# Rows of a partition that still belong to meetings which were not archived (see meetings.archive)
+UNARCHIVED_ROWS_SQL = {
+    'meetings_transcript': (
+        'SELECT 1 FROM {partition} p JOIN meetings_meeting m ON m.id = p.meeting_id '
+        'WHERE m.archived_at IS NULL LIMIT 1'
+    ),
+    'meetings_translation': (
+        'SELECT 1 FROM {partition} p JOIN meetings_transcript t ON t.id = p.transcript_id '
+        'JOIN meetings_meeting m ON m.id = t.meeting_id WHERE m.archived_at IS NULL LIMIT 1'
+    ),
+}
+
+
+def month_start(value: datetime) -> date:
+    """First day of the month of value."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month that is `months` after month (negative goes back)."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+def parse_bounds(expression: str) -> Optional[Tuple[date, date]]:
+    """
+    Parse the bounds of a range partition (pg_get_expr(relpartbound)).
+
+    Args:
+        expression: e.g. "FOR VALUES FROM ('2026-10-01 00:00:00') TO ('2026-11-01 00:00:00')"
+
+    Returns:
+        Tuple (first month, first month after the partition), or None for the default partition
+    """
+    match = BOUNDS_PATTERN.search(expression)
+    if match is None:
+        return None
+    lower, upper = (datetime.fromisoformat(bound[:19]).date() for bound in match.groups())
+    return lower, upper
+
+
+def is_partitioned(table: str) -> bool:
+    """Whether table is a Postgres partitioned table (False on other databases)."""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = %s",
+            [table])
+        return cursor.fetchone() is not None
+
+
+def list_partitions(table: str) -> List[Dict]:
+    """
+    List the partitions of a table.
+
+    Returns:
+        List of {'name', 'lower', 'upper'}; lower/upper are None for the default partition
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+            "FROM pg_inherits i JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid WHERE parent.relname = %s "
+            "ORDER BY child.relname",
+            [table])
+        partitions = []
+        for name, expression in cursor.fetchall():
+            bounds = parse_bounds(expression)
+            partitions.append({'name': name, 'lower': bounds[0] if bounds else None,
+                               'upper': bounds[1] if bounds else None})
+        return partitions
+
+
+def create_partition(table: str, month: date) -> str:
+    """
+    Create the partition of one month.
+
+    Rows of that month already stored in the default partition are moved
+    into the new partition (Postgres refuses to attach it otherwise).
+
+    Returns:
+        Name of the created partition
+    """
+    name = partition_name(table, month)
+    lower, upper = f"{month.isoformat()} 00:00:00", f"{add_months(month, 1).isoformat()} 00:00:00"
+    default = f"{table}_default"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'SELECT 1 FROM {default} WHERE "timestamp" >= %s AND "timestamp" < %s LIMIT 1',
+                       [lower, upper])
+        if cursor.fetchone() is None:
+            cursor.execute(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ('{lower}') TO ('{upper}')")
+            return name
+
+        cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {default}")
+        cursor.execute(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ('{lower}') TO ('{upper}')")
+        cursor.execute(f'INSERT INTO {table} SELECT * FROM {default} WHERE "timestamp" >= %s AND "timestamp" < %s',
+                       [lower, upper])
+        cursor.execute(f'DELETE FROM {default} WHERE "timestamp" >= %s AND "timestamp" < %s', [lower, upper])
+        cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT")
+    return name
+
+
+def ensure_partitions(months_ahead: Optional[int] = None, now: Optional[datetime] = None,
+                      dry_run: bool = False) -> List[str]:
+    """
+    Create the monthly partitions from the current month to months_ahead months ahead.
+
+    Args:
+        months_ahead: Number of future months (default TRANSCRIPT_PARTITION_MONTHS_AHEAD)
+        now: Current time (tests)
+        dry_run: Only report the partitions that would be created
+
+    Returns:
+        Names of the created partitions
+    """
+    if months_ahead is None:
+        months_ahead = settings.TRANSCRIPT_PARTITION_MONTHS_AHEAD
+    current = month_start(now or timezone.now())
+
+    created = []
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(table):
+            continue
+        existing = {partition['lower'] for partition in list_partitions(table)}
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if month in existing:
+                continue
+            created.append(partition_name(table, month) if dry_run else create_partition(table, month))
+    return created
+
+
+def drop_expired_partitions(retention_months: Optional[int] = None, now: Optional[datetime] = None,
+                            detach_only: bool = False, force: bool = False, dry_run: bool = False) -> List[Dict]:
+    """
+    Detach (and drop) the monthly partitions older than the retention period.
+
+    Removing a month is a metadata operation instead of a DELETE of its rows.
+    A partition that still holds rows of meetings that were not archived is
+    skipped unless force is set.
+
+    Args:
+        retention_months: Months kept before the current one (default
+            TRANSCRIPT_PARTITION_RETENTION_MONTHS; 0 keeps everything)
+        now: Current time (tests)
+        detach_only: Keep the detached tables (e.g. to dump them) instead of dropping them
+        force: Also remove partitions with rows of meetings that were not archived
+        dry_run: Only report what would be removed
+
+    Returns:
+        List of {'table', 'partition', 'action'}; action is 'dropped', 'detached' or 'skipped'
+    """
+    if retention_months is None:
+        retention_months = settings.TRANSCRIPT_PARTITION_RETENTION_MONTHS
+    if not retention_months:
+        return []
+    cutoff = add_months(month_start(now or timezone.now()), -retention_months)
+
+    results = []
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(table):
+            continue
+        for partition in list_partitions(table):
+            if partition['upper'] is None or partition['upper'] > cutoff:
+                continue
+
+            name = partition['name']
+            with connection.cursor() as cursor:
+                cursor.execute(UNARCHIVED_ROWS_SQL[table].format(partition=name))
+                unarchived = cursor.fetchone() is not None
+            if unarchived and not force:
+                logger.warning(f"Partition {name} still holds rows of meetings that were not archived; skipped")
+                results.append({'table': table, 'partition': name, 'action': 'skipped'})
+                continue
+
+            action = 'detached' if detach_only else 'dropped'
+            if not dry_run:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+                    if not detach_only:
+                        cursor.execute(f"DROP TABLE {name}")
+            results.append({'table': table, 'partition': name, 'action': action})
+    return results
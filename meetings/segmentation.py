@@ -0,0 +1,221 @@
+import re
+import time
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+from meetings.metrics import TRANSCRIPT_OVERLAP_TOKENS
+
+# Punctuation ignored when comparing tokens ("Django," and "django" are the same word)
+TOKEN_PUNCTUATION = ".,;:!?…\"'“”„‘’«»()[]{}-–—"
+
+
+def normalize_token(token: str) -> str:
+    return token.strip(TOKEN_PUNCTUATION).casefold()
+
+
+def longest_overlap(previous: List[str], current: List[str]) -> int:
+    """
+    Length of the longest suffix of previous that is also a prefix of current.
+
+    Knuth-Morris-Pratt: the failure function of current is built once and
+    previous is scanned once, so the cost is O(len(previous) + len(current)).
+
+    Args:
+        previous: Normalized tokens of the earlier text
+        current: Normalized tokens of the new text
+
+    Returns:
+        Number of overlapping tokens
+    """
+    if not previous or not current:
+        return 0
+
+    failure = [0] * len(current)
+    matched = 0
+    for position in range(1, len(current)):
+        while matched and current[position] != current[matched]:
+            matched = failure[matched - 1]
+        if current[position] == current[matched]:
+            matched += 1
+        failure[position] = matched
+
+    matched = 0
+    for token in previous:
+        if matched == len(current):
+            matched = failure[matched - 1]
+        while matched and token != current[matched]:
+            matched = failure[matched - 1]
+        if token == current[matched]:
+            matched += 1
+    return matched
+
+
+class ChunkAligner:
+    """
+    Drops the words a transcribed chunk repeats from the end of the previous one.
+
+    Overlapping or retried audio windows make STT return the boundary words
+    twice; only the new tail of each chunk is kept, so it is not translated
+    and stored again.
+
+    Only continuous speech is compared: the history is cleared by reset()
+    (the caller completed an utterance) and after gap_seconds without text,
+    so a new sentence that starts with the words the previous one ended on
+    is kept whole.
+    """
+
+    def __init__(self, min_overlap: int = 2, history_tokens: int = 64, gap_seconds: Optional[float] = None):
+        """
+        Args:
+            min_overlap: Shorter overlaps are kept (a word said twice is not a duplicate)
+            history_tokens: How many tokens of earlier text are compared
+            gap_seconds: Silence after which earlier text is no longer compared (None: never)
+        """
+        self.min_overlap = min_overlap
+        self.history_tokens = history_tokens
+        self.gap_seconds = gap_seconds
+        self.previous: List[str] = []
+        self.last_text_at = None
+
+    def reset(self) -> None:
+        """Forget earlier text (the utterance it belonged to is complete)."""
+        self.previous = []
+        self.last_text_at = None
+
+    def align(self, text: str) -> str:
+        """
+        Remove the part of text that repeats the end of the previous chunks.
+
+        Args:
+            text: Transcribed text of the new chunk
+
+        Returns:
+            The new tail of the text (empty if the chunk only repeats earlier text)
+        """
+        tokens = text.split()
+        if not tokens:
+            return ''
+
+        now = time.monotonic()
+        if self.gap_seconds is not None and self.last_text_at is not None and \
+                now - self.last_text_at > self.gap_seconds:
+            self.previous = []
+        self.last_text_at = now
+
+        keys = [normalize_token(token) for token in tokens]
+
+        overlap = longest_overlap(self.previous, keys)
+        if overlap < self.min_overlap:
+            overlap = 0
+        elif overlap:
+            TRANSCRIPT_OVERLAP_TOKENS.inc(overlap)
+
+        self.previous = (self.previous + keys[overlap:])[-self.history_tokens:]
+        return ' '.join(tokens[overlap:])
+
+
+class UtteranceBuffer:
+    """
+    Joins the transcribed chunks of one speaker into utterances.
+
+    With 2-second audio chunks a sentence arrives in several pieces, and
+    each piece translated alone reads worse than the whole sentence. Text is
+    collected until it ends with sentence punctuation or grows past
+    max_chars; the caller also flushes it after a pause in speech. Each
+    completed utterance is translated and stored once.
+    """
+
+    SENTENCE_END = re.compile(r"[.!?…。！？؟][\"'”’)\]]*\s*$")
+
+    def __init__(self, max_chars: int = 400):
+        """
+        Args:
+            max_chars: Utterance length after which it is completed without punctuation
+        """
+        self.max_chars = max_chars
+        self.parts: List[str] = []
+        self.utterance_id = None
+        self.language = None
+        self.timestamp = None
+        self.chunks = 0
+
+    @property
+    def text(self) -> str:
+        return ' '.join(self.parts)
+
+    def append(self, text: str, language: Optional[str] = None, timestamp=None) -> Optional[Dict]:
+        """
+        Add the text of one chunk.
+
+        Args:
+            text: Transcribed text
+            language: Language of the chunk (the first chunk's language is kept)
+            timestamp: Client timestamp (the first chunk's timestamp is kept)
+
+        Returns:
+            The completed utterance (see flush) or None while it is still open
+        """
+        text = text.strip()
+        if not text:
+            return None
+
+        if not self.parts:
+            # Unique across workers and restarts: clients key interim messages by it
+            self.utterance_id = uuid4().hex
+            self.language = language
+            self.timestamp = timestamp
+        self.parts.append(text)
+        self.chunks += 1
+
+        if self.SENTENCE_END.search(text) or len(self.text) >= self.max_chars:
+            return self.flush()
+        return None
+
+    def interim(self) -> Optional[Dict]:
+        """Current state of the open utterance (shown to the participants as interim text)."""
+        if not self.parts:
+            return None
+        return self._utterance()
+
+    def flush(self) -> Optional[Dict]:
+        """
+        Complete the open utterance.
+
+        Returns:
+            Dictionary with id, text, language, timestamp and chunks, or None if nothing is buffered
+        """
+        if not self.parts:
+            return None
+
+        utterance = self._utterance()
+        self.parts = []
+        self.utterance_id = None
+        self.language = None
+        self.timestamp = None
+        self.chunks = 0
+        return utterance
+
+    def to_state(self) -> Dict:
+        """State of the open utterance as plain values (stored in the cache by the Celery workers)."""
+        return dict(self._utterance(), parts=list(self.parts))
+
+    @classmethod
+    def from_state(cls, state: Optional[Dict], max_chars: int = 400) -> 'UtteranceBuffer':
+        """Rebuild a buffer from to_state(); an empty buffer for None."""
+        buffer = cls(max_chars=max_chars)
+        if state:
+            buffer.parts = list(state['parts'])
+            buffer.utterance_id = state['id']
+            buffer.language = state['language']
+            buffer.timestamp = state['timestamp']
+            buffer.chunks = state['chunks']
+        return buffer
+
+    def _utterance(self) -> Dict:
+        return {
+            'id': self.utterance_id,
+            'text': self.text,
+            'language': self.language,
+            'timestamp': self.timestamp,
+            'chunks': self.chunks,
+        }
@@ -0,0 +1,238 @@
+import json
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard library encoder is the fallback
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack comes with channels_redis; without it only JSON is offered
+    msgpack = None
+
+
+def encode_frame(payload: Dict) -> str:
+    """
+    Encode an outbound WebSocket frame as JSON text.
+
+    Uses orjson when it is installed (several times faster than json.dumps
+    for the nested dictionaries of speech/chat frames).
+
+    Args:
+        payload: Frame sent to the client
+
+    Returns:
+        JSON text
+    """
+    if orjson is not None:
+        return orjson.dumps(payload).decode('utf-8')
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+
+
+def frame_event(handler: str, payload: Dict, **extra) -> Dict:
+    """
+    Build a channel layer event that carries a pre-encoded client frame.
+
+    The frame is encoded once by the sender; every recipient consumer
+    forwards event['frame'] as is instead of rebuilding and re-encoding it.
+
+    Args:
+        handler: Consumer handler the event is dispatched to (its 'type')
+        payload: Frame sent to the clients
+        extra: Extra event fields for the recipients (tracing, ...)
+
+    Returns:
+        Event dictionary for group_send
+    """
+    return {'type': handler, 'frame': encode_frame(payload), **extra}
+
+
+class FrameCodec:
+    """
+    Wire format of one WebSocket connection, negotiated at connect.
+
+    - json (default): text frames, as before
+    - msgpack: binary MessagePack frames
+    - +deflate: binary frames whose first byte is a flag (0 = raw,
+      1 = zlib-compressed) followed by the encoded frame; small frames are
+      sent raw because compression would make them larger
+
+    Clients may send binary frames in the same format; text frames are
+    always accepted as JSON. Client frames larger than MAX_FRAME_BYTES
+    (after decompression) are rejected.
+
+    A group event reaches every consumer of the meeting with the same JSON
+    frame, so binary encodings of a frame are cached per codec: the frame is
+    re-encoded once per process and broadcast, not once per recipient.
+    """
+
+    SUBPROTOCOL_PREFIX = 'meeting.'
+    FLAG_RAW = 0
+    FLAG_DEFLATE = 1
+    COMPRESSION_MIN_BYTES = 256
+    MAX_FRAME_BYTES = 4 * 1024 * 1024
+    ENCODED_CACHE_SIZE = 256
+
+    # (codec name, JSON frame) -> encoded bytes, shared by all connections of the process
+    encoded_frames: 'OrderedDict[Tuple[str, str], bytes]' = OrderedDict()
+
+    def __init__(self, encoding: str = 'json', compression: Optional[str] = None):
+        self.encoding = encoding
+        self.compression = compression
+
+    @property
+    def name(self) -> str:
+        return f"{self.encoding}+{self.compression}" if self.compression else self.encoding
+
+    @property
+    def binary(self) -> bool:
+        return self.encoding == 'msgpack' or self.compression is not None
+
+    @classmethod
+    def supported(cls) -> List['FrameCodec']:
+        """Codecs available in this process, most compact first."""
+        codecs = []
+        if msgpack is not None:
+            codecs += [cls('msgpack', 'deflate'), cls('msgpack')]
+        codecs += [cls('json', 'deflate'), cls('json')]
+        return codecs
+
+    def encode(self, payload: Dict) -> Tuple[Optional[str], Optional[bytes]]:
+        """
+        Encode a frame.
+
+        Args:
+            payload: Frame sent to the client
+
+        Returns:
+            Tuple (text_data, bytes_data) for AsyncWebsocketConsumer.send
+        """
+        if self.encoding == 'msgpack':
+            return None, self._compress(msgpack.packb(payload, use_bin_type=True))
+        return self.encode_json(encode_frame(payload))
+
+    def encode_json(self, frame: str) -> Tuple[Optional[str], Optional[bytes]]:
+        """
+        Re-encode a frame that was already serialized as JSON (see frame_event).
+
+        Args:
+            frame: JSON text of the frame
+
+        Returns:
+            Tuple (text_data, bytes_data) for AsyncWebsocketConsumer.send
+        """
+        if not self.binary:
+            return frame, None
+
+        key = (self.name, frame)
+        encoded = self.encoded_frames.get(key)
+        if encoded is not None:
+            self.encoded_frames.move_to_end(key)
+            return None, encoded
+
+        if self.encoding == 'msgpack':
+            loads = orjson.loads if orjson is not None else json.loads
+            encoded = self._compress(msgpack.packb(loads(frame), use_bin_type=True))
+        else:
+            encoded = self._compress(frame.encode('utf-8'))
+
+        self.encoded_frames[key] = encoded
+        if len(self.encoded_frames) > self.ENCODED_CACHE_SIZE:
+            self.encoded_frames.popitem(last=False)
+        return None, encoded
+
+    def encode_json_batch(self, frames: List[str]) -> Tuple[Optional[str], Optional[bytes]]:
+        """
+        Encode several JSON-serialized frames as one array frame.
+
+        Args:
+            frames: JSON texts of the frames, in sending order
+
+        Returns:
+            Tuple (text_data, bytes_data) for AsyncWebsocketConsumer.send
+        """
+        if self.encoding == 'msgpack':
+            loads = orjson.loads if orjson is not None else json.loads
+            return None, self._compress(msgpack.packb([loads(frame) for frame in frames], use_bin_type=True))
+
+        # The frames are already JSON: joining them avoids encoding them again
+        return self.encode_json("[" + ",".join(frames) + "]")
+
+    def decode(self, text_data: Optional[str] = None, bytes_data: Optional[bytes] = None) -> Dict:
+        """
+        Decode a frame received from the client.
+
+        Raises:
+            ValueError: If the frame cannot be decoded
+        """
+        if text_data is not None:
+            return json.loads(text_data)
+        if not bytes_data:
+            raise ValueError("Empty frame")
+
+        if len(bytes_data) > self.MAX_FRAME_BYTES:
+            raise ValueError("Frame too large")
+
+        data = bytes_data
+        if self.compression:
+            flag, data = data[0], data[1:]
+            if flag == self.FLAG_DEFLATE:
+                # Bounded output: a small compressed frame must not expand into gigabytes
+                decompressor = zlib.decompressobj()
+                try:
+                    data = decompressor.decompress(data, self.MAX_FRAME_BYTES)
+                except zlib.error as e:
+                    raise ValueError(f"Invalid compressed frame: {e}")
+                if decompressor.unconsumed_tail:
+                    raise ValueError("Frame too large")
+                if not decompressor.eof:
+                    raise ValueError("Invalid compressed frame: truncated")
+            elif flag != self.FLAG_RAW:
+                raise ValueError(f"Unknown frame flag: {flag}")
+
+        if self.encoding == 'msgpack':
+            return msgpack.unpackb(data, raw=False)
+        return json.loads(data)
+
+    def _compress(self, data: bytes) -> bytes:
+        if not self.compression:
+            return data
+        if len(data) < self.COMPRESSION_MIN_BYTES:
+            return bytes([self.FLAG_RAW]) + data
+        return bytes([self.FLAG_DEFLATE]) + zlib.compress(data)
+
+
+def negotiate_codec(scope: Dict) -> Tuple[FrameCodec, Optional[str]]:
+    """
+    Pick the wire format of a connection.
+
+    A WebSocket subprotocol offered by the client (meeting.msgpack+deflate,
+    meeting.msgpack, meeting.json+deflate, meeting.json) wins, in the
+    client's order of preference; otherwise the encoding and compression
+    query parameters are used (?encoding=msgpack&compression=deflate).
+    Anything unknown falls back to JSON.
+
+    Args:
+        scope: ASGI connection scope
+
+    Returns:
+        Tuple (codec, subprotocol to accept or None)
+    """
+    supported = {codec.name: codec for codec in FrameCodec.supported()}
+
+    for subprotocol in scope.get('subprotocols') or []:
+        if subprotocol.startswith(FrameCodec.SUBPROTOCOL_PREFIX):
+            codec = supported.get(subprotocol[len(FrameCodec.SUBPROTOCOL_PREFIX):])
+            if codec is not None:
+                return codec, subprotocol
+
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    encoding = query.get('encoding', ['json'])[0]
+    compression = query.get('compression', [None])[0]
+    name = f"{encoding}+{compression}" if compression else encoding
+
+    return supported.get(name, FrameCodec()), None
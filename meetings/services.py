@@ -1,4 +1,6 @@
+import os
 import json
+import time
 import logging
 import uuid
 import asyncio
@@ -14,7 +16,12 @@ from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
 from accounts.models import User
+from ai_suggestions.services import conversation_context, suggestion_cache
+from .metrics import LabeledLatencyHistograms
+from .archive import transcript_archive
 from .models import Meeting, MeetingParticipant, Transcript, Translation
+from .summarization import meeting_summarizer
+from translate_interview_platform.db_routers import replica_reads
 
 logger = logging.getLogger(__name__)
 
@@ -398,11 +405,14 @@ class SessionManager:
             logger.error(f"Error leaving session: {str(e)}")
             raise
     
-    @transaction.atomic
     def end_session(self, session_id: str, user_id: int) -> bool:
         """
         End a session (only by owner or authorized user).
         
+        The final summary is folded after the transaction that ends the
+        meeting commits, so the LLM calls never run while it holds locks;
+        Meeting.summary is complete when this returns.
+        
         Args:
             session_id: ID of the session to end
             user_id: ID of the user ending the session
@@ -422,19 +432,30 @@ class SessionManager:
             if user_id != meeting.created_by.id and not User.objects.get(id=user_id).is_staff:
                 raise Exception("Not authorized to end this session")
             
-            # End meeting
-            meeting.status = 'completed'
-            meeting.end_time = timezone.now()
-            meeting.save()
+            with transaction.atomic():
+                # End meeting (only these fields: the summary is written by the summarizer)
+                meeting.status = 'completed'
+                meeting.end_time = timezone.now()
+                meeting.save(update_fields=['status', 'end_time'])
+                
+                # Mark all participants as left
+                MeetingParticipant.objects.filter(
+                    meeting=meeting, 
+                    left_at__isnull=True
+                ).update(left_at=timezone.now())
+            
+            # Fold the last partial window into the running summary (earlier windows
+            # were summarized in the background); waits for a fold still running
+            try:
+                meeting_summarizer.finalize(meeting.id)
+            except Exception as e:
+                logger.error(f"Error finalizing summary of meeting {meeting.id}: {str(e)}")
             
             # Update metrics
             self.session_metrics[session_id]['end_time'] = meeting.end_time
             
-            # Mark all participants as left
-            MeetingParticipant.objects.filter(
-                meeting=meeting, 
-                left_at__isnull=True
-            ).update(left_at=timezone.now())
+            # Conversation context is no longer needed once the session ends
+            conversation_context.clear(session_id)
             
             # Update session cache
             self._update_session_participants(session_id)
@@ -487,6 +508,15 @@ class SessionManager:
             # Update metrics
             self.session_metrics[session_id]['total_chars_translated'] += len(text)
             
+            # Fold full transcript windows into the running summary in the background
+            meeting_summarizer.note_transcript(meeting.id, text)
+            
+            # Keep the server-side conversation context up to date
+            conversation_context.append(session_id, participant.name, text)
+            
+            # New transcript lines make cached suggestions stale
+            suggestion_cache.invalidate_meeting(session_id)
+            
             return transcript.id
             
         except ObjectDoesNotExist:
@@ -532,6 +562,7 @@ class SessionManager:
             logger.error(f"Error adding translation: {str(e)}")
             raise
     
+    @replica_reads()
     def get_session_transcripts(self, session_id: str, language: Optional[str] = None) -> List[Dict]:
         """
         Get all transcripts for a session, optionally in a specific language.
@@ -551,45 +582,27 @@ class SessionManager:
             session = self.get_session(session_id)
             meeting = session['meeting']
             
-            # Get all transcripts
-            transcripts = Transcript.objects.filter(meeting=meeting).order_by('timestamp')
-            
-            result = []
+            # Archived meetings are read from their compressed segment block
+            archived = Meeting.objects.filter(id=meeting.id).values(
+                'archive_segment', 'archive_offset', 'archive_length').first()
+            if archived and archived['archive_segment']:
+                result = transcript_archive.read_meeting(
+                    archived['archive_segment'], archived['archive_offset'], archived['archive_length'])
+            else:
+                result = self._hot_transcripts(meeting)
             
-            for transcript in transcripts:
-                item = {
-                    'id': transcript.id,
-                    'participant_id': transcript.participant.id,
-                    'participant_name': transcript.participant.name,
-                    'original_text': transcript.original_text,
-                    'original_language': transcript.source_language,
-                    'timestamp': transcript.timestamp.isoformat(),
-                    'translations': {}
-                }
-                
-                # Get translations
-                translations = Translation.objects.filter(transcript=transcript)
-                
-                for translation in translations:
-                    item['translations'][translation.target_language] = {
-                        'id': translation.id,
-                        'text': translation.translated_text,
-                        'timestamp': translation.timestamp.isoformat()
-                    }
-                
-                # If specific language is requested
-                if language:
+            # If specific language is requested
+            if language:
+                for item in result:
                     # If requested language is the original language
-                    if language == transcript.source_language:
-                        item['text'] = transcript.original_text
+                    if language == item['original_language']:
+                        item['text'] = item['original_text']
                     # If requested language has a translation
                     elif language in item['translations']:
                         item['text'] = item['translations'][language]['text']
                     # Otherwise use original text
                     else:
-                        item['text'] = transcript.original_text
-                
-                result.append(item)
+                        item['text'] = item['original_text']
             
             return result
             
@@ -600,6 +613,47 @@ class SessionManager:
             logger.error(f"Error getting session transcripts: {str(e)}")
             raise
     
+    def _hot_transcripts(self, meeting: Meeting) -> List[Dict]:
+        """
+        Get the transcripts of a meeting from the Transcript/Translation tables.
+        
+        Args:
+            meeting: Meeting instance
+            
+        Returns:
+            List of transcript dictionaries
+        """
+        # Get all transcripts
+        transcripts = Transcript.objects.filter(meeting=meeting).order_by('timestamp')
+        
+        result = []
+        
+        for transcript in transcripts:
+            item = {
+                'id': transcript.id,
+                'participant_id': transcript.participant.id,
+                'participant_name': transcript.participant.name,
+                'original_text': transcript.original_text,
+                'original_language': transcript.source_language,
+                'timestamp': transcript.timestamp.isoformat(),
+                'translations': {}
+            }
+            
+            # Get translations
+            translations = Translation.objects.filter(transcript=transcript)
+            
+            for translation in translations:
+                item['translations'][translation.target_language] = {
+                    'id': translation.id,
+                    'text': translation.translated_text,
+                    'timestamp': translation.timestamp.isoformat()
+                }
+            
+            result.append(item)
+        
+        return result
+    
+    @replica_reads()
     def get_session_metrics(self, session_id: str) -> Dict:
         """
         Get metrics for a session.
@@ -820,34 +874,54 @@ class AIAssistantService:
         self.metrics = {
             'suggestions_generated': 0,
             'errors': 0,
-            'avg_response_time': [],
         }
+        
+        # Response times per meeting type and user role (fixed memory)
+        self.response_times = LabeledLatencyHistograms(('meeting_type', 'user_role'))
     
-    def generate_suggestions(self, context: List[Dict], user_role: str, 
+    def generate_suggestions(self, context: Optional[List[Dict]], user_role: str, 
                            language: str, meeting_type: str = 'interview',
-                           num_suggestions: int = 3) -> List[str]:
+                           num_suggestions: int = 3,
+                           meeting_id: Optional[str] = None) -> List[str]:
         """
         Generate contextual suggestions based on meeting transcript.
         
         Args:
-            context: List of recent transcript entries
+            context: List of recent transcript entries; when omitted, the
+                server-side conversation context of meeting_id is used
             user_role: Role of the user (interviewer, interviewee, etc.)
             language: Language to generate suggestions in
             meeting_type: Type of meeting (interview, meeting, etc.)
             num_suggestions: Number of suggestions to generate
+            meeting_id: ID of the meeting, enables the suggestion cache (optional)
             
         Returns:
             List of suggestion strings
         """
+        if context is None:
+            context = conversation_context.get_context(meeting_id) if meeting_id is not None else ''
+        
+        # Reuse suggestions generated for the same conversation state
+        cache_key = None
+        if meeting_id is not None:
+            cache_key = suggestion_cache.make_key(context, user_role, meeting_type, language)
+            cached = suggestion_cache.get(meeting_id, cache_key)
+            if cached is not None:
+                return cached[:num_suggestions]
+        
         # In a real implementation, this would call OpenAI API or other LLM
         start_time = time.time()
         
         try:
             # Format context for prompt
-            formatted_context = "\n".join([
-                f"{item.get('participant_name', 'Unknown')}: {item.get('text', item.get('original_text', ''))}"
-                for item in context[-5:]  # Last 5 messages
-            ])
+            if isinstance(context, str):
+                # Server-side window, already bounded by its token budget
+                formatted_context = context
+            else:
+                formatted_context = "\n".join([
+                    f"{item.get('participant_name', 'Unknown')}: {item.get('text', item.get('original_text', ''))}"
+                    for item in context[-5:]  # Last 5 messages
+                ])
             
             # Select prompt based on meeting type and role
             prompt = self._get_prompt(meeting_type, user_role, language)
@@ -857,9 +931,12 @@ class AIAssistantService:
             suggestions = self._mock_suggestions(user_role, meeting_type, language, formatted_context)
             
             execution_time = time.time() - start_time
-            self.metrics['avg_response_time'].append(execution_time)
+            self.response_times.record(execution_time, meeting_type, user_role)
             self.metrics['suggestions_generated'] += 1
             
+            if cache_key is not None:
+                suggestion_cache.set(meeting_id, cache_key, suggestions)
+            
             return suggestions[:num_suggestions]
             
         except Exception as e:
@@ -989,15 +1066,17 @@ class AIAssistantService:
         Returns:
             Dictionary with service metrics
         """
-        avg_time = 0
-        if self.metrics['avg_response_time']:
-            avg_time = sum(self.metrics['avg_response_time']) / len(self.metrics['avg_response_time'])
+        count, total_time = self.response_times.totals()
+        avg_time = total_time / count if count else 0
         
         return {
             'suggestions_generated': self.metrics['suggestions_generated'],
             'errors': self.metrics['errors'],
             'error_ratio': self.metrics['errors'] / max(1, self.metrics['suggestions_generated']),
-            'avg_response_time': round(avg_time, 3)
+            'avg_response_time': round(avg_time, 3),
+            # p50/p90/p99/max per "meeting_type/user_role" over the last window
+            'response_time': self.response_times.snapshot(),
+            'cache': suggestion_cache.get_metrics()
         }
 
 
@@ -0,0 +1,341 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional, Tuple
+
+import openai
+from django.conf import settings
+from django.db import close_old_connections
+
+from ai_suggestions.services import estimate_tokens
+from meetings.metrics import observe_stage
+from meetings.models import Meeting, Transcript
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractiveSummaryModel:
+    """
+    Local stand-in for the summarization LLM.
+
+    Keeps the sentences whose words are most frequent in the text, in their
+    original order, up to the token budget. Deterministic and free, so it is
+    used in tests and when no OpenAI key is configured.
+    """
+
+    SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+|\n+')
+    WORD = re.compile(r'\w{4,}')
+
+    def summarize(self, text: str, max_tokens: int) -> str:
+        """
+        Summarize a window of transcript lines.
+
+        Args:
+            text: Transcript lines ("Speaker: text")
+            max_tokens: Token budget of the summary
+
+        Returns:
+            Summary text
+        """
+        sentences = [sentence.strip() for sentence in self.SENTENCE_SPLIT.split(text) if sentence.strip()]
+        frequencies = Counter(word.lower() for word in self.WORD.findall(text))
+
+        def score(sentence: str) -> float:
+            words = [word.lower() for word in self.WORD.findall(sentence)]
+            return sum(frequencies[word] for word in words) / (len(words) or 1) if words else 0
+
+        ranked = sorted(range(len(sentences)), key=lambda index: score(sentences[index]), reverse=True)
+        chosen = set()
+        tokens = 0
+        for index in ranked:
+            sentence_tokens = estimate_tokens(sentences[index])
+            if tokens + sentence_tokens > max_tokens:
+                continue
+            chosen.add(index)
+            tokens += sentence_tokens
+
+        return ' '.join(sentences[index] for index in sorted(chosen))
+
+    def merge(self, summary: str, partial: str, max_tokens: int) -> str:
+        """
+        Fold the summary of a new window into the running summary.
+
+        Args:
+            summary: Running summary of the meeting so far
+            partial: Summary of the new window
+            max_tokens: Token budget of the result
+
+        Returns:
+            New running summary
+        """
+        return self.summarize(f"{summary}\n{partial}" if summary else partial, max_tokens)
+
+
+class OpenAISummaryModel:
+    """Summarization through the OpenAI chat completions API."""
+
+    SUMMARIZE_PROMPT = ("Rezumă concis următorul fragment dintr-o întâlnire. Păstrează deciziile, "
+                        "întrebările importante și acțiunile convenite:")
+    MERGE_PROMPT = ("Combină rezumatul de până acum al întâlnirii cu rezumatul fragmentului nou "
+                    "într-un singur rezumat concis, fără repetiții:")
+
+    def __init__(self, model: str, api_key: str, base_url: Optional[str] = None):
+        self.model = model
+        self.client = openai.OpenAI(api_key=api_key, base_url=base_url or None)
+
+    def summarize(self, text: str, max_tokens: int) -> str:
+        return self._complete(self.SUMMARIZE_PROMPT, text, max_tokens)
+
+    def merge(self, summary: str, partial: str, max_tokens: int) -> str:
+        if not summary:
+            return partial
+        return self._complete(self.MERGE_PROMPT, f"Rezumat până acum:\n{summary}\n\nFragment nou:\n{partial}",
+                              max_tokens)
+
+    def _complete(self, prompt: str, text: str, max_tokens: int) -> str:
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{'role': 'system', 'content': prompt}, {'role': 'user', 'content': text}],
+            max_tokens=max_tokens,
+            temperature=0.3,
+        )
+        return (response.choices[0].message.content or '').strip()
+
+
+def take_window(lines: List[Tuple[int, str]], window_tokens: int) -> Tuple[List[Tuple[int, str]], bool]:
+    """
+    Take the transcript lines of the next window.
+
+    Args:
+        lines: (transcript id, "Speaker: text") in transcript order
+        window_tokens: Token budget of one window
+
+    Returns:
+        Tuple (lines in the window, whether the window is full)
+    """
+    window = []
+    tokens = 0
+    for transcript_id, line in lines:
+        line_tokens = estimate_tokens(line)
+        if window and tokens + line_tokens > window_tokens:
+            return window, True
+        window.append((transcript_id, line))
+        tokens += line_tokens
+    return window, tokens >= window_tokens
+
+
+class MeetingSummarizer:
+    """
+    Running per-meeting summary, built in the background as the meeting progresses.
+
+    Transcript rows are folded into Meeting.summary one window at a time
+    (map: summarize the window; reduce: merge it into the running summary).
+    Every step sees at most one window plus the capped summary, so its cost
+    stays bounded however long the meeting runs. Meeting.summary_transcript_id
+    records the last folded row, so any process can continue the summary and
+    end_session only has to fold the last partial window.
+
+    Two processes folding the same window is detected by compare-and-set;
+    the loser retries with backoff, at most max_conflicts times per run.
+    """
+
+    FOLD_DONE = 'done'  # nothing more to fold now
+    FOLD_MORE = 'more'  # a window was folded and another one is waiting
+    FOLD_CONFLICT = 'conflict'  # another process folded the same window first
+
+    def __init__(self, model=None, window_tokens: Optional[int] = None,
+                 summary_token_budget: Optional[int] = None, max_workers: Optional[int] = None,
+                 max_conflicts: int = 3, conflict_backoff: float = 0.05):
+        self.window_tokens = window_tokens if window_tokens is not None else getattr(
+            settings, 'MEETING_SUMMARY_WINDOW_TOKENS', 1500)
+        self.summary_token_budget = summary_token_budget if summary_token_budget is not None else getattr(
+            settings, 'MEETING_SUMMARY_TOKEN_BUDGET', 400)
+        self.max_workers = max_workers if max_workers is not None else getattr(
+            settings, 'MEETING_SUMMARY_WORKERS', 2)
+        self.max_conflicts = max_conflicts
+        self.conflict_backoff = conflict_backoff
+        self._model = model
+
+        self.executor = None
+        self.pending_tokens: Dict[str, int] = {}  # meeting_id -> tokens noted since the last fold was queued
+        self.jobs: Dict[str, object] = {}  # meeting_id -> Future of the running fold
+        self.lock = threading.Lock()
+
+        # Metrics for monitoring
+        self.metrics = {
+            'windows': 0,
+            'conflicts': 0,
+            'errors': 0,
+        }
+
+    @property
+    def model(self):
+        if self._model is None:
+            if settings.MEETING_SUMMARY_BACKEND == 'openai':
+                self._model = OpenAISummaryModel(settings.MEETING_SUMMARY_MODEL, settings.OPENAI_API_KEY,
+                                                 settings.OPENAI_BASE_URL)
+            else:
+                self._model = ExtractiveSummaryModel()
+        return self._model
+
+    def note_transcript(self, meeting_id, text: str) -> None:
+        """
+        Record a saved transcript line; queues a background fold once a window is full.
+
+        Args:
+            meeting_id: ID of the meeting
+            text: Text of the saved transcript
+        """
+        key = str(meeting_id)
+        with self.lock:
+            tokens = self.pending_tokens.get(key, 0) + estimate_tokens(text)
+            if tokens < self.window_tokens or key in self.jobs:
+                # A running fold picks up everything saved so far
+                self.pending_tokens[key] = tokens
+                return
+
+            self.pending_tokens.pop(key, None)
+            self._submit(key, meeting_id)
+
+    def finalize(self, meeting_id, timeout: float = 30.0) -> str:
+        """
+        Fold the remaining transcript lines and return the final summary.
+
+        Waits for a background fold of the meeting that is still running.
+        Runs LLM calls: do not call it inside a database transaction.
+
+        Args:
+            meeting_id: ID of the meeting
+            timeout: Maximum wait for the background fold, in seconds
+
+        Returns:
+            Final summary of the meeting
+        """
+        key = str(meeting_id)
+        with self.lock:
+            job = self.jobs.get(key)
+            self.pending_tokens.pop(key, None)
+
+        self._wait(meeting_id, job, timeout)
+        with observe_stage('summary'):
+            return self.fold_all(meeting_id, final=True)
+
+    def fold_all(self, meeting_id, final: bool = False) -> str:
+        """
+        Fold windows until nothing more can be folded now.
+
+        Compare-and-set conflicts are retried with exponential backoff, at
+        most max_conflicts times; then the summary stored by the other
+        process is returned.
+
+        Returns:
+            The summary of the meeting
+        """
+        conflicts = 0
+        while True:
+            outcome, summary = self.fold_window(meeting_id, final=final)
+            if outcome == self.FOLD_DONE:
+                return summary
+            if outcome == self.FOLD_CONFLICT:
+                conflicts += 1
+                if conflicts > self.max_conflicts:
+                    logger.warning(f"Summary of meeting {meeting_id}: giving up after {conflicts} conflicts")
+                    return self._load(meeting_id)[0]
+                time.sleep(self.conflict_backoff * 2 ** (conflicts - 1))
+
+    def fold_window(self, meeting_id, final: bool = False) -> Tuple[str, Optional[str]]:
+        """
+        Fold the next window of unsummarized transcript lines into Meeting.summary.
+
+        Args:
+            meeting_id: ID of the meeting
+            final: Fold a partial window too (the meeting is ending)
+
+        Returns:
+            Tuple (outcome, summary): outcome is FOLD_DONE (summary is the
+            current summary), FOLD_MORE or FOLD_CONFLICT (summary is None)
+        """
+        summary, folded_until = self._load(meeting_id)
+
+        # Every line costs at least one token, so a window never holds more than window_tokens rows
+        lines = self._lines(meeting_id, folded_until, self.window_tokens + 1)
+        window, full = take_window(lines, self.window_tokens)
+
+        if not window or (not full and not final):
+            return self.FOLD_DONE, summary
+
+        partial = self.model.summarize("\n".join(line for _, line in window), self.summary_token_budget)
+        summary = self.model.merge(summary, partial, self.summary_token_budget)
+
+        # Compare-and-set: another process may have folded the same window meanwhile
+        updated = self._store(meeting_id, folded_until, summary, window[-1][0])
+        with self.lock:
+            self.metrics['windows' if updated else 'conflicts'] += 1
+
+        if not updated:
+            return self.FOLD_CONFLICT, None
+        return (self.FOLD_MORE, None) if full else (self.FOLD_DONE, summary)
+
+    def get_metrics(self) -> Dict:
+        """
+        Get summarizer metrics.
+
+        Returns:
+            Dictionary with summarizer metrics
+        """
+        with self.lock:
+            return dict(self.metrics, running=len(self.jobs), pending_meetings=len(self.pending_tokens))
+
+    def _submit(self, key: str, meeting_id) -> None:
+        # Called with self.lock held
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='meeting-summary')
+        job = self.executor.submit(self._fold_in_background, meeting_id)
+        self.jobs[key] = job
+        job.add_done_callback(lambda done: self._forget(key, done))
+
+    def _forget(self, key: str, job) -> None:
+        with self.lock:
+            if self.jobs.get(key) is job:
+                del self.jobs[key]
+
+    def _wait(self, meeting_id, job, timeout: float) -> None:
+        if job is None:
+            return
+        try:
+            job.result(timeout=timeout)
+        except FutureTimeoutError:
+            logger.warning(f"Background summary of meeting {meeting_id} still running after {timeout}s")
+
+    def _fold_in_background(self, meeting_id) -> None:
+        try:
+            with observe_stage('summary'):
+                self.fold_all(meeting_id)
+        except Exception as e:
+            with self.lock:
+                self.metrics['errors'] += 1
+            logger.error(f"Error summarizing meeting {meeting_id}: {str(e)}")
+        finally:
+            close_old_connections()
+
+    # Database access
+
+    def _load(self, meeting_id) -> Tuple[str, Optional[int]]:
+        meeting = Meeting.objects.only('summary', 'summary_transcript_id').get(id=meeting_id)
+        return meeting.summary, meeting.summary_transcript_id
+
+    def _lines(self, meeting_id, after: Optional[int], limit: int) -> List[Tuple[int, str]]:
+        rows = (Transcript.objects.filter(meeting_id=meeting_id, id__gt=after or 0)
+                .order_by('id').values_list('id', 'participant__name', 'original_text')[:limit])
+        return [(transcript_id, f"{name}: {text}") for transcript_id, name, text in rows]
+
+    def _store(self, meeting_id, expected: Optional[int], summary: str, last_transcript_id: int) -> bool:
+        return bool(Meeting.objects.filter(id=meeting_id, summary_transcript_id=expected).update(
+            summary=summary, summary_transcript_id=last_transcript_id))
+
+
+# Initialize a singleton instance
+meeting_summarizer = MeetingSummarizer()
@@ -0,0 +1,294 @@
+import logging
+import time
+import zlib
+from typing import Dict, List, Optional
+
+from asgiref.sync import async_to_sync
+from celery import shared_task
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+
+from ai_suggestions.services import conversation_context, suggestion_cache
+from meetings.metrics import PROVIDER_ERRORS, observe_stage
+from meetings.models import MeetingParticipant, Transcript, Translation
+from meetings.segmentation import ChunkAligner, UtteranceBuffer
+from meetings.serialization import frame_event
+from meetings.summarization import meeting_summarizer
+from meetings.tracing import current_span_id, current_trace_id, span
+from translate_api.glossary import glossary_cache
+from translate_api.services import LanguageDetectionService, SpeechProcessingService, TranslationService
+from translate_interview_platform.db_routers import acting_user
+
+logger = logging.getLogger(__name__)
+
+SPEECH_TASK_NAME = 'meetings.process_speech'
+FLUSH_TASK_NAME = 'meetings.flush_speech'
+
+# Open utterance of a participant whose consumer is gone (no flush task follows) expires after this
+UTTERANCE_STATE_SECONDS = 300
+
+
+def speech_queue_for_meeting(meeting_id) -> str:
+    """
+    Get the Celery queue that handles all speech of a meeting.
+
+    Args:
+        meeting_id: ID of the meeting
+
+    Returns:
+        Queue name (speech.0 ... speech.N-1)
+    """
+    shard = zlib.crc32(str(meeting_id).encode('utf-8')) % max(1, settings.CELERY_SPEECH_QUEUES)
+    return f"speech.{shard}"
+
+
+def route_by_meeting(name, args, kwargs, options, task=None, **kw) -> Optional[Dict]:
+    """
+    Celery task router (settings.CELERY_TASK_ROUTES).
+
+    Speech and flush tasks of one meeting always go to the same queue, so a
+    worker consuming that queue with concurrency 1 processes them in order.
+    """
+    if name in (SPEECH_TASK_NAME, FLUSH_TASK_NAME):
+        return {'queue': speech_queue_for_meeting(kwargs['meeting_id'])}
+    return None
+
+
+@shared_task(name=SPEECH_TASK_NAME, ignore_result=True)
+def process_speech_task(meeting_id, participant_id, audio_data: str, source_language: str = 'en-US',
+                        timestamp=None, trace: Optional[Dict] = None, user_id=None) -> None:
+    """
+    Run STT, translation and persistence for one audio chunk in a worker and
+    publish the result to the meeting group (meeting_{id}) through the channel layer.
+
+    With SPEECH_SEGMENTATION_ENABLED the chunk is added to the participant's
+    open utterance, as in the inline consumer; the utterance is translated and
+    stored once it is complete (sentence end, length or flush_speech_task).
+
+    Args:
+        meeting_id: ID of the meeting
+        participant_id: ID of the speaking participant
+        audio_data: Base64 audio chunk
+        source_language: Language of the audio (e.g. en-US)
+        timestamp: Client timestamp, forwarded unchanged
+        trace: trace_id/parent_span_id of the consumer span that queued the task
+        user_id: ID of the speaking user, whose personal glossaries apply (None for guests)
+    """
+    trace = trace or {}
+    # The speaker's writes keep their own reads on the primary for a while (see db_routers)
+    with span('celery.process_speech', trace_id=trace.get('trace_id'),
+              parent_id=trace.get('parent_span_id'), meeting_id=str(meeting_id)), acting_user(user_id):
+        try:
+            with observe_stage('stt'), span('stt', language=source_language):
+                text = SpeechProcessingService.process_speech_chunk(audio_data, source_language)
+        except Exception:
+            PROVIDER_ERRORS.labels('stt').inc()
+            raise
+
+        # Same overlap removal as the consumer: chunks of one participant may run on different workers
+        text = align_chunk(meeting_id, participant_id, text or '')
+        if not text:
+            return
+
+        if settings.SPEECH_SEGMENTATION_ENABLED:
+            buffer_speech(meeting_id, participant_id, text, source_language, timestamp, user_id)
+        else:
+            finalize_speech(meeting_id, participant_id, text, source_language, timestamp, user_id)
+
+
+@shared_task(name=FLUSH_TASK_NAME, ignore_result=True)
+def flush_speech_task(meeting_id, participant_id, trace: Optional[Dict] = None, user_id=None) -> None:
+    """
+    Complete the participant's open utterance (pause in speech or disconnect).
+
+    Queued by the consumer after the participant's chunks, in the same queue,
+    so it runs after all of them.
+
+    Args:
+        meeting_id: ID of the meeting
+        participant_id: ID of the speaking participant
+        trace: trace_id/parent_span_id of the consumer span that queued the task
+        user_id: ID of the speaking user, whose personal glossaries apply (None for guests)
+    """
+    trace = trace or {}
+    with span('celery.flush_speech', trace_id=trace.get('trace_id'),
+              parent_id=trace.get('parent_span_id'), meeting_id=str(meeting_id)), acting_user(user_id):
+        key = utterance_key(meeting_id, participant_id)
+        utterance = UtteranceBuffer.from_state(cache.get(key)).flush()
+        cache.delete(key)
+        reset_aligner(meeting_id, participant_id)
+        if utterance is not None:
+            finalize_speech(meeting_id, participant_id, utterance['text'], utterance['language'],
+                            utterance['timestamp'], user_id, utterance_id=utterance['id'])
+
+
+def buffer_speech(meeting_id, participant_id, text: str, source_language: str, timestamp, user_id=None) -> None:
+    """
+    Add the text of a chunk to the participant's open utterance (see UtteranceBuffer).
+
+    The buffer is kept in the Django cache between tasks; a completed
+    utterance is finalized, otherwise the participants get the interim text.
+    """
+    key = utterance_key(meeting_id, participant_id)
+    utterances = UtteranceBuffer.from_state(cache.get(key), max_chars=settings.SPEECH_UTTERANCE_MAX_CHARS)
+    utterance = utterances.append(text, source_language, timestamp)
+    if utterance is not None:
+        cache.delete(key)
+        # The next utterance is not compared with the completed one
+        reset_aligner(meeting_id, participant_id)
+        finalize_speech(meeting_id, participant_id, utterance['text'], utterance['language'],
+                        utterance['timestamp'], user_id, utterance_id=utterance['id'])
+        return
+
+    cache.set(key, utterances.to_state(), timeout=UTTERANCE_STATE_SECONDS)
+    interim = utterances.interim()
+    publish(meeting_id, participant_id, {
+        'type': 'speech_interim',
+        'participant_id': participant_id,
+        'name': get_participant_name(participant_id),
+        'utterance_id': interim['id'],
+        'text': interim['text'],
+        'original_language': interim['language'],
+        'timestamp': interim['timestamp']
+    })
+
+
+def finalize_speech(meeting_id, participant_id, text: str, source_language: str, timestamp,
+                    user_id=None, utterance_id=None) -> None:
+    """Detect the language of a text (chunk or utterance), store and translate it and publish it."""
+    # The client's language is only a hint; the transcript is stored under the detected language
+    with observe_stage('language_detection'), span('language_detection'):
+        source_language = LanguageDetectionService.detect_language(text, hint=source_language)
+
+    with observe_stage('db'), span('db.save_transcript'):
+        transcript_id = save_transcript(meeting_id, participant_id, text, source_language)
+        name = get_participant_name(participant_id)
+        participant_languages = get_participant_languages(meeting_id)
+        glossaries = get_glossaries(meeting_id, user_id)
+
+    # Same hooks as SessionManager.add_transcript; the context is kept even if the transcript
+    # could not be saved, as in the inline consumer
+    if transcript_id:
+        meeting_summarizer.note_transcript(meeting_id, text)
+    conversation_context.append(meeting_id, name, text)
+    suggestion_cache.invalidate_meeting(meeting_id)
+
+    translations = {}
+    for lang in participant_languages:
+        if lang != source_language:
+            with observe_stage('translation'), span('translation', source_language=source_language,
+                                                     target_language=lang):
+                translated_text = TranslationService.translate_text(
+                    text,
+                    source_lang=source_language or 'auto',
+                    target_lang=lang,
+                    glossary=glossaries.matcher(lang) if glossaries else None
+                )
+            translations[lang] = translated_text
+
+            if transcript_id:
+                with observe_stage('db'), span('db.save_translation', target_language=lang):
+                    save_translation(transcript_id, translated_text, lang)
+
+    publish(meeting_id, participant_id, {
+        'type': 'speech',
+        'participant_id': participant_id,
+        'name': name,
+        'original_text': text,
+        'original_language': source_language,
+        'translations': translations,
+        'utterance_id': utterance_id,
+        'timestamp': timestamp
+    })
+
+
+def publish(meeting_id, participant_id, frame: Dict) -> None:
+    with observe_stage('fanout'), span('group_send'):
+        async_to_sync(get_channel_layer().group_send)(
+            f'meeting_{meeting_id}',
+            frame_event(
+                'speech_message', frame,
+                participant_id=participant_id,
+                trace_id=current_trace_id(),
+                parent_span_id=current_span_id(),
+                sent_at=time.time()
+            )
+        )
+
+
+def align_chunk(meeting_id, participant_id, text: str) -> str:
+    """
+    Drop the words a chunk repeats from the end of the participant's previous chunks (see ChunkAligner).
+
+    The compared tokens are kept in the Django cache (shared by the workers when
+    CACHE_REDIS_URL is set) and expire after SPEECH_OVERLAP_RESET_MS of silence.
+    """
+    if not text.strip():
+        return ''
+
+    key = aligner_key(meeting_id, participant_id)
+    aligner = ChunkAligner(min_overlap=settings.SPEECH_OVERLAP_MIN_TOKENS)
+    aligner.previous = cache.get(key) or []
+    text = aligner.align(text)
+    cache.set(key, aligner.previous, timeout=settings.SPEECH_OVERLAP_RESET_MS / 1000)
+    return text
+
+
+def reset_aligner(meeting_id, participant_id) -> None:
+    """Forget the participant's previous chunks (their utterance is complete)."""
+    cache.delete(aligner_key(meeting_id, participant_id))
+
+
+def aligner_key(meeting_id, participant_id) -> str:
+    return f"speech:aligner:{meeting_id}:{participant_id}"
+
+
+def utterance_key(meeting_id, participant_id) -> str:
+    return f"speech:utterance:{meeting_id}:{participant_id}"
+
+
+def save_transcript(meeting_id, participant_id, text: str, source_language: str) -> Optional[int]:
+    try:
+        transcript = Transcript.objects.create(
+            meeting_id=meeting_id,
+            participant_id=participant_id,
+            original_text=text,
+            source_language=source_language or ''
+        )
+        return transcript.id
+    except Exception as e:
+        logger.error(f"Error saving transcript: {str(e)}")
+        return None
+
+
+def save_translation(transcript_id, translated_text: str, target_language: str) -> bool:
+    try:
+        Translation.objects.create(
+            transcript_id=transcript_id,
+            translated_text=translated_text,
+            target_language=target_language
+        )
+        return True
+    except Exception as e:
+        logger.error(f"Error saving translation: {str(e)}")
+        return False
+
+
+def get_participant_name(participant_id) -> str:
+    try:
+        return MeetingParticipant.objects.get(id=participant_id).name
+    except MeetingParticipant.DoesNotExist:
+        return "Unknown"
+
+
+def get_participant_languages(meeting_id) -> List[str]:
+    return list({
+        LanguageDetectionService.canonical_language(language)
+        for language in MeetingParticipant.objects.filter(meeting_id=meeting_id)
+        .values_list('preferred_language', flat=True).distinct()
+    })
+
+
+def get_glossaries(meeting_id, user_id=None):
+    return glossary_cache.get(meeting_id, user_id) or glossary_cache.load(meeting_id, user_id)
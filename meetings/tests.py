@@ -1,3 +1,1381 @@
-from django.test import TestCase
+import asyncio
+import base64
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+from datetime import date
+from importlib import import_module
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from channels.exceptions import ChannelFull
+from channels.layers import channel_layers
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import re_path
+from prometheus_client import REGISTRY
+
+from accounts.models import User
+from meetings.archive import TranscriptArchive
+from meetings.channel_layers import ConsistentHashRing, HybridChannelLayer
+from meetings.db_executor import DatabaseExecutor
+from meetings.ingress import IngressQueue, LaneScheduler
+from meetings.loadtest import AnonymousUserMiddleware, LoadTestConsumer
+from meetings.metrics import LabeledLatencyHistograms, LatencyHistogram, socket_closed, socket_opened
+from meetings.outbound import OutboundBatcher
+from meetings.models import Meeting, MeetingParticipant, Transcript, Translation
+from meetings.partitions import add_months, is_partitioned, parse_bounds, partition_name
+from meetings.segmentation import ChunkAligner, UtteranceBuffer, longest_overlap
+from meetings.services import SessionManager
+from meetings.summarization import ExtractiveSummaryModel, MeetingSummarizer, take_window
+from meetings.tracing import JSONLSpanExporter, set_exporter, span
+from meetings.serialization import FrameCodec, encode_frame, negotiate_codec, orjson
+from meetings.tasks import FLUSH_TASK_NAME, SPEECH_TASK_NAME, align_chunk, route_by_meeting, speech_queue_for_meeting
+from translate_api.services import (AISuggestionService, LanguageDetectionService, SpeechProcessingService,
+                                    TranslationService)
+from translate_interview_platform import db_routers
+from translate_interview_platform.celery import app as celery_app
+from translate_interview_platform.metrics import metrics_view
+
+
+def audio(data: bytes) -> str:
+    return base64.b64encode(data).decode('ascii')
+
+
+def meeting_application():
+    return AnonymousUserMiddleware(URLRouter([
+        re_path(r'^ws/meeting/(?P<meeting_id>\w+)/$', LoadTestConsumer.as_asgi()),
+    ]))
+
+
+async def receive_frames(communicator, count, timeout=2.0):
+    frames = []
+    deadline = time.monotonic() + timeout
+    while len(frames) < count:
+        # receive_output() cancels the application on timeout, so read the queue directly
+        output = await asyncio.wait_for(communicator.output_queue.get(),
+                                        timeout=max(0.01, deadline - time.monotonic()))
+        if output.get('type') == 'websocket.send':
+            decoded = json.loads(output['text'])
+            frames.extend(decoded if isinstance(decoded, list) else [decoded])
+    return frames
+
+
+class LatencyHistogramTests(SimpleTestCase):
+    def test_percentiles_have_bounded_relative_error(self):
+        histogram = LatencyHistogram(window_seconds=None)
+        for millisecond in range(1, 1001):
+            histogram.record(millisecond / 1000)
+
+        snapshot = histogram.snapshot()
+
+        self.assertEqual(snapshot['count'], 1000)
+        self.assertAlmostEqual(snapshot['mean'], 0.5005, places=4)
+        self.assertEqual(snapshot['max'], 1.0)
+        for quantile, exact in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+            self.assertLessEqual(abs(snapshot[quantile] - exact) / exact, 0.1)
+
+    def test_samples_leave_after_two_windows(self):
+        now = [100.0]
+        with mock.patch('meetings.metrics.time.monotonic', side_effect=lambda: now[0]):
+            histogram = LatencyHistogram(window_seconds=10)
+            histogram.record(0.2)
+
+            now[0] = 115.0
+            histogram.record(0.4)
+            # The previous window is still reported
+            self.assertEqual(histogram.snapshot()['count'], 2)
+
+            now[0] = 126.0
+            self.assertEqual(histogram.snapshot()['count'], 1)
+
+            now[0] = 150.0
+            self.assertEqual(histogram.snapshot()['count'], 0)
+
+    def test_labels_are_kept_apart(self):
+        histograms = LabeledLatencyHistograms(('meeting_type', 'user_role'), window_seconds=None)
+        histograms.record(0.1, 'interview', 'interviewer')
+        histograms.record(0.3, 'interview', 'interviewee')
+        histograms.record(0.3, 'interview', 'interviewee')
+
+        snapshot = histograms.snapshot()
+
+        self.assertEqual(set(snapshot), {'interview/interviewer', 'interview/interviewee'})
+        self.assertEqual(snapshot['interview/interviewee']['count'], 2)
+        self.assertEqual(histograms.totals()[0], 3)
+        self.assertAlmostEqual(histograms.totals()[1], 0.7)
+
+
+class MetricsTests(SimpleTestCase):
+    def test_socket_gauges_have_no_meeting_label(self):
+        sockets = REGISTRY.get_sample_value('meeting_active_sockets')
+        meetings = REGISTRY.get_sample_value('meeting_active_meetings')
+
+        for meeting_id in ('m1', 'm1', 'm2'):
+            socket_opened(meeting_id)
+        self.assertEqual(REGISTRY.get_sample_value('meeting_active_sockets'), sockets + 3)
+        self.assertEqual(REGISTRY.get_sample_value('meeting_active_meetings'), meetings + 2)
+
+        for meeting_id in ('m1', 'm1', 'm2', 'm2'):
+            socket_closed(meeting_id)
+        self.assertEqual(REGISTRY.get_sample_value('meeting_active_sockets'), sockets)
+        self.assertEqual(REGISTRY.get_sample_value('meeting_active_meetings'), meetings)
+
+        samples = [sample for metric in REGISTRY.collect() if metric.name == 'meeting_active_sockets'
+                   for sample in metric.samples]
+        self.assertEqual([sample.labels for sample in samples], [{}])
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_endpoint_requires_token(self):
+        factory = RequestFactory()
+
+        request = factory.get('/metrics')
+        request.user = AnonymousUser()
+        self.assertEqual(metrics_view(request).status_code, 403)
+
+        request = factory.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong')
+        request.user = AnonymousUser()
+        self.assertEqual(metrics_view(request).status_code, 403)
+
+        response = metrics_view(factory.get('/metrics', HTTP_AUTHORIZATION='Bearer secret'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'meeting_active_sockets', response.content)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_metrics_endpoint_without_token_is_staff_only(self):
+        request = RequestFactory().get('/metrics')
+        request.user = mock.Mock(is_authenticated=True, is_staff=False)
+        self.assertEqual(metrics_view(request).status_code, 403)
+
+        request.user.is_staff = True
+        self.assertEqual(metrics_view(request).status_code, 200)
+
+
+class IngressQueueTests(SimpleTestCase):
+    async def test_sequence_order_is_restored(self):
+        queue = IngressQueue(10, sequence_key='seq')
+        for seq in (2, 0, 3, 1):
+            queue.put({'type': 'speech', 'seq': seq})
+
+        order = [(await queue.get())['message']['seq'] for _ in range(4)]
+        self.assertEqual(order, [0, 1, 2, 3])
+
+    async def test_late_sequence_is_rejected(self):
+        queue = IngressQueue(10, sequence_key='seq')
+        queue.put({'type': 'speech', 'seq': 0})
+        await queue.get()
+
+        self.assertEqual(queue.put({'type': 'speech', 'seq': 0}), 'late')
+        self.assertEqual(queue.qsize(), 0)
+        self.assertEqual(queue.metrics['late'], 1)
+
+    async def test_missing_sequence_is_skipped_after_timeout(self):
+        queue = IngressQueue(10, sequence_key='seq', reorder_timeout=0.05)
+        queue.put({'type': 'speech', 'seq': 1})
+
+        item = await asyncio.wait_for(queue.get(), timeout=1)
+
+        self.assertEqual(item['message']['seq'], 1)
+        self.assertEqual(queue.metrics['gaps'], 1)
+        self.assertEqual(queue.put({'type': 'speech', 'seq': 0}), 'late')
+
+    def test_merge_policy_concatenates_audio(self):
+        queue = IngressQueue(1, policy='merge', sequence_key='seq')
+        queue.put({'type': 'speech', 'seq': 0, 'language': 'en-US', 'audio_data': audio(b'ab')})
+
+        action = queue.put({'type': 'speech', 'seq': 1, 'language': 'en-US', 'audio_data': audio(b'cd')})
+
+        self.assertEqual(action, 'merged')
+        self.assertEqual(queue.qsize(), 1)
+        merged = queue.items[0]['message']
+        self.assertEqual(base64.b64decode(merged['audio_data']), b'abcd')
+        self.assertEqual(merged['merged_chunks'], 2)
+
+    def test_drop_oldest_policy(self):
+        queue = IngressQueue(2, policy='drop_oldest')
+        for seq in range(3):
+            queue.put({'type': 'speech', 'seq': seq})
+
+        self.assertEqual([item['message']['seq'] for item in queue.items], [1, 2])
+        self.assertEqual(queue.metrics['dropped'], 1)
+
+    async def test_dropped_sequence_is_not_waited_for(self):
+        queue = IngressQueue(2, policy='drop_oldest', sequence_key='seq', reorder_timeout=5)
+        for seq in range(3):
+            queue.put({'type': 'speech', 'seq': seq})
+
+        item = await asyncio.wait_for(queue.get(), timeout=0.1)
+
+        self.assertEqual(item['message']['seq'], 1)
+        self.assertEqual(queue.metrics['gaps'], 0)
+
+    async def test_rejected_sequence_is_not_waited_for(self):
+        queue = IngressQueue(1, policy='slow_down', sequence_key='seq', reorder_timeout=5)
+        queue.put({'type': 'speech', 'seq': 0})
+        self.assertEqual(queue.put({'type': 'speech', 'seq': 1}), 'rejected')
+        await queue.get()
+        queue.put({'type': 'speech', 'seq': 2})
+
+        item = await asyncio.wait_for(queue.get(), timeout=0.1)
+
+        self.assertEqual(item['message']['seq'], 2)
+        self.assertEqual(queue.skipped, set())
+
+    def test_slow_down_policy_rejects_new_message(self):
+        queue = IngressQueue(1, policy='slow_down')
+        queue.put({'type': 'chat_message', 'message': 'first'})
+
+        self.assertEqual(queue.put({'type': 'chat_message', 'message': 'second'}), 'rejected')
+        self.assertEqual(queue.items[0]['message']['message'], 'first')
+
+
+class LaneSchedulerTests(SimpleTestCase):
+    async def test_lanes_run_in_parallel_and_keep_their_own_order(self):
+        processed = []
+        speech_started = asyncio.Event()
+        release_speech = asyncio.Event()
+
+        async def handler(lane, item):
+            message = item['message']
+            if lane == 'speech' and message['seq'] == 0:
+                speech_started.set()
+                await release_speech.wait()
+            processed.append((lane, message.get('seq', message.get('message'))))
+
+        scheduler = LaneScheduler(handler)
+        scheduler.add_lane('speech', 10, sequence_key='seq')
+        scheduler.add_lane('chat', 10)
+        scheduler.start()
+        try:
+            scheduler.submit('speech', {'seq': 0})
+            scheduler.submit('speech', {'seq': 2})
+            scheduler.submit('speech', {'seq': 1})
+            await asyncio.wait_for(speech_started.wait(), timeout=1)
+
+            # Speech lane is blocked; chat is processed anyway, in FIFO order
+            scheduler.submit('chat', {'message': 'a'})
+            scheduler.submit('chat', {'message': 'b'})
+            await asyncio.sleep(0.05)
+            self.assertEqual(processed, [('chat', 'a'), ('chat', 'b')])
+
+            release_speech.set()
+            await asyncio.sleep(0.05)
+            self.assertEqual([seq for lane, seq in processed if lane == 'speech'], [0, 1, 2])
+        finally:
+            await scheduler.stop()
+
+    async def test_failing_message_does_not_stop_lane(self):
+        processed = []
+
+        async def handler(lane, item):
+            if item['message']['fail']:
+                raise RuntimeError("boom")
+            processed.append(item['message'])
+
+        scheduler = LaneScheduler(handler)
+        scheduler.add_lane('chat', 10)
+        scheduler.start()
+        try:
+            scheduler.submit('chat', {'fail': True})
+            scheduler.submit('chat', {'fail': False})
+            await asyncio.sleep(0.05)
+            self.assertEqual(processed, [{'fail': False}])
+        finally:
+            await scheduler.stop()
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+                   INGRESS_QUEUE_SIZE=8, INGRESS_OVERLOAD_POLICY='merge', SPEECH_SEGMENTATION_ENABLED=False)
+class MeetingConsumerLaneTests(SimpleTestCase):
+    def setUp(self):
+        channel_layers.backends = {}
+        self.addCleanup(setattr, channel_layers, 'backends', {})
+
+    async def test_control_and_chat_do_not_wait_for_speech(self):
+        def slow_stt(audio_data, language='en-US'):
+            time.sleep(0.3)
+            return f"transcript {base64.b64decode(audio_data).decode()}"
+
+        application = meeting_application()
+
+        with mock.patch.object(SpeechProcessingService, 'process_speech_chunk', staticmethod(slow_stt)), \
+                mock.patch.object(TranslationService, 'translate_text',
+                                  staticmethod(lambda text, source_lang='auto', target_lang='en', glossary=None: text)):
+            communicator = WebsocketCommunicator(application, "/ws/meeting/1/")
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            try:
+                self.assertEqual((await receive_frames(communicator, 1))[0]['type'], 'participant_joined')
+
+                for seq, text in ((1, b'two'), (0, b'one')):
+                    await communicator.send_to(text_data=json.dumps({
+                        'type': 'speech', 'seq': seq, 'language': 'en-US', 'audio_data': audio(text)
+                    }))
+                await communicator.send_to(text_data=json.dumps({'type': 'request_participants'}))
+                await communicator.send_to(text_data=json.dumps({
+                    'type': 'chat_message', 'message': 'hello', 'language': 'en'
+                }))
+
+                frames = await receive_frames(communicator, 4)
+            finally:
+                await communicator.disconnect()
+
+        types = [frame['type'] for frame in frames]
+        self.assertEqual(set(types[:2]), {'participants_list', 'chat'})
+        self.assertEqual(types[2:], ['speech', 'speech'])
+        # 'one' (seq 0) arrived after 'two' (seq 1) but is processed first
+        self.assertEqual([frame['original_text'] for frame in frames[2:]],
+                         ['transcript one', 'transcript two'])
+
+
+class UtteranceBufferTests(SimpleTestCase):
+    def test_chunks_are_joined_until_sentence_end(self):
+        buffer = UtteranceBuffer()
+
+        self.assertIsNone(buffer.append("I have worked", 'en-US', timestamp=1))
+        self.assertIsNone(buffer.append("with Django for"))
+        self.assertEqual(buffer.interim()['text'], "I have worked with Django for")
+
+        utterance = buffer.append("five years.", timestamp=3)
+        self.assertEqual(utterance['text'], "I have worked with Django for five years.")
+        self.assertEqual((utterance['language'], utterance['timestamp'], utterance['chunks']), ('en-US', 1, 3))
+        self.assertIsNone(buffer.flush())
+
+    def test_flush_completes_open_utterance(self):
+        buffer = UtteranceBuffer()
+        buffer.append("so the plan is")
+
+        first = buffer.flush()
+        self.assertEqual(first['text'], "so the plan is")
+
+        buffer.append("Next one?")  # completes immediately
+        self.assertIsNone(buffer.interim())
+
+    def test_utterance_ids_are_unique_across_buffers(self):
+        # Buffers in two worker processes (or before and after a restart) never share an id
+        first, second = UtteranceBuffer(), UtteranceBuffer()
+
+        ids = [first.append("One.")['id'], second.append("One.")['id'], first.append("Two.")['id']]
+
+        self.assertEqual(len(set(ids)), 3)
+        self.assertTrue(all(isinstance(utterance_id, str) and utterance_id for utterance_id in ids))
+
+    def test_long_utterance_is_completed_without_punctuation(self):
+        buffer = UtteranceBuffer(max_chars=20)
+
+        self.assertIsNone(buffer.append("one two three"))
+        self.assertEqual(buffer.append("four five six")['chunks'], 2)
+
+
+class ChunkAlignerTests(SimpleTestCase):
+    def test_longest_suffix_prefix_overlap(self):
+        self.assertEqual(longest_overlap("a b c d".split(), "c d e".split()), 2)
+        self.assertEqual(longest_overlap("a b a b".split(), "a b a b c".split()), 4)
+        self.assertEqual(longest_overlap("a b c".split(), "b d".split()), 0)
+
+    def test_only_new_tail_is_kept(self):
+        aligner = ChunkAligner(min_overlap=2)
+
+        self.assertEqual(aligner.align("I have been working with"), "I have been working with")
+        self.assertEqual(aligner.align("working with Django, and"), "Django, and")
+        # A retried window that only repeats earlier text
+        self.assertEqual(aligner.align("Django and"), "")
+
+    def test_single_repeated_word_is_kept(self):
+        aligner = ChunkAligner(min_overlap=2)
+        aligner.align("we tried that")
+
+        self.assertEqual(aligner.align("that worked"), "that worked")
+
+    def test_reset_keeps_a_new_sentence_whole(self):
+        aligner = ChunkAligner(min_overlap=2)
+        aligner.align("we ship it today.")
+        aligner.reset()
+
+        self.assertEqual(aligner.align("ship it today is the plan"), "ship it today is the plan")
+
+    def test_history_is_forgotten_after_a_silence_gap(self):
+        aligner = ChunkAligner(min_overlap=2, gap_seconds=3)
+        with mock.patch('meetings.segmentation.time.monotonic', return_value=100.0):
+            aligner.align("we ship it today")
+        with mock.patch('meetings.segmentation.time.monotonic', return_value=101.0):
+            self.assertEqual(aligner.align("it today and"), "and")
+        with mock.patch('meetings.segmentation.time.monotonic', return_value=110.0):
+            self.assertEqual(aligner.align("today and tomorrow"), "today and tomorrow")
+
+    def test_celery_chunks_are_aligned_across_tasks(self):
+        self.assertEqual(align_chunk(91, 1, "I have been working with"), "I have been working with")
+        self.assertEqual(align_chunk(91, 1, "working with Django"), "Django")
+        # Another participant has its own history
+        self.assertEqual(align_chunk(91, 2, "working with Django"), "working with Django")
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+                   SPEECH_SEGMENTATION_ENABLED=True, SPEECH_UTTERANCE_PAUSE_MS=100)
+class SpeechSegmentationTests(SimpleTestCase):
+    def setUp(self):
+        channel_layers.backends = {}
+        self.addCleanup(setattr, channel_layers, 'backends', {})
+
+    async def test_utterance_is_translated_once(self):
+        translate = mock.Mock(side_effect=lambda text, source_lang='auto', target_lang='en', glossary=None:
+                              f"[{target_lang}] {text}")
+        application = meeting_application()
+
+        def stt(audio_data, language='en-US'):
+            return base64.b64decode(audio_data).decode()
+
+        with mock.patch.object(SpeechProcessingService, 'process_speech_chunk', staticmethod(stt)), \
+                mock.patch.object(TranslationService, 'translate_text', staticmethod(translate)):
+            communicator = WebsocketCommunicator(application, "/ws/meeting/5/")
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            try:
+                await receive_frames(communicator, 1)
+                for seq, text in enumerate((b'We use', b'React and', b'Django.', b'Then')):
+                    await communicator.send_to(text_data=json.dumps({
+                        'type': 'speech', 'seq': seq, 'language': 'en-US', 'audio_data': audio(text)
+                    }))
+                frames = await receive_frames(communicator, 5)
+            finally:
+                await communicator.disconnect()
+
+        self.assertEqual([frame['type'] for frame in frames],
+                         ['speech_interim', 'speech_interim', 'speech', 'speech_interim', 'speech'])
+        self.assertEqual(frames[1]['text'], "We use React and")
+        self.assertEqual(frames[2]['original_text'], "We use React and Django.")
+        self.assertEqual(frames[2]['utterance_id'], frames[0]['utterance_id'])
+        # "Then" is completed by the pause timer
+        self.assertEqual(frames[4]['original_text'], "Then")
+        # One translation call per utterance and target language (en -> ro)
+        self.assertEqual(translate.call_count, 2)
+
+    async def test_repeated_phrase_starts_the_next_utterance(self):
+        application = meeting_application()
+
+        def stt(audio_data, language='en-US'):
+            return base64.b64decode(audio_data).decode()
+
+        with mock.patch.object(SpeechProcessingService, 'process_speech_chunk', staticmethod(stt)), \
+                mock.patch.object(TranslationService, 'translate_text',
+                                  staticmethod(lambda text, source_lang='auto', target_lang='en', glossary=None: text)):
+            communicator = WebsocketCommunicator(application, "/ws/meeting/6/")
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            try:
+                await receive_frames(communicator, 1)
+                for seq, text in enumerate((b'We ship it today.', b'Ship it today works')):
+                    await communicator.send_to(text_data=json.dumps({
+                        'type': 'speech', 'seq': seq, 'language': 'en-US', 'audio_data': audio(text)
+                    }))
+                frames = await receive_frames(communicator, 3)
+            finally:
+                await communicator.disconnect()
+
+        speech = [frame['original_text'] for frame in frames if frame['type'] == 'speech']
+        self.assertEqual(speech, ["We ship it today.", "Ship it today works"])
+
+
+class MeetingSummaryTests(SimpleTestCase):
+    def test_windows_are_bounded(self):
+        lines = [(index, f"Ana: line number {index} of the meeting") for index in range(1, 50)]
+
+        window, full = take_window(lines, window_tokens=40)
+        self.assertTrue(full)
+        self.assertLessEqual(sum(len(line) // 4 for _, line in window), 40)
+        self.assertEqual(window[0][0], 1)
+
+        window, full = take_window(lines[:2], window_tokens=40)
+        self.assertEqual((len(window), full), (2, False))
+
+    def test_local_model_respects_budget(self):
+        model = ExtractiveSummaryModel()
+        text = ("Ana: We will migrate the billing service to Django. "
+                "Ion: The billing migration needs two sprints. "
+                "Ana: Lunch was good. "
+                "Ion: Django migration of billing starts Monday.")
+
+        summary = model.summarize(text, max_tokens=25)
+
+        self.assertLessEqual(len(summary) // 4, 25)
+        self.assertIn("billing", summary)
+        self.assertNotIn("Lunch", summary)
+
+    def test_merge_keeps_running_summary_bounded(self):
+        model = ExtractiveSummaryModel()
+        summary = ''
+        for window in range(20):
+            partial = model.summarize(f"Ana: Window {window} discussed the Django billing migration.", 50)
+            summary = model.merge(summary, partial, 50)
+
+        self.assertLessEqual(len(summary) // 4, 50)
+
+
+class InMemorySummarizer(MeetingSummarizer):
+    """MeetingSummarizer over an in-memory meeting; the first conflicts stores lose the compare-and-set."""
+
+    def __init__(self, lines, conflicts=0, **kwargs):
+        super().__init__(model=ExtractiveSummaryModel(), window_tokens=40, summary_token_budget=50,
+                         max_workers=1, conflict_backoff=0, **kwargs)
+        self.lines = lines
+        self.conflicts = conflicts
+        self.summary, self.folded_until = '', None
+
+    def _load(self, meeting_id):
+        return self.summary, self.folded_until
+
+    def _lines(self, meeting_id, after, limit):
+        return [line for line in self.lines if line[0] > (after or 0)][:limit]
+
+    def _store(self, meeting_id, expected, summary, last_transcript_id):
+        if self.conflicts or expected != self.folded_until:
+            self.conflicts = max(self.conflicts - 1, 0)
+            return False
+        self.summary, self.folded_until = summary, last_transcript_id
+        return True
+
+
+class MeetingSummarizerTests(SimpleTestCase):
+    def lines(self, count):
+        return [(index, f"Ana: billing migration step {index} is planned.") for index in range(1, count + 1)]
+
+    def test_fold_window_keeps_partial_window_until_final(self):
+        summarizer = InMemorySummarizer(self.lines(2))
+
+        self.assertEqual(summarizer.fold_window(1), (MeetingSummarizer.FOLD_DONE, ''))
+        self.assertIsNone(summarizer.folded_until)
+
+        outcome, summary = summarizer.fold_window(1, final=True)
+        self.assertEqual(outcome, MeetingSummarizer.FOLD_DONE)
+        self.assertIn("billing", summary)
+        self.assertEqual(summarizer.folded_until, 2)
+
+    def test_finalize_folds_every_window(self):
+        summarizer = InMemorySummarizer(self.lines(12))
+
+        summary = summarizer.finalize(1)
+
+        self.assertEqual(summarizer.folded_until, 12)
+        self.assertEqual(summary, summarizer.summary)
+        self.assertGreater(summarizer.metrics['windows'], 1)
+
+    def test_conflict_is_retried(self):
+        summarizer = InMemorySummarizer(self.lines(2), conflicts=2)
+
+        self.assertEqual(summarizer.fold_window(1, final=True), (MeetingSummarizer.FOLD_CONFLICT, None))
+        summarizer.finalize(1)
+
+        self.assertEqual(summarizer.folded_until, 2)
+        self.assertEqual(summarizer.metrics['conflicts'], 2)
+
+    def test_conflicts_are_bounded(self):
+        summarizer = InMemorySummarizer(self.lines(2), conflicts=100, max_conflicts=3)
+
+        self.assertEqual(summarizer.finalize(1), '')
+        self.assertEqual(summarizer.metrics['conflicts'], 4)
+        self.assertIsNone(summarizer.folded_until)
+
+    def test_finalize_waits_for_running_fold(self):
+        summarizer = InMemorySummarizer(self.lines(12))
+        self.addCleanup(lambda: summarizer.executor and summarizer.executor.shutdown())
+
+        with mock.patch('meetings.summarization.close_old_connections'):
+            summarizer.note_transcript(1, "x" * 400)
+            summary = summarizer.finalize(1)
+
+        self.assertEqual(summarizer.folded_until, 12)
+        self.assertEqual(summary, summarizer.summary)
+        self.assertEqual(summarizer.metrics['conflicts'], 0)
+        self.assertEqual(summarizer.metrics['errors'], 0)
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class EndSessionSummaryTests(TestCase):
+    def setUp(self):
+        channel_layers.backends = {}
+        self.addCleanup(setattr, channel_layers, 'backends', {})
+
+    def test_summary_covers_last_transcript_when_end_session_returns(self):
+        user = User.objects.create(username='owner')
+        meeting = Meeting.objects.create(title="Interview", created_by=user, meeting_url='end-session')
+        participant = MeetingParticipant.objects.create(meeting=meeting, name="Ana")
+        for step in range(3):
+            Transcript.objects.create(meeting=meeting, participant=participant, source_language='en',
+                                      original_text=f"The billing migration step {step} is planned.")
+        last = Transcript.objects.create(meeting=meeting, participant=participant, source_language='en',
+                                         original_text="Deployment happens Friday.")
+        summarizer = MeetingSummarizer(model=ExtractiveSummaryModel(), window_tokens=1000,
+                                       summary_token_budget=200, max_workers=1)
+
+        with mock.patch('meetings.services.meeting_summarizer', summarizer):
+            self.assertTrue(SessionManager().end_session(str(meeting.id), user.id))
+
+        meeting.refresh_from_db()
+        self.assertEqual(meeting.status, 'completed')
+        self.assertEqual(meeting.summary_transcript_id, last.id)
+        self.assertIn("Deployment happens Friday.", meeting.summary)
+
+
+class TranscriptArchiveTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.archive = TranscriptArchive(directory.name, max_segment_bytes=4096)
+        self.addCleanup(self.archive.close)
+
+    def records(self, meeting_id, count):
+        return [{'id': index, 'participant_id': 1, 'participant_name': 'Ana',
+                 'original_text': f"meeting {meeting_id} line {index}", 'original_language': 'en',
+                 'timestamp': '2026-01-01T10:00:00', 'translations': {'ro': {'id': index, 'text': f"rândul {index}"}}}
+                for index in range(count)]
+
+    def test_meetings_are_read_back_by_offset(self):
+        locations = {}
+        for meeting_id in (1, 2, 3):
+            locations[meeting_id] = self.archive.write_meeting(meeting_id, self.records(meeting_id, 5))
+            # The segment is mapped on the first read and remapped after it grows
+            self.assertEqual(self.archive.read_meeting(*locations[meeting_id]), self.records(meeting_id, 5))
+
+        for meeting_id, location in locations.items():
+            self.assertEqual(self.archive.read_meeting(*location), self.records(meeting_id, 5))
+
+        # Blocks are appended to the same segment, each at its own offset
+        self.assertEqual({location[0] for location in locations.values()}, {'segment-000001.jsonl.z'})
+        self.assertEqual(len({location[1] for location in locations.values()}), 3)
+
+    def test_segments_rotate(self):
+        first = self.archive.write_meeting(1, self.records(1, 5))
+
+        # Incompressible text does not fit in the rest of the first segment
+        big = [{'id': 0, 'original_text': os.urandom(6000).hex()}]
+        second = self.archive.write_meeting(2, big)
+
+        self.assertEqual((first[0], second[0]), ('segment-000001.jsonl.z', 'segment-000002.jsonl.z'))
+        self.assertEqual(self.archive.read_meeting(*first), self.records(1, 5))
+        self.assertEqual(self.archive.read_meeting(*second), big)
+
+    def test_segment_names_are_validated(self):
+        with self.assertRaises(ValueError):
+            self.archive.read_meeting('../settings.py', 0, 10)
+
+    def test_appends_from_two_archives_do_not_interleave(self):
+        # Two instances on the same directory stand for two processes (or hosts on a shared volume)
+        other = TranscriptArchive(self.archive.directory, max_segment_bytes=4096)
+        self.addCleanup(other.close)
+        locations = {}
+
+        def write(archive, meeting_ids):
+            for meeting_id in meeting_ids:
+                locations[meeting_id] = archive.write_meeting(meeting_id, self.records(meeting_id, 3))
+
+        threads = [threading.Thread(target=write, args=(self.archive, range(0, 20))),
+                   threading.Thread(target=write, args=(other, range(20, 40)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for meeting_id, location in locations.items():
+            self.assertEqual(other.read_meeting(*location), self.records(meeting_id, 3))
+            self.assertEqual(self.archive.read_meeting(*location), self.records(meeting_id, 3))
+
+    def test_reads_survive_concurrent_remaps(self):
+        first = self.archive.write_meeting(1, self.records(1, 3))
+        self.archive.read_meeting(*first)
+        errors = []
+
+        def read():
+            try:
+                for _ in range(200):
+                    self.archive.read_meeting(*first)
+            except Exception as e:
+                errors.append(e)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        # Every read of a new block remaps the grown segment
+        for meeting_id in range(2, 30):
+            self.archive.read_meeting(*self.archive.write_meeting(meeting_id, self.records(meeting_id, 1)))
+        for reader in readers:
+            reader.join()
+
+        self.assertEqual(errors, [])
+
+    def test_only_one_run_holds_the_archive(self):
+        other = TranscriptArchive(self.archive.directory, max_segment_bytes=4096)
+
+        with self.archive.file_lock(TranscriptArchive.RUN_LOCK, blocking=False):
+            with self.assertRaises(BlockingIOError):
+                with other.file_lock(TranscriptArchive.RUN_LOCK, blocking=False):
+                    pass
+
+        with other.file_lock(TranscriptArchive.RUN_LOCK, blocking=False):
+            pass
+
+    def test_missing_segment_points_at_shared_storage(self):
+        with self.assertRaisesRegex(FileNotFoundError, 'TRANSCRIPT_ARCHIVE_DIR'):
+            self.archive.read_meeting('segment-000009.jsonl.z', 0, 10)
+
+
+class TranscriptPartitionTests(SimpleTestCase):
+    def test_add_months_crosses_years(self):
+        self.assertEqual(add_months(date(2026, 11, 1), 3), date(2027, 2, 1))
+        self.assertEqual(add_months(date(2026, 1, 1), -1), date(2025, 12, 1))
+        self.assertEqual(add_months(date(2026, 1, 1), -13), date(2024, 12, 1))
+
+    def test_partition_name(self):
+        self.assertEqual(partition_name('meetings_transcript', date(2026, 3, 1)), 'meetings_transcript_p2026_03')
+
+    def test_parse_bounds(self):
+        self.assertEqual(parse_bounds("FOR VALUES FROM ('2026-10-01 00:00:00') TO ('2026-11-01 00:00:00')"),
+                         (date(2026, 10, 1), date(2026, 11, 1)))
+        self.assertEqual(parse_bounds("FOR VALUES FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00')"),
+                         (date(2026, 12, 1), date(2027, 1, 1)))
+        self.assertIsNone(parse_bounds("DEFAULT"))
+
+
+@skipUnless(connection.vendor == 'postgresql', "Partitioning needs Postgres")
+class TranscriptPartitionMigrationTests(TransactionTestCase):
+    """Reverse and re-apply the partitioning of migration 0004 on a small dataset, in small batches."""
+
+    def rows(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id, meeting_id, participant_id, original_text, timestamp "
+                           "FROM meetings_transcript ORDER BY id")
+            transcripts = cursor.fetchall()
+            cursor.execute("SELECT id, transcript_id, translated_text, target_language FROM meetings_translation "
+                           "ORDER BY id")
+            return transcripts, cursor.fetchall()
+
+    def test_round_trip_keeps_rows_and_ids(self):
+        migration = import_module('meetings.migrations.0004_partition_transcripts')
+        user = User.objects.create(username='owner')
+        meeting = Meeting.objects.create(title="Interview", created_by=user, meeting_url='round-trip')
+        participant = MeetingParticipant.objects.create(meeting=meeting, name="Ana")
+        for index in range(7):
+            transcript = Transcript.objects.create(meeting=meeting, participant=participant,
+                                                   original_text=f"line {index}", source_language='en')
+            Translation.objects.create(transcript=transcript, translated_text=f"rândul {index}", target_language='ro')
+        before = self.rows()
+
+        migration.rebuild_tables(connection, partitioned=False, batch_size=3)
+        self.assertFalse(is_partitioned('meetings_transcript'))
+        self.assertEqual(self.rows(), before)
+
+        migration.rebuild_tables(connection, partitioned=True, batch_size=3)
+        self.assertTrue(is_partitioned('meetings_transcript'))
+        self.assertTrue(is_partitioned('meetings_translation'))
+        self.assertEqual(self.rows(), before)
+
+        # New rows continue after the copied ids
+        transcript = Transcript.objects.create(meeting=meeting, participant=participant,
+                                               original_text="after", source_language='en')
+        self.assertGreater(transcript.id, before[0][-1][0])
+
+
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.monitor = db_routers.ReplicaMonitor(replicas=['replica_1', 'replica_2'], max_lag_seconds=2,
+                                                 check_seconds=5, read_your_writes_seconds=5)
+        self.lag = {'replica_1': 0.1, 'replica_2': 0.1}
+        patcher = mock.patch.object(self.monitor, 'replica_lag', side_effect=lambda alias: self.lag[alias])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_rotate_over_replicas(self):
+        self.assertEqual([self.monitor.choose() for _ in range(4)],
+                         ['replica_1', 'replica_2', 'replica_1', 'replica_2'])
+
+    def test_lagging_replicas_fall_back_to_the_primary(self):
+        self.lag['replica_1'] = 30
+        self.assertEqual({self.monitor.choose() for _ in range(4)}, {'replica_2'})
+
+        self.lag['replica_2'] = float('inf')
+        self.assertEqual(self.monitor.choose(), 'default')
+        self.assertEqual(self.monitor.get_metrics()['primary_reads_lagging'], 1)
+
+    def test_user_reads_own_writes_from_the_primary(self):
+        self.monitor.note_write('replica-test-writer')
+
+        self.assertEqual(self.monitor.choose('replica-test-writer'), 'default')
+        self.assertIn(self.monitor.choose('replica-test-reader'), ('replica_1', 'replica_2'))
+
+    def test_router_only_uses_replicas_inside_replica_reads(self):
+        router = db_routers.ReplicaRouter()
+        with mock.patch.object(db_routers, 'replica_monitor', self.monitor):
+            self.assertEqual(router.db_for_read(None), 'default')
+            with db_routers.replica_reads():
+                self.assertEqual(router.db_for_read(None), 'replica_1')
+                self.assertEqual(router.db_for_write(None), 'default')
+
+
+class DatabaseExecutorTests(SimpleTestCase):
+    def setUp(self):
+        self.executor = DatabaseExecutor(max_workers=1)
+        self.addCleanup(self.executor.shutdown)
+
+    async def test_calls_beyond_the_pool_size_wait_in_the_queue(self):
+        release = threading.Event()
+
+        first = asyncio.ensure_future(self.executor.run(release.wait, 5))
+        second = asyncio.ensure_future(self.executor.run(lambda: 'done'))
+        await asyncio.sleep(0.05)
+
+        metrics = self.executor.get_metrics()
+        self.assertEqual((metrics['busy'], metrics['queued']), (1, 1))
+
+        release.set()
+        self.assertEqual(await second, 'done')
+        await first
+
+        metrics = self.executor.get_metrics()
+        self.assertEqual((metrics['calls'], metrics['busy'], metrics['queued']), (2, 0, 0))
+        self.assertGreater(metrics['wait_time']['max'], 0.04)
+
+    async def test_context_and_errors_reach_the_caller(self):
+        with db_routers.acting_user(7):
+            self.assertEqual(await self.executor.run(db_routers.current_user_id), 7)
+
+        with self.assertRaises(ZeroDivisionError):
+            await self.executor.run(lambda: 1 / 0)
+        self.assertEqual(self.executor.get_metrics()['errors'], 1)
+
+
+class SpeechTaskRoutingTests(SimpleTestCase):
+    @override_settings(CELERY_SPEECH_QUEUES=4)
+    def test_meeting_always_routes_to_same_queue(self):
+        route = route_by_meeting(SPEECH_TASK_NAME, (), {'meeting_id': 42}, {})
+
+        self.assertEqual(route, {'queue': speech_queue_for_meeting(42)})
+        self.assertEqual(route, route_by_meeting(SPEECH_TASK_NAME, (), {'meeting_id': '42'}, {}))
+        # Flushes of an utterance follow the meeting's chunks in the same queue
+        self.assertEqual(route, route_by_meeting(FLUSH_TASK_NAME, (), {'meeting_id': 42}, {}))
+        self.assertIn(route['queue'], {f"speech.{i}" for i in range(4)})
+
+    def test_other_tasks_use_default_routing(self):
+        self.assertIsNone(route_by_meeting('meetings.other', (), {}, {}))
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+                   SUGGESTION_DEBOUNCE_SECONDS=0.1)
+class SuggestionDebounceTests(SimpleTestCase):
+    def setUp(self):
+        channel_layers.backends = {}
+        self.addCleanup(setattr, channel_layers, 'backends', {})
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    async def test_rapid_requests_are_coalesced_into_one_stream(self):
+        contexts = []
+
+        async def stream(context, language='ro', meeting_type='interview', user_role='interviewee',
+                         num_suggestions=3):
+            contexts.append(context)
+            for delta in ("1. Ask about the role\n", "2. Ask about the team\n"):
+                yield delta
+
+        application = meeting_application()
+
+        with mock.patch.object(AISuggestionService, 'stream_suggestions', staticmethod(stream)):
+            communicator = WebsocketCommunicator(application, "/ws/meeting/5/")
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            try:
+                await receive_frames(communicator, 1)
+                for index in range(5):
+                    await communicator.send_to(text_data=json.dumps({
+                        'type': 'request_suggestions', 'context': f"Ana: question {index}"
+                    }))
+                frames = await receive_frames(communicator, 3)
+                # Nothing else arrives for the superseded requests
+                with self.assertRaises(asyncio.TimeoutError):
+                    await receive_frames(communicator, 1, timeout=0.3)
+            finally:
+                await communicator.disconnect()
+
+        self.assertEqual(contexts, ["Ana: question 4"])
+        self.assertEqual([frame['type'] for frame in frames], ['suggestion_delta', 'suggestion_delta', 'suggestions'])
+        self.assertEqual(frames[-1]['suggestions'], ["1. Ask about the role", "2. Ask about the team"])
+        self.assertEqual(len({frame['request_id'] for frame in frames}), 1)
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+                   SPEECH_PROCESSING_MODE='celery', CELERY_TASK_ALWAYS_EAGER=True,
+                   CELERY_TASK_EAGER_PROPAGATES=True, CELERY_BROKER_URL='memory://')
+class SpeechOffloadTests(SimpleTestCase):
+    """Celery mode with an eager, in-memory broker: the task runs in-process."""
+
+    def setUp(self):
+        channel_layers.backends = {}
+        self.addCleanup(setattr, channel_layers, 'backends', {})
+
+        # The Celery app reads the CELERY_* settings when it is configured, so reload them around the test
+        celery_app.config_from_object('django.conf:settings', namespace='CELERY')
+        self.addCleanup(celery_app.config_from_object, 'django.conf:settings', namespace='CELERY')
+        # Open utterances and aligned chunks are kept in the cache between tasks
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def speak(self, *texts):
+        """Patch STT to return texts one chunk at a time, and the worker's database and translation calls."""
+        chunks = iter(texts)
+        patches = [
+            mock.patch.object(SpeechProcessingService, 'process_speech_chunk',
+                              staticmethod(lambda audio_data, language='en-US': next(chunks))),
+            mock.patch.object(TranslationService, 'translate_text',
+                              staticmethod(lambda text, source_lang='auto', target_lang='en', glossary=None:
+                                           f"[{target_lang}] {text}")),
+            mock.patch.object(LanguageDetectionService, 'detect_language',
+                              staticmethod(lambda text, hint=None: 'en')),
+            mock.patch('meetings.tasks.save_translation', return_value=True),
+            mock.patch('meetings.tasks.get_participant_name', return_value="Ana"),
+            mock.patch('meetings.tasks.get_participant_languages', return_value=['en', 'ro']),
+            mock.patch('meetings.tasks.get_glossaries', return_value=None),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        save_transcript = mock.patch('meetings.tasks.save_transcript', return_value=7)
+        self.addCleanup(save_transcript.stop)
+        return save_transcript.start()
+
+    async def send_chunks(self, count, frames):
+        communicator = WebsocketCommunicator(meeting_application(), "/ws/meeting/3/")
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        try:
+            await receive_frames(communicator, 1)
+            for seq in range(count):
+                await communicator.send_to(text_data=json.dumps({
+                    'type': 'speech', 'seq': seq, 'language': 'en-US', 'audio_data': audio(b'x')
+                }))
+            return await receive_frames(communicator, frames)
+        finally:
+            await communicator.disconnect()
+
+    async def test_worker_joins_chunks_into_utterance(self):
+        save_transcript = self.speak("hello", "world.")
+
+        interim, frame = await self.send_chunks(2, 2)
+
+        self.assertEqual(interim['type'], 'speech_interim')
+        self.assertEqual(interim['text'], "hello")
+        self.assertEqual(frame['type'], 'speech')
+        self.assertEqual(frame['original_text'], "hello world.")
+        self.assertEqual(frame['utterance_id'], interim['utterance_id'])
+        self.assertEqual(frame['translations'], {'ro': "[ro] hello world."})
+        save_transcript.assert_called_once_with('3', mock.ANY, "hello world.", 'en')
+
+    @override_settings(SPEECH_UTTERANCE_PAUSE_MS=50)
+    async def test_pause_flushes_utterance_in_worker(self):
+        save_transcript = self.speak("hello")
+
+        interim, frame = await self.send_chunks(1, 2)
+
+        self.assertEqual(interim['type'], 'speech_interim')
+        self.assertEqual(frame['type'], 'speech')
+        self.assertEqual(frame['original_text'], "hello")
+        self.assertEqual(frame['utterance_id'], interim['utterance_id'])
+        save_transcript.assert_called_once()
+
+    @override_settings(SPEECH_SEGMENTATION_ENABLED=False)
+    async def test_worker_result_is_published_to_meeting_group(self):
+        save_transcript = self.speak("hello")
+
+        frame = (await self.send_chunks(1, 1))[0]
+
+        self.assertEqual(frame['type'], 'speech')
+        self.assertEqual(frame['original_text'], "hello")
+        self.assertEqual(frame['translations'], {'ro': "[ro] hello"})
+        save_transcript.assert_called_once()
+
+    @override_settings(SPEECH_SEGMENTATION_ENABLED=False)
+    async def test_context_is_kept_when_transcript_is_not_saved(self):
+        save_transcript = self.speak("hello")
+        save_transcript.return_value = None
+
+        with mock.patch('meetings.tasks.conversation_context') as context, \
+                mock.patch('meetings.tasks.suggestion_cache') as suggestions, \
+                mock.patch('meetings.tasks.meeting_summarizer') as summarizer:
+            await self.send_chunks(1, 1)
+
+        context.append.assert_called_once_with('3', "Ana", "hello")
+        suggestions.invalidate_meeting.assert_called_once_with('3')
+        summarizer.note_transcript.assert_not_called()
+
+
+class RecordingSpanExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def named(self, name):
+        return next(recorded for recorded in self.spans if recorded['name'] == name)
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class TracingTests(SimpleTestCase):
+    def setUp(self):
+        channel_layers.backends = {}
+        self.addCleanup(setattr, channel_layers, 'backends', {})
+        self.exporter = RecordingSpanExporter()
+        set_exporter(self.exporter)
+        self.addCleanup(set_exporter, None)
+
+    def test_spans_nest(self):
+        with span('outer'):
+            with span('inner', lane='chat'):
+                pass
+            with span('other', trace_id='t1', parent_id='p1'):
+                pass
+
+        outer, inner, other = (self.exporter.named(name) for name in ('outer', 'inner', 'other'))
+        self.assertIsNone(outer['parent_id'])
+        self.assertEqual((inner['trace_id'], inner['parent_id']), (outer['trace_id'], outer['span_id']))
+        self.assertEqual(inner['attributes'], {'lane': 'chat'})
+        # An explicit trace (e.g. received through the channel layer) is continued as given
+        self.assertEqual((other['trace_id'], other['parent_id']), ('t1', 'p1'))
+
+    async def test_trace_follows_message_through_lane_queue(self):
+        application = meeting_application()
+
+        with mock.patch.object(LanguageDetectionService, 'detect_language',
+                               staticmethod(lambda text, hint=None: 'en')), \
+                mock.patch.object(TranslationService, 'translate_text',
+                                  staticmethod(lambda text, source_lang='auto', target_lang='en', glossary=None:
+                                               f"[{target_lang}] {text}")):
+            communicator = WebsocketCommunicator(application, "/ws/meeting/4/")
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            try:
+                await receive_frames(communicator, 1)
+                await communicator.send_to(text_data=json.dumps({
+                    'type': 'chat_message', 'message': 'hello', 'language': 'en'
+                }))
+                self.assertEqual((await receive_frames(communicator, 1))[0]['type'], 'chat')
+            finally:
+                await communicator.disconnect()
+
+        receive = next(recorded for recorded in self.exporter.spans if recorded['name'] == 'receive'
+                       and recorded['attributes'].get('message_type') == 'chat_message')
+        process, group_send, deliver = (self.exporter.named(name) for name in ('process_chat', 'group_send', 'deliver'))
+
+        self.assertEqual({receive['trace_id'], process['trace_id'], group_send['trace_id'], deliver['trace_id']},
+                         {receive['trace_id']})
+        # The lane worker continues the span that queued the message, after the receive span ended
+        self.assertEqual(process['parent_id'], receive['span_id'])
+        self.assertEqual(group_send['parent_id'], process['span_id'])
+        self.assertEqual(deliver['parent_id'], group_send['span_id'])
+
+    def test_jsonl_exporter_writes_in_background(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        exporter = JSONLSpanExporter(os.path.join(directory.name, 'traces.jsonl'))
+
+        exporter.export({'name': 'first'})
+        exporter.export({'name': 'second'})
+        exporter.flush()
+
+        self.assertIsNot(exporter.thread, threading.current_thread())
+        with open(exporter.path, encoding='utf-8') as spans_file:
+            self.assertEqual([json.loads(line)['name'] for line in spans_file], ['first', 'second'])
+
+    def test_jsonl_exporter_drops_spans_when_full(self):
+        exporter = JSONLSpanExporter(os.devnull, queue_size=1)
+        exporter.thread = threading.current_thread()  # no writer: the queue only fills up
+
+        exporter.export({'name': 'kept'})
+        exporter.export({'name': 'dropped'})
+
+        self.assertEqual((exporter.queue.qsize(), exporter.dropped), (1, 1))
+
+
+class LoadTestCommandTests(SimpleTestCase):
+    def run_command(self, *args):
+        out = StringIO()
+        call_command(*args, '--json', stdout=out)
+        return json.loads(out.getvalue())
+
+    def test_benchmark_fanout_uses_one_encoder(self):
+        with mock.patch('meetings.loadtest.encode_frame', wraps=encode_frame) as encode:
+            report = self.run_command('benchmark_fanout', '--sizes', '2,4', '--iterations', '3')
+
+        self.assertEqual(report['encoder'], 'orjson' if orjson is not None else 'json')
+        self.assertEqual([row['participants'] for row in report['results']], [2, 4])
+        # Per recipient: one encoding per participant and broadcast (plus the warm-up)
+        self.assertEqual(encode.call_count, (2 + 4) * (3 + 1))
+        for row in report['results']:
+            self.assertGreater(row['per_recipient_us'], 0)
+
+    def test_loadtest_meetings_reports_deliveries(self):
+        report = self.run_command('loadtest_meetings', '--meetings', '2', '--participants', '2',
+                                  '--duration', '1', '--speech-interval', '0.2', '--chat-interval', '0.3',
+                                  '--stt-latency', '0', '--translation-latency', '0')
+
+        self.assertEqual((report['meetings'], report['participants_per_meeting']), (2, 2))
+        self.assertEqual((report['connected'], report['connect_failures']), (4, 0))
+        self.assertGreater(report['messages_sent'], 0)
+        self.assertGreater(report['messages_delivered'], 0)
+        self.assertEqual(report['delivery_latency']['count'], report['messages_delivered'])
+
+
+class FrameCodecTests(SimpleTestCase):
+    frame = {'type': 'speech', 'participant_id': 1, 'name': 'Ana', 'original_text': 'salut ' * 100,
+             'original_language': 'ro', 'translations': {'en': 'hello ' * 100}, 'timestamp': None}
+
+    def test_json_is_the_default(self):
+        codec, subprotocol = negotiate_codec({'subprotocols': [], 'query_string': b''})
+
+        self.assertEqual(codec.name, 'json')
+        self.assertIsNone(subprotocol)
+        text_data, bytes_data = codec.encode(self.frame)
+        self.assertIsNone(bytes_data)
+        self.assertEqual(json.loads(text_data), self.frame)
+
+    def test_subprotocol_wins_over_query_string(self):
+        codec, subprotocol = negotiate_codec({
+            'subprotocols': ['other', 'meeting.msgpack+deflate', 'meeting.json'],
+            'query_string': b'encoding=json'
+        })
+
+        self.assertEqual(codec.name, 'msgpack+deflate')
+        self.assertEqual(subprotocol, 'meeting.msgpack+deflate')
+
+    def test_query_string_negotiation(self):
+        codec, subprotocol = negotiate_codec({'query_string': b'token=x&encoding=msgpack'})
+
+        self.assertEqual(codec.name, 'msgpack')
+        self.assertIsNone(subprotocol)
+
+    def test_unknown_encoding_falls_back_to_json(self):
+        codec, _ = negotiate_codec({'query_string': b'encoding=xml'})
+
+        self.assertEqual(codec.name, 'json')
+
+    def test_msgpack_deflate_round_trip(self):
+        codec, _ = negotiate_codec({'query_string': b'encoding=msgpack&compression=deflate'})
+
+        text_data, bytes_data = codec.encode_json(encode_frame(self.frame))
+
+        self.assertIsNone(text_data)
+        self.assertEqual(bytes_data[0], FrameCodec.FLAG_DEFLATE)
+        self.assertLess(len(bytes_data), len(encode_frame(self.frame)))
+        self.assertEqual(codec.decode(bytes_data=bytes_data), self.frame)
+
+    def test_small_frames_are_not_compressed(self):
+        codec = FrameCodec('json', 'deflate')
+
+        _, bytes_data = codec.encode({'type': 'participant_left', 'participant_id': 1})
+
+        self.assertEqual(bytes_data[0], FrameCodec.FLAG_RAW)
+        self.assertEqual(codec.decode(bytes_data=bytes_data), {'type': 'participant_left', 'participant_id': 1})
+
+    def test_oversized_compressed_frame_is_rejected(self):
+        codec = FrameCodec('json', 'deflate')
+        # A few kilobytes that expand past MAX_FRAME_BYTES
+        bomb = bytes([FrameCodec.FLAG_DEFLATE]) + zlib.compress(b' ' * (FrameCodec.MAX_FRAME_BYTES + 1))
+        self.assertLess(len(bomb), 10000)
+
+        with self.assertRaises(ValueError):
+            codec.decode(bytes_data=bomb)
+
+    def test_binary_frames_are_encoded_once_per_broadcast(self):
+        FrameCodec.encoded_frames.clear()
+        frame = encode_frame(self.frame)
+        recipients = [FrameCodec('json', 'deflate') for _ in range(3)]
+
+        with mock.patch('meetings.serialization.zlib.compress', wraps=zlib.compress) as compress:
+            encoded = [codec.encode_json(frame) for codec in recipients]
+
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(len(set(encoded)), 1)
+
+
+class OutboundBatcherTests(SimpleTestCase):
+    async def test_frames_of_one_tick_are_sent_as_one_array(self):
+        sent = []
+
+        async def send(text_data, bytes_data):
+            sent.append(text_data)
+
+        batcher = OutboundBatcher(send, FrameCodec(), tick_seconds=0.02)
+        for number in range(3):
+            await batcher.add(encode_frame({'type': 'speech', 'n': number}))
+        self.assertEqual(sent, [])
+
+        await asyncio.sleep(0.05)
+
+        self.assertEqual(len(sent), 1)
+        self.assertEqual([frame['n'] for frame in json.loads(sent[0])], [0, 1, 2])
+
+    async def test_single_frame_is_sent_unchanged(self):
+        sent = []
+
+        async def send(text_data, bytes_data):
+            sent.append(text_data)
+
+        batcher = OutboundBatcher(send, FrameCodec(), tick_seconds=0.01)
+        await batcher.add(encode_frame({'type': 'chat'}))
+        await asyncio.sleep(0.03)
+
+        self.assertEqual(json.loads(sent[0]), {'type': 'chat'})
+
+    async def test_max_frames_flushes_early(self):
+        sent = []
+
+        async def send(text_data, bytes_data):
+            sent.append(text_data)
+
+        batcher = OutboundBatcher(send, FrameCodec(), tick_seconds=10, max_frames=2)
+        await batcher.add(encode_frame({'n': 1}))
+        await batcher.add(encode_frame({'n': 2}))
+
+        self.assertEqual(json.loads(sent[0]), [{'n': 1}, {'n': 2}])
+        batcher.discard()
+
+
+class FakeSortedSets:
+    """The sorted-set commands HybridChannelLayer uses, kept in memory."""
+
+    def __init__(self):
+        self.sets = {}
+
+    async def zadd(self, key, mapping):
+        self.sets.setdefault(key, {}).update(mapping)
+
+    async def zrem(self, key, *members):
+        for member in members:
+            self.sets.get(key, {}).pop(member, None)
+
+    async def zrange(self, key, start, end, withscores=False):
+        items = sorted(self.sets.get(key, {}).items(), key=lambda item: item[1])
+        if withscores:
+            return [(member.encode('utf8'), score) for member, score in items]
+        return [member.encode('utf8') for member, _ in items]
+
+
+class HybridChannelLayerTests(SimpleTestCase):
+    """Two nodes sharing one (in-memory) Redis; node channels are delivered to directly."""
+
+    def setUp(self):
+        self.redis = FakeSortedSets()
+        self.full = set()  # channels that raise ChannelFull
+        self.foreign = {}  # channel -> messages sent to channels of no node
+        self.nodes = [self.create_node(), self.create_node()]
+
+    def create_node(self):
+        layer = HybridChannelLayer(hosts=[('localhost', 6379)], membership_cache_seconds=0, node_ttl=30)
+        layer.connection = lambda index: self.redis
+        layer._ensure_node_task = lambda: None
+        layer.send = self.send
+        return layer
+
+    async def send(self, channel, message):
+        if channel in self.full:
+            raise ChannelFull()
+        for layer in self.nodes:
+            if channel == layer.node_channel:
+                if message['type'] == 'hybrid.fanout':
+                    layer._deliver_local(message['group'], message['message'])
+                return
+        self.foreign.setdefault(channel, []).append(message)
+
+    def received(self, layer, channel):
+        queue = layer.receive_buffer[channel]
+        return [queue.get_nowait() for _ in range(queue.qsize())]
+
+    async def test_group_send_reaches_members_on_both_nodes(self):
+        first, second = self.nodes
+        channel_a = await first.new_channel()
+        channel_b = await second.new_channel()
+        await first.group_add('meeting_1', channel_a)
+        await second.group_add('meeting_1', channel_b)
+        await second.group_add('meeting_1', 'worker.channel')
+
+        await first.group_send('meeting_1', {'type': 'chat', 'n': 1})
+
+        self.assertEqual(self.received(first, channel_a), [{'type': 'chat', 'n': 1}])
+        self.assertEqual(self.received(second, channel_b), [{'type': 'chat', 'n': 1}])
+        self.assertEqual(self.foreign['worker.channel'], [{'type': 'chat', 'n': 1}])
+
+    async def test_group_discard_removes_the_node_with_its_last_member(self):
+        first, second = self.nodes
+        channel_a = await first.new_channel()
+        channel_b = await second.new_channel()
+        await first.group_add('meeting_1', channel_a)
+        await second.group_add('meeting_1', channel_b)
+
+        await second.group_discard('meeting_1', channel_b)
+        await first.group_send('meeting_1', {'type': 'chat'})
+
+        self.assertEqual(self.received(second, channel_b), [])
+        self.assertNotIn(second.node_channel, self.redis.sets[first._group_members_key('meeting_1')])
+
+    async def test_dead_node_expires_after_node_ttl(self):
+        first, second = self.nodes
+        await first.group_add('meeting_1', await first.new_channel())
+        await second.group_add('meeting_1', await second.new_channel())
+
+        # The second node stopped heartbeating a minute ago
+        key = first._group_members_key('meeting_1')
+        self.redis.sets[key][second.node_channel] = time.time() - 60
+        self.full.add(second.node_channel)
+
+        await first.group_send('meeting_1', {'type': 'chat'})
+
+        self.assertNotIn(second.node_channel, self.redis.sets[key])
+
+    async def test_full_member_does_not_stop_delivery_to_the_others(self):
+        first, second = self.nodes
+        channel_a = await first.new_channel()
+        await first.group_add('meeting_1', channel_a)
+        await second.group_add('meeting_1', await second.new_channel())
+        await second.group_add('meeting_1', 'worker.channel')
+        self.full.add(second.node_channel)
+
+        await first.group_send('meeting_1', {'type': 'chat'})
+
+        self.assertEqual(self.received(first, channel_a), [{'type': 'chat'}])
+        self.assertEqual(self.foreign['worker.channel'], [{'type': 'chat'}])
+
+    def test_node_channels_have_their_own_capacity(self):
+        layer = HybridChannelLayer(hosts=[('localhost', 6379)], capacity=100, node_channel_capacity=1000)
+        other = HybridChannelLayer(hosts=[('localhost', 6379)])
+
+        self.assertEqual(layer.get_capacity(other.node_channel), 1000)
+        self.assertEqual(layer.get_capacity('specific.abc!def'), 100)
+
+
+class ConsistentHashRingTests(SimpleTestCase):
+    keys = [f"meeting_{number}" for number in range(5000)]
+
+    def test_keys_spread_over_all_hosts(self):
+        ring = ConsistentHashRing(['redis1:6379', 'redis2:6379', 'redis3:6379'])
+
+        counts = [0, 0, 0]
+        for key in self.keys:
+            counts[ring.get(key)] += 1
+
+        for count in counts:
+            self.assertGreater(count, len(self.keys) / 3 * 0.75)
+
+    def test_adding_a_host_only_moves_keys_to_it(self):
+        hosts = ['redis1:6379', 'redis2:6379', 'redis3:6379']
+        before = ConsistentHashRing(hosts)
+        after = ConsistentHashRing(hosts + ['redis4:6379'])
+
+        moved = [key for key in self.keys if before.get(key) != after.get(key)]
+
+        self.assertTrue(all(after.get(key) == 3 for key in moved))
+        self.assertLess(len(moved), len(self.keys) * 0.35)
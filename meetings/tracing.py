@@ -0,0 +1,174 @@
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# (trace_id, span_id) of the span active in the current task
+_current_span = ContextVar('meeting_current_span', default=(None, None))
+
+
+def new_trace_id() -> str:
+    """Generate a trace ID for a message entering the pipeline."""
+    return uuid.uuid4().hex
+
+
+def current_trace_id() -> Optional[str]:
+    """Get the trace ID of the active span, if any."""
+    return _current_span.get()[0]
+
+
+def current_span_id() -> Optional[str]:
+    """Get the ID of the active span, if any."""
+    return _current_span.get()[1]
+
+
+class NullSpanExporter:
+    """Exporter that drops all spans (tracing disabled)."""
+
+    def export(self, span: Dict) -> None:
+        pass
+
+
+class JSONLSpanExporter:
+    """
+    Exporter that appends one JSON object per span to a local file.
+
+    Spans of one message share a trace_id and link to their parent through
+    parent_id, so a per-message waterfall can be rebuilt from the file.
+    export() only queues the span: a background thread serializes and
+    writes it, so the event loop never blocks on disk. Spans beyond
+    queue_size are dropped (and counted) rather than slowing the pipeline.
+    """
+
+    QUEUE_SIZE = 10000
+
+    def __init__(self, path: Optional[str] = None, queue_size: Optional[int] = None):
+        self.path = path or getattr(settings, 'TRACING_JSONL_PATH', 'traces.jsonl')
+        self.queue = queue.Queue(maxsize=queue_size or self.QUEUE_SIZE)
+        self.lock = threading.Lock()
+        self.thread = None
+        self.dropped = 0
+
+    def export(self, span: Dict) -> None:
+        if self.thread is None:
+            with self.lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self._write_spans, name='span-exporter', daemon=True)
+                    self.thread.start()
+        try:
+            self.queue.put_nowait(span)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+
+    def flush(self) -> None:
+        """Wait until every queued span is written."""
+        if self.thread is not None:
+            self.queue.join()
+
+    def _write_spans(self) -> None:
+        with open(self.path, 'a', encoding='utf-8') as spans_file:
+            while True:
+                span = self.queue.get()
+                try:
+                    spans_file.write(json.dumps(span, default=str) + "\n")
+                    if self.queue.empty():
+                        spans_file.flush()
+                except Exception as e:
+                    logger.error(f"Error writing span: {str(e)}")
+                finally:
+                    self.queue.task_done()
+
+
+_exporter = None
+
+
+def get_exporter():
+    """
+    Get the configured span exporter (settings.TRACING_EXPORTER).
+
+    Returns:
+        Exporter instance with an export(span) method
+    """
+    global _exporter
+    if _exporter is None:
+        if getattr(settings, 'TRACING_ENABLED', False):
+            exporter_path = getattr(settings, 'TRACING_EXPORTER', 'meetings.tracing.JSONLSpanExporter')
+            _exporter = import_string(exporter_path)()
+        else:
+            _exporter = NullSpanExporter()
+    return _exporter
+
+
+def set_exporter(exporter) -> None:
+    """
+    Replace the span exporter (e.g. in tests or benchmarks).
+
+    Args:
+        exporter: Object with an export(span) method, or None to reload from settings
+    """
+    global _exporter
+    _exporter = exporter
+
+
+@contextmanager
+def span(name: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None, **attributes):
+    """
+    Record a span around a block of code.
+
+    The span joins the trace active in the current task unless trace_id is
+    given (e.g. when continuing a trace received through the channel layer).
+
+    Args:
+        name: Span name (receive, stt, translation, db.save_transcript, ...)
+        trace_id: Trace to attach to (optional)
+        parent_id: Parent span ID (optional)
+        attributes: Extra attributes stored with the span
+
+    Yields:
+        Dictionary of attributes that the block may extend
+    """
+    exporter = get_exporter()
+    active_trace_id, active_span_id = _current_span.get()
+
+    trace_id = trace_id or active_trace_id or new_trace_id()
+    if parent_id is None and trace_id == active_trace_id:
+        parent_id = active_span_id
+    span_id = uuid.uuid4().hex[:16]
+
+    token = _current_span.set((trace_id, span_id))
+    started_at = time.time()
+    start_time = time.perf_counter()
+    status = 'ok'
+    try:
+        yield attributes
+    except BaseException as e:
+        status = 'cancelled' if isinstance(e, asyncio.CancelledError) else 'error'
+        attributes.setdefault('error', str(e))
+        raise
+    finally:
+        _current_span.reset(token)
+        try:
+            exporter.export({
+                'trace_id': trace_id,
+                'span_id': span_id,
+                'parent_id': parent_id,
+                'name': name,
+                'start': started_at,
+                'duration_ms': round((time.perf_counter() - start_time) * 1000, 3),
+                'status': status,
+                'attributes': attributes,
+            })
+        except Exception as e:
+            logger.error(f"Error exporting span: {str(e)}")
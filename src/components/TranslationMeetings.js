@@ -12,6 +12,7 @@ const TranslationMeeting = () => {
   const [participants, setParticipants] = useState([]);
   const [chatMessage, setChatMessage] = useState('');
   const [suggestions, setSuggestions] = useState([]);
+  const [suggestionDraft, setSuggestionDraft] = useState({ requestId: null, text: '' });
   const [meetingInfo, setMeetingInfo] = useState(null);
   const [error, setError] = useState('');
   const [preferredLanguage, setPreferredLanguage] = useState('ro');
@@ -19,6 +20,8 @@ const TranslationMeeting = () => {
   
   const socket = useRef(null);
   const mediaRecorder = useRef(null);
+  const speechPausedUntil = useRef(0);
+  const speechSeq = useRef(0);
   const messagesEndRef = useRef(null);
   
   // Conectare la WebSocket
@@ -62,7 +65,8 @@ const TranslationMeeting = () => {
     
     socket.current.onmessage = (e) => {
       const data = JSON.parse(e.data);
-      handleWebSocketMessage(data);
+      // Cu batching activat pe server, mai multe evenimente sosesc într-un singur array
+      (Array.isArray(data) ? data : [data]).forEach(handleWebSocketMessage);
     };
     
     // Curățare la deconectare
@@ -88,8 +92,7 @@ const TranslationMeeting = () => {
       case 'speech':
       case 'chat':
         const translation = data.translations[preferredLanguage] || data.original_text;
-        
-        setMessages(prev => [...prev, {
+        const message = {
           id: Date.now(),
           type: data.type,
           sender: {
@@ -100,8 +103,37 @@ const TranslationMeeting = () => {
           originalLanguage: data.original_language,
           translatedText: translation,
           timestamp: data.timestamp || new Date().toISOString()
-        }]);
+        };
+        
+        // Propoziția finală înlocuiește textul provizoriu afișat până acum
+        const interimId = `interim-${data.participant_id}-${data.utterance_id}`;
+        setMessages(prev => data.utterance_id && prev.some(msg => msg.id === interimId)
+          ? prev.map(msg => (msg.id === interimId ? message : msg))
+          : [...prev, message]);
+        break;
+        
+      case 'speech_interim': {
+        // Text provizoriu (netradus) al unei propoziții încă neîncheiate
+        const id = `interim-${data.participant_id}-${data.utterance_id}`;
+        const interim = {
+          id,
+          type: 'speech',
+          interim: true,
+          sender: {
+            id: data.participant_id,
+            name: data.name
+          },
+          originalText: data.text,
+          originalLanguage: data.original_language,
+          translatedText: data.text,
+          timestamp: data.timestamp || new Date().toISOString()
+        };
+        
+        setMessages(prev => prev.some(msg => msg.id === id)
+          ? prev.map(msg => (msg.id === id ? interim : msg))
+          : [...prev, interim]);
         break;
+      }
         
       case 'meeting_info':
         setMeetingInfo(data.meeting);
@@ -137,7 +169,28 @@ const TranslationMeeting = () => {
         }]);
         break;
         
+      case 'slow_down':
+        if (data.lane === 'chat') {
+          setError('Serverul este suprasolicitat. Mesajul nu a fost trimis, încercați din nou.');
+          break;
+        }
+        
+        // Serverul nu mai face față: fragmentul respins s-a pierdut (serverul îi sare seq-ul);
+        // audio-ul înregistrat în pauză rămâne în buffer și este trimis după pauză
+        speechPausedUntil.current = Date.now() + (data.retry_after_ms || 2000);
+        break;
+        
+      case 'suggestion_delta':
+        // Afișăm textul sugestiilor pe măsură ce este generat
+        setSuggestionDraft(prev => (
+          prev.requestId === data.request_id
+            ? { requestId: data.request_id, text: prev.text + data.delta }
+            : { requestId: data.request_id, text: data.delta }
+        ));
+        break;
+        
       case 'suggestions':
+        setSuggestionDraft({ requestId: null, text: '' });
         setSuggestions(data.suggestions);
         break;
         
@@ -178,6 +231,10 @@ const TranslationMeeting = () => {
       
       // Procesare și trimitere date audio la intervale regulate
       const sendInterval = setInterval(() => {
+        if (Date.now() < speechPausedUntil.current) {
+          return;
+        }
+        
         if (audioChunks.length > 0 && socket.current && socket.current.readyState === WebSocket.OPEN) {
           const audioBlob = new Blob(audioChunks, { type: 'audio/webm' });
           audioChunks.length = 0; // Golire array
@@ -190,6 +247,7 @@ const TranslationMeeting = () => {
             // Trimitere date audio prin WebSocket
             socket.current.send(JSON.stringify({
               type: 'speech',
+              seq: speechSeq.current++, // Serverul procesează fragmentele în ordinea lui seq
               audio_data: base64Audio,
               language: navigator.language || 'en-US', // Utilizăm limba browserului
               timestamp: new Date().toISOString()
@@ -244,16 +302,9 @@ const TranslationMeeting = () => {
   
   // Generare sugestii AI
   const requestSuggestions = () => {
-    // Construim contextul din ultimele 5 mesaje
-    const context = messages
-      .filter(m => m.type !== 'system')
-      .slice(-5)
-      .map(m => `${m.sender?.name || 'System'}: ${m.translatedText || m.message}`)
-      .join('\n');
-    
+    // Contextul conversației este menținut pe server
     socket.current.send(JSON.stringify({
       type: 'request_suggestions',
-      context,
       language: preferredLanguage,
       meeting_type: meetingInfo?.meeting_type || 'interview',
       user_role: userRole
@@ -295,7 +346,7 @@ const TranslationMeeting = () => {
               <small className="font-weight-bold">{msg.sender?.name || 'Unknown'}</small>
               <Badge variant="info">{msg.type === 'speech' ? 'Voice' : 'Chat'}</Badge>
             </div>
-            <Card.Text>{msg.translatedText}</Card.Text>
+            <Card.Text className={msg.interim ? 'text-muted font-italic' : undefined}>{msg.translatedText}</Card.Text>
             {msg.originalText !== msg.translatedText && (
               <div className="mt-2 text-muted">
                 <small>Original ({msg.originalLanguage}): {msg.originalText}</small>
@@ -385,7 +436,11 @@ const TranslationMeeting = () => {
                   </Button>
                 </Card.Header>
                 <ListGroup variant="flush">
-                  {suggestions.length > 0 ? (
+                  {suggestionDraft.text ? (
+                    <ListGroup.Item className="text-muted">
+                      {suggestionDraft.text}
+                    </ListGroup.Item>
+                  ) : suggestions.length > 0 ? (
                     suggestions.map((suggestion, index) => (
                       <ListGroup.Item 
                         key={index}
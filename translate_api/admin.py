@@ -1,3 +1,14 @@
 from django.contrib import admin
 
-# Register your models here.
+from translate_api.models import Glossary, GlossaryEntry
+
+
+class GlossaryEntryInline(admin.TabularInline):
+    model = GlossaryEntry
+    extra = 1
+
+
+@admin.register(Glossary)
+class GlossaryAdmin(admin.ModelAdmin):
+    list_display = ('name', 'owner', 'meeting', 'updated_at')
+    inlines = [GlossaryEntryInline]
@@ -0,0 +1,338 @@
+import logging
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Count, Max, Q
+
+from translate_api.models import GlossaryEntry
+from translate_api.services import LanguageDetectionService
+
+logger = logging.getLogger(__name__)
+
+
+def _fold(char: str) -> str:
+    """Lower-case one character without changing the length of the text."""
+    lowered = char.lower()
+    return lowered if len(lowered) == 1 else char
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over a set of terms.
+
+    Matching is case-insensitive and walks the text once, so its cost is
+    linear in the length of the text (plus the number of matches) however
+    many terms the automaton holds.
+    """
+
+    def __init__(self, terms: List[str]):
+        """
+        Args:
+            terms: Terms to match; a match reports the index of its term
+        """
+        self.lengths = [len(term) for term in terms]
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail = [0]
+        self.output = [-1]  # State -> index of the term ending there (-1: none)
+
+        for index, term in enumerate(terms):
+            state = 0
+            for char in term:
+                char = _fold(char)
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(-1)
+                state = next_state
+            if term:
+                self.output[state] = index
+
+        # Breadth-first pass: failure links, and for every state the nearest
+        # state on its failure chain (itself included) where a term ends
+        self.report = [0] * len(self.goto)
+        queue = list(self.goto[0].values())
+        for state in queue:
+            self.report[state] = state if self.output[state] >= 0 else 0
+        position = 0
+        while position < len(queue):
+            state = queue[position]
+            position += 1
+            for char, next_state in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.report[next_state] = (next_state if self.output[next_state] >= 0
+                                           else self.report[self.fail[next_state]])
+                queue.append(next_state)
+
+    def find(self, text: str) -> List[Tuple[int, int, int]]:
+        """
+        Find whole-word occurrences of the terms, leftmost-longest and without overlaps.
+
+        Args:
+            text: Text to search
+
+        Returns:
+            List of (start, end, term index), in text order
+        """
+        longest = {}  # start -> (length, term index)
+        state = 0
+
+        for position, char in enumerate(text):
+            char = _fold(char)
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+
+            match_state = self.report[state]
+            while match_state:
+                index = self.output[match_state]
+                length = self.lengths[index]
+                start = position - length + 1
+                if self._on_word_boundary(text, start, position + 1) and length > longest.get(start, (0,))[0]:
+                    longest[start] = (length, index)
+                match_state = self.report[self.fail[match_state]]
+
+        matches = []
+        start = 0
+        while start < len(text):
+            match = longest.get(start)
+            if match is None:
+                start += 1
+                continue
+            length, index = match
+            matches.append((start, start + length, index))
+            start += length
+        return matches
+
+    @staticmethod
+    def _on_word_boundary(text: str, start: int, end: int) -> bool:
+        # Terms starting/ending with punctuation (".NET", "C++") only need the word side checked
+        if start > 0 and _is_word(text[start - 1]) and _is_word(text[start]):
+            return False
+        if end < len(text) and _is_word(text[end]) and _is_word(text[end - 1]):
+            return False
+        return True
+
+
+class GlossaryMatcher:
+    """
+    Glossary of one target language, compiled into an Aho-Corasick automaton.
+
+    protect() replaces the terms with numbered placeholders before the text
+    is sent to the translation provider; restore() puts the glossary
+    translation (or the original term) back in the translated text.
+    """
+
+    PLACEHOLDER = "⟦{}⟧"
+    PLACEHOLDER_PATTERN = re.compile("⟦\\s*(\\d+)\\s*⟧")
+
+    def __init__(self, entries: Dict[str, str]):
+        """
+        Args:
+            entries: Term -> translation; an empty translation keeps the term as written
+        """
+        self.terms = list(entries)
+        self.translations = [entries[term] for term in self.terms]
+        self.automaton = AhoCorasick(self.terms)
+
+    def protect(self, text: str) -> Tuple[str, List[str]]:
+        """
+        Replace glossary terms with placeholders.
+
+        Args:
+            text: Text to translate
+
+        Returns:
+            Tuple (text with placeholders, replacement for each placeholder)
+        """
+        parts = []
+        replacements = []
+        position = 0
+
+        for start, end, index in self.automaton.find(text):
+            parts.append(text[position:start])
+            parts.append(self.PLACEHOLDER.format(len(replacements)))
+            replacements.append(self.translations[index] or text[start:end])
+            position = end
+
+        if not replacements:
+            return text, replacements
+        parts.append(text[position:])
+        return ''.join(parts), replacements
+
+    def restore(self, text: str, replacements: List[str]) -> str:
+        """
+        Replace the placeholders of a translated text.
+
+        Args:
+            text: Translated text
+            replacements: Replacements returned by protect
+
+        Returns:
+            Text with the glossary terms
+        """
+        def replace(match):
+            index = int(match.group(1))
+            return replacements[index] if index < len(replacements) else match.group(0)
+
+        return self.PLACEHOLDER_PATTERN.sub(replace, text)
+
+
+class CompiledGlossaries:
+    """Glossary entries that apply to one speaker in one meeting, with a matcher per target language."""
+
+    def __init__(self, version: Tuple, entries: List[Tuple[str, str, str]]):
+        """
+        Args:
+            version: Value identifying the state of the glossaries in the database
+            entries: (term, translation, target language) in increasing priority
+        """
+        self.version = version
+        self.entries = entries
+        self.checked_at = time.monotonic()
+        self.matchers: Dict[str, Optional[GlossaryMatcher]] = {}
+        self.lock = threading.Lock()
+
+    def matcher(self, target_language: str) -> Optional[GlossaryMatcher]:
+        """
+        Get the matcher of a target language, building its automaton on first use.
+
+        Args:
+            target_language: Canonical target language code
+
+        Returns:
+            GlossaryMatcher, or None when no entry applies to the language
+        """
+        with self.lock:
+            if target_language in self.matchers:
+                return self.matchers[target_language]
+
+            terms = {}
+            for term, translation, language in self.entries:
+                if not language or language == target_language:
+                    terms[term] = translation
+
+            matcher = GlossaryMatcher(terms) if terms else None
+            self.matchers[target_language] = matcher
+            return matcher
+
+
+class GlossaryCache:
+    """
+    Process-local cache of compiled glossaries, per meeting and speaker.
+
+    The glossaries of a meeting and the speaker's personal glossaries are
+    loaded once and compiled per target language. The database is asked
+    for their version (entry count and last update) at most every
+    GLOSSARY_CACHE_CHECK_SECONDS; automatons are rebuilt only when it changed.
+    """
+
+    def __init__(self, check_interval_seconds: Optional[float] = None, max_entries: int = 1024):
+        self.check_interval_seconds = check_interval_seconds if check_interval_seconds is not None else getattr(
+            settings, 'GLOSSARY_CACHE_CHECK_SECONDS', 5)
+        self.max_entries = max_entries
+
+        self.entries: Dict[Tuple[str, str], CompiledGlossaries] = {}
+        self.lock = threading.Lock()
+
+        # Metrics for monitoring
+        self.metrics = {
+            'hits': 0,
+            'version_checks': 0,
+            'builds': 0,
+        }
+
+    def get(self, meeting_id, user_id=None) -> Optional[CompiledGlossaries]:
+        """
+        Get the compiled glossaries without touching the database.
+
+        Returns:
+            CompiledGlossaries, or None when they must be (re)loaded with load()
+        """
+        with self.lock:
+            compiled = self.entries.get(self._key(meeting_id, user_id))
+            if compiled is None or time.monotonic() - compiled.checked_at >= self.check_interval_seconds:
+                return None
+            self.metrics['hits'] += 1
+            return compiled
+
+    def load(self, meeting_id, user_id=None) -> CompiledGlossaries:
+        """
+        Check the version of the glossaries in the database and reload them if they changed.
+
+        Runs database queries: call it from a thread (database_sync_to_async).
+
+        Args:
+            meeting_id: ID of the meeting
+            user_id: ID of the speaking user (None for anonymous participants)
+
+        Returns:
+            CompiledGlossaries
+        """
+        key = self._key(meeting_id, user_id)
+        queryset = GlossaryEntry.objects.filter(self._scope(meeting_id, user_id))
+
+        state = queryset.aggregate(count=Count('id'), entry_updated=Max('updated_at'),
+                                   glossary_updated=Max('glossary__updated_at'))
+        version = (state['count'], state['entry_updated'], state['glossary_updated'])
+
+        with self.lock:
+            self.metrics['version_checks'] += 1
+            compiled = self.entries.get(key)
+            if compiled is not None and compiled.version == version:
+                compiled.checked_at = time.monotonic()
+                return compiled
+
+        # Later entries override earlier ones: personal before meeting, all languages before one language
+        rows = queryset.values_list('term', 'translation', 'target_language', 'glossary__meeting_id')
+        entries = sorted(rows, key=lambda row: (bool(row[2]), row[3] is not None))
+        compiled = CompiledGlossaries(version, [
+            (term, translation, LanguageDetectionService.canonical_language(language))
+            for term, translation, language, _ in entries
+        ])
+
+        with self.lock:
+            self.entries.pop(key, None)
+            # Full: drop the oldest entry (dicts keep insertion order)
+            if len(self.entries) >= self.max_entries:
+                del self.entries[next(iter(self.entries))]
+            self.entries[key] = compiled
+            self.metrics['builds'] += 1
+        return compiled
+
+    def get_metrics(self) -> Dict:
+        """
+        Get cache metrics.
+
+        Returns:
+            Dictionary with cache metrics
+        """
+        with self.lock:
+            return dict(self.metrics, cached=len(self.entries))
+
+    @staticmethod
+    def _key(meeting_id, user_id) -> Tuple[str, str]:
+        return str(meeting_id), str(user_id or '')
+
+    @staticmethod
+    def _scope(meeting_id, user_id) -> Q:
+        scope = Q(glossary__meeting_id=meeting_id)
+        if user_id:
+            scope |= Q(glossary__owner_id=user_id, glossary__meeting__isnull=True)
+        return scope
+
+
+# Initialize a singleton instance
+glossary_cache = GlossaryCache()
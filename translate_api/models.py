@@ -1,3 +1,24 @@
 from django.db import models
+from accounts.models import User
+from meetings.models import Meeting
 
-# Create your models here.
+class Glossary(models.Model):
+    """Glosar de termeni (nume de companii, tehnologii, titluri de posturi), personal sau al unui meeting."""
+    name = models.CharField(max_length=255)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='glossaries')
+    meeting = models.ForeignKey(Meeting, on_delete=models.CASCADE, null=True, blank=True, related_name='glossaries')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return self.name
+
+class GlossaryEntry(models.Model):
+    glossary = models.ForeignKey(Glossary, on_delete=models.CASCADE, related_name='entries')
+    term = models.CharField(max_length=255)
+    translation = models.CharField(max_length=255, blank=True)  # Gol: termenul rămâne netradus
+    target_language = models.CharField(max_length=10, blank=True)  # Gol: pentru toate limbile
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.term} -> {self.translation or self.term} ({self.target_language or '*'})"
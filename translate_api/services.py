@@ -1,10 +1,18 @@
+import os
+import re
 import json
+import time
+import hashlib
 import logging
+import threading
 import uuid
 import asyncio
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union
 
+import openai
+from deep_translator import GoogleTranslator
 from django.conf import settings
 from django.utils import timezone
 from django.core.exceptions import ObjectDoesNotExist
@@ -14,25 +22,184 @@ from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
 from accounts.models import User
-from .models import Meeting, MeetingParticipant, Transcript, Translation
+from ai_suggestions.services import suggestion_cache
+from meetings.metrics import (
+    LabeledLatencyHistograms, LANGUAGE_DETECTIONS, PROVIDER_ERRORS, TRANSLATION_SECONDS, TRANSLATIONS_SKIPPED,
+)
+from meetings.models import Meeting, MeetingParticipant, Transcript, Translation
+from meetings.services import session_manager as meetings_session_manager
+
+try:
+    import pycld2
+except ImportError:
+    pycld2 = None
+
+try:
+    from langdetect import DetectorFactory, detect_langs
+    from langdetect.lang_detect_exception import LangDetectException
+    DetectorFactory.seed = 0  # Rezultate deterministe
+except ImportError:
+    detect_langs = None
 
 logger = logging.getLogger(__name__)
 
+
+class LanguageDetectionService:
+    """
+    Serviciu pentru identificarea limbii unui text (pycld2, cu langdetect ca rezervă).
+    
+    Rezultatele sunt păstrate într-un cache LRU indexat după hash-ul textului
+    normalizat. Codurile returnate sunt canonice (ISO 639-1, plus zh-CN/zh-TW),
+    în formatul așteptat de TranslationService.
+    """
+    
+    # Coduri vechi sau specifice detectorilor -> coduri folosite de Google Translate
+    ALIASES = {
+        'iw': 'he', 'in': 'id', 'ji': 'yi', 'jw': 'jv', 'nb': 'no',
+        'zh': 'zh-CN', 'zh-cn': 'zh-CN', 'zh-hans': 'zh-CN',
+        'zh-tw': 'zh-TW', 'zh-hant': 'zh-TW',
+    }
+    
+    # Sub acest număr de caractere detectarea nu este de încredere; folosim limba indicată de client
+    MIN_TEXT_LENGTH = 20
+    MIN_CONFIDENCE = 0.80
+    CACHE_SIZE = 4096
+    
+    cache = OrderedDict()  # hash text -> cod limbă detectat (sau None)
+    lock = threading.Lock()
+    metrics = {'cache_hits': 0, 'cache_misses': 0, 'fallbacks': 0}
+    
+    @staticmethod
+    def canonical_language(code):
+        """
+        Normalizează un cod de limbă: 'en-US' -> 'en', 'ZH-tw' -> 'zh-TW', 'iw' -> 'he'.
+        
+        Returns:
+            Codul canonic sau None pentru un cod gol
+        """
+        if not code:
+            return None
+        
+        code = str(code).strip().replace('_', '-').lower()
+        if code in LanguageDetectionService.ALIASES:
+            return LanguageDetectionService.ALIASES[code]
+        
+        primary = code.split('-')[0]
+        return LanguageDetectionService.ALIASES.get(primary, primary)
+    
+    @staticmethod
+    def detect_language(text, hint=None):
+        """
+        Identifică limba unui text.
+        
+        Args:
+            text: Textul analizat
+            hint: Limba indicată de client (de ex. navigator.language), folosită
+                  pentru texte prea scurte sau când detectarea nu este sigură
+        
+        Returns:
+            Codul canonic al limbii, sau None dacă nu se poate determina
+        """
+        hint = LanguageDetectionService.canonical_language(hint)
+        normalized = ' '.join((text or '').split())
+        if len(normalized) < LanguageDetectionService.MIN_TEXT_LENGTH:
+            LanguageDetectionService.metrics['fallbacks'] += 1
+            return hint
+        
+        key = hashlib.sha1(normalized.lower().encode('utf-8')).hexdigest()
+        with LanguageDetectionService.lock:
+            if key in LanguageDetectionService.cache:
+                LanguageDetectionService.cache.move_to_end(key)
+                LanguageDetectionService.metrics['cache_hits'] += 1
+                detected = LanguageDetectionService.cache[key]
+                return detected or hint
+            LanguageDetectionService.metrics['cache_misses'] += 1
+        
+        detected = LanguageDetectionService._detect(normalized)
+        LANGUAGE_DETECTIONS.labels('detected' if detected else 'undetermined').inc()
+        
+        with LanguageDetectionService.lock:
+            LanguageDetectionService.cache[key] = detected
+            if len(LanguageDetectionService.cache) > LanguageDetectionService.CACHE_SIZE:
+                LanguageDetectionService.cache.popitem(last=False)
+        
+        if detected is None:
+            LanguageDetectionService.metrics['fallbacks'] += 1
+        return detected or hint
+    
+    @staticmethod
+    def _detect(text):
+        """Rulează detectorii disponibili; None dacă niciunul nu este sigur."""
+        if pycld2 is not None:
+            try:
+                is_reliable, _, details = pycld2.detect(text)
+                code, percent = details[0][1], details[0][2]
+                if is_reliable and code != 'un' and percent >= LanguageDetectionService.MIN_CONFIDENCE * 100:
+                    return LanguageDetectionService.canonical_language(code)
+            except pycld2.error as e:
+                logger.debug(f"pycld2 nu a putut analiza textul: {str(e)}")
+        
+        if detect_langs is not None:
+            try:
+                best = detect_langs(text)[0]
+                if best.prob >= LanguageDetectionService.MIN_CONFIDENCE:
+                    return LanguageDetectionService.canonical_language(best.lang)
+            except LangDetectException as e:
+                logger.debug(f"langdetect nu a putut analiza textul: {str(e)}")
+        
+        return None
+    
+    @staticmethod
+    def get_metrics():
+        """Returnează metricile cache-ului de detectare."""
+        with LanguageDetectionService.lock:
+            return dict(LanguageDetectionService.metrics, cached=len(LanguageDetectionService.cache))
+
+
 class TranslationService:
     """Serviciu pentru traducerea textului utilizând diferite motoare de traducere."""
     
+    # Durata apelurilor către provider, per pereche de limbi
+    latency = LabeledLatencyHistograms(('source_lang', 'target_lang'))
+    
+    # Lungimea maximă a unui text trimis provider-ului
+    MAX_CHUNK_CHARS = 5000
+    # Marcajele glosarului (⟦n⟧, vezi GlossaryMatcher) nu pot fi tăiate între fragmente
+    PLACEHOLDER_PATTERN = re.compile("⟦[^⟧]*⟧")
+    WHITESPACE = re.compile(r"\s+")
+    
     @staticmethod
-    def translate_text(text, source_lang='auto', target_lang='en'):
+    def translate_text(text, source_lang='auto', target_lang='en', glossary=None):
         """
         Traduce text utilizând Google Translator.
+        
+        Args:
+            glossary: GlossaryMatcher opțional; termenii din glosar sunt protejați
+                      înainte de traducere și înlocuiți cu traducerea din glosar
         """
         if not text or not target_lang:
             return text
         
+        source_lang = LanguageDetectionService.canonical_language(source_lang) or 'auto'
+        target_lang = LanguageDetectionService.canonical_language(target_lang)
+        
+        # Textul este deja în limba țintă: nu apelăm provider-ul
+        if source_lang == target_lang:
+            TRANSLATIONS_SKIPPED.labels(target_lang).inc()
+            return text
+        
+        # Termenii din glosar sunt înlocuiți cu marcaje pe care provider-ul nu le traduce
+        replacements = None
+        if glossary is not None:
+            text_to_translate, replacements = glossary.protect(text)
+        else:
+            text_to_translate = text
+        
+        start_time = time.perf_counter()
         try:
             # Pentru texte mai lungi, împărțim în fragmente
-            if len(text) > 5000:
-                chunks = [text[i:i+5000] for i in range(0, len(text), 5000)]
+            if len(text_to_translate) > TranslationService.MAX_CHUNK_CHARS:
+                chunks = TranslationService.split_text(text_to_translate, TranslationService.MAX_CHUNK_CHARS)
                 translated_chunks = []
                 
                 for chunk in chunks:
@@ -42,23 +209,102 @@ class TranslationService:
                     ).translate(chunk)
                     translated_chunks.append(translated)
                 
-                return ' '.join(translated_chunks)
+                translated = ' '.join(translated_chunks)
             else:
-                return GoogleTranslator(
+                translated = GoogleTranslator(
                     source=source_lang, 
                     target=target_lang
-                ).translate(text)
+                ).translate(text_to_translate)
+            
+            return glossary.restore(translated, replacements) if replacements else translated
         except Exception as e:
+            PROVIDER_ERRORS.labels('translation').inc()
             logger.error(f"Eroare la traducere: {str(e)}")
             return text  # Returnează textul original în caz de eroare
+        finally:
+            duration = time.perf_counter() - start_time
+            TranslationService.latency.record(duration, source_lang, target_lang)
+            TRANSLATION_SECONDS.labels(source_lang, target_lang).observe(duration)
+    
+    @staticmethod
+    def split_text(text, limit):
+        """
+        Împarte un text în fragmente de cel mult `limit` caractere.
+        
+        Tăieturile cad pe spațiile din afara marcajelor de glosar; un cuvânt mai
+        lung decât limita este tăiat la limită, dar niciodată în interiorul unui marcaj.
+        
+        Returns:
+            Lista fragmentelor, fără spațiile de la tăieturi
+        """
+        placeholders = [match.span() for match in TranslationService.PLACEHOLDER_PATTERN.finditer(text)]
+        
+        def placeholder_at(position):
+            # Marcajul care conține poziția (tăietura la `position` l-ar rupe), dacă există
+            for start, end in placeholders:
+                if start < position < end:
+                    return start, end
+            return None
+        
+        chunks = []
+        position = 0
+        while len(text) - position > limit:
+            end = position + limit
+            cut = None
+            # Un spațiu imediat după limită este o tăietură validă
+            for match in reversed(list(TranslationService.WHITESPACE.finditer(text, position + 1, end + 1))):
+                if placeholder_at(match.start()) is None:
+                    cut, next_position = match.start(), match.end()
+                    break
+            
+            if cut is None:
+                placeholder = placeholder_at(end)
+                cut = end if placeholder is None else (placeholder[0] if placeholder[0] > position else placeholder[1])
+                next_position = cut
+            
+            chunks.append(text[position:cut])
+            position = next_position
+        
+        if position < len(text):
+            chunks.append(text[position:])
+        return chunks
+    
+    @staticmethod
+    def get_metrics():
+        """Returnează percentilele duratei traducerilor, per pereche de limbi."""
+        return {'latency': TranslationService.latency.snapshot()}
 
 
 class AISuggestionService:
     """Serviciu pentru generarea de sugestii de răspuns folosind OpenAI."""
     
+    # Adaptăm promptul în funcție de tipul întâlnirii și rolul utilizatorului
+    PROMPTS = {
+        'interview': {
+            'interviewee': "Următoarele sunt fragmente dintr-un interviu. Tu ești candidatul. "
+                           "Generează răspunsuri profesionale și relevante care să te pună într-o "
+                           "lumină pozitivă ca și candidat:",
+            'interviewer': "Următoarele sunt fragmente dintr-un interviu. Tu ești intervievatorul. "
+                           "Generează următoarele întrebări relevante pentru a evalua candidatul:"
+        },
+        'meeting': {
+            'participant': "Următoarele sunt fragmente dintr-o întâlnire de afaceri. "
+                           "Generează răspunsuri profesionale și constructive:",
+            'host': "Următoarele sunt fragmente dintr-o întâlnire de afaceri pe care o conduci. "
+                    "Generează intervenții pentru a facilita discuția:"
+        }
+    }
+    
+    # Clienți async reutilizați (păstrează conexiunile HTTP deschise între cereri)
+    _async_clients = {}
+    
+    # Timpul până la primul token și durata totală a generării, per tip meeting și rol
+    first_token_latency = LabeledLatencyHistograms(('meeting_type', 'user_role'))
+    stream_latency = LabeledLatencyHistograms(('meeting_type', 'user_role'))
+    
     @staticmethod
     def generate_suggestions(context, language='ro', meeting_type='interview', 
-                           user_role='interviewee', num_suggestions=3):
+                           user_role='interviewee', num_suggestions=3, meeting_id=None):
         """
         Generează sugestii de răspuns bazate pe contextul conversației.
         
@@ -68,43 +314,25 @@ class AISuggestionService:
             meeting_type: Tipul întâlnirii (interview, meeting, etc.)
             user_role: Rolul utilizatorului în conversație
             num_suggestions: Numărul de sugestii de generat
+            meeting_id: ID-ul meeting-ului; activează cache-ul de sugestii (opțional)
         
         Returns:
             Listă de sugestii de răspuns
         """
-        openai.api_key = settings.OPENAI_API_KEY
+        # Refolosim sugestiile generate pentru aceeași stare a conversației
+        cache_key = None
+        if meeting_id is not None:
+            cache_key = suggestion_cache.make_key(context, user_role, meeting_type, language)
+            cached = suggestion_cache.get(meeting_id, cache_key)
+            if cached is not None:
+                return cached[:num_suggestions]
         
-        # Adaptăm promptul în funcție de tipul întâlnirii și rolul utilizatorului
-        prompts = {
-            'interview': {
-                'interviewee': "Următoarele sunt fragmente dintr-un interviu. Tu ești candidatul. "
-                               "Generează răspunsuri profesionale și relevante care să te pună într-o "
-                               "lumină pozitivă ca și candidat:",
-                'interviewer': "Următoarele sunt fragmente dintr-un interviu. Tu ești intervievatorul. "
-                               "Generează următoarele întrebări relevante pentru a evalua candidatul:"
-            },
-            'meeting': {
-                'participant': "Următoarele sunt fragmente dintr-o întâlnire de afaceri. "
-                               "Generează răspunsuri profesionale și constructive:",
-                'host': "Următoarele sunt fragmente dintr-o întâlnire de afaceri pe care o conduci. "
-                        "Generează intervenții pentru a facilita discuția:"
-            }
-        }
-        
-        role_key = user_role if user_role in ['interviewee', 'interviewer', 'participant', 'host'] else 'participant'
-        meeting_key = meeting_type if meeting_type in ['interview', 'meeting'] else 'meeting'
-        
-        prompt = prompts.get(meeting_key, {}).get(role_key, prompts['meeting']['participant'])
+        openai.api_key = settings.OPENAI_API_KEY
         
         try:
-            # Construim mesajele pentru chat completion
-            messages = [
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": f"Context conversație:\n{context}\n\n"
-                                         f"Generează {num_suggestions} posibile răspunsuri "
-                                         f"pentru a continua conversația în limba {language}. "
-                                         f"Răspunsurile trebuie să fie concise și naturale."}
-            ]
+            messages = AISuggestionService._build_messages(
+                context, language, meeting_type, user_role, num_suggestions
+            )
             
             response = openai.ChatCompletion.create(
                 model="gpt-4",  # sau alt model disponibil
@@ -114,40 +342,193 @@ class AISuggestionService:
                 temperature=0.7,
             )
             
-            # Încercăm să extragem sugestii distincte din răspuns
             suggestions_text = response.choices[0].message.content
+            suggestions = AISuggestionService.parse_suggestions(suggestions_text, num_suggestions)
             
-            # Încercăm să separăm sugestiile (pot fi formatate cu numere, puncte, etc.)
-            lines = suggestions_text.split('\n')
-            suggestions = []
-            current_suggestion = ""
-            
-            for line in lines:
-                if line.strip() and (line[0].isdigit() and line[1:3] in ['. ', ') ']) or line.startswith('- '):
-                    if current_suggestion:
-                        suggestions.append(current_suggestion.strip())
-                    current_suggestion = line
-                else:
-                    current_suggestion += ' ' + line
-            
-            if current_suggestion:
-                suggestions.append(current_suggestion.strip())
-            
-            # Dacă nu am reușit să separăm corect, folosim întregul text ca o sugestie
-            if not suggestions:
-                suggestions = [suggestions_text]
+            if cache_key is not None:
+                suggestion_cache.set(meeting_id, cache_key, suggestions)
             
-            # Limitare la numărul de sugestii cerut
-            return suggestions[:num_suggestions]
+            return suggestions
             
         except Exception as e:
+            PROVIDER_ERRORS.labels('openai').inc()
             logger.error(f"Eroare la generarea sugestiilor: {str(e)}")
             return [f"Nu s-au putut genera sugestii: {str(e)}"]
+    
+    @staticmethod
+    async def stream_suggestions(context, language='ro', meeting_type='interview',
+                                 user_role='interviewee', num_suggestions=3):
+        """
+        Generează sugestii în mod streaming, returnând fragmentele de text
+        pe măsură ce sosesc de la model.
+        
+        Apelantul poate anula generarea oricând (de ex. prin anularea task-ului
+        care iterează); conexiunea HTTP către provider este închisă imediat.
+        
+        Args:
+            context: Istoric recent al conversației
+            language: Limba în care vor fi generate sugestiile
+            meeting_type: Tipul întâlnirii (interview, meeting, etc.)
+            user_role: Rolul utilizatorului în conversație
+            num_suggestions: Numărul de sugestii de generat
+        
+        Yields:
+            Fragmente de text (delta) din răspunsul modelului
+        """
+        client = AISuggestionService._get_async_client()
+        messages = AISuggestionService._build_messages(
+            context, language, meeting_type, user_role, num_suggestions
+        )
+        
+        start_time = time.perf_counter()
+        first_token = True
+        
+        stream = await client.chat.completions.create(
+            model=settings.OPENAI_SUGGESTIONS_MODEL,
+            messages=messages,
+            max_tokens=500,
+            n=1,
+            temperature=0.7,
+            stream=True,
+        )
+        
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if first_token:
+                        first_token = False
+                        AISuggestionService.first_token_latency.record(
+                            time.perf_counter() - start_time, meeting_type, user_role
+                        )
+                    yield delta
+            
+            AISuggestionService.stream_latency.record(
+                time.perf_counter() - start_time, meeting_type, user_role
+            )
+        finally:
+            # Eliberăm conexiunea și la anulare, nu doar la final
+            await stream.response.aclose()
+    
+    @staticmethod
+    def get_metrics():
+        """Returnează percentilele latenței sugestiilor, per tip meeting și rol."""
+        return {
+            'first_token_latency': AISuggestionService.first_token_latency.snapshot(),
+            'stream_latency': AISuggestionService.stream_latency.snapshot(),
+        }
+    
+    @staticmethod
+    def parse_suggestions(suggestions_text, num_suggestions=3):
+        """
+        Separă textul generat de model în sugestii distincte
+        (pot fi formatate cu numere, puncte, etc.).
+        """
+        lines = suggestions_text.split('\n')
+        suggestions = []
+        current_suggestion = ""
+        
+        for line in lines:
+            if line.strip() and (line[0].isdigit() and line[1:3] in ['. ', ') ']) or line.startswith('- '):
+                if current_suggestion:
+                    suggestions.append(current_suggestion.strip())
+                current_suggestion = line
+            else:
+                current_suggestion += ' ' + line
+        
+        if current_suggestion:
+            suggestions.append(current_suggestion.strip())
+        
+        # Dacă nu am reușit să separăm corect, folosim întregul text ca o sugestie
+        if not suggestions:
+            suggestions = [suggestions_text]
+        
+        # Limitare la numărul de sugestii cerut
+        return suggestions[:num_suggestions]
+    
+    @staticmethod
+    def _build_messages(context, language, meeting_type, user_role, num_suggestions):
+        """Construiește mesajele pentru chat completion."""
+        prompts = AISuggestionService.PROMPTS
+        
+        role_key = user_role if user_role in ['interviewee', 'interviewer', 'participant', 'host'] else 'participant'
+        meeting_key = meeting_type if meeting_type in ['interview', 'meeting'] else 'meeting'
+        
+        prompt = prompts.get(meeting_key, {}).get(role_key, prompts['meeting']['participant'])
+        
+        return [
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": f"Context conversație:\n{context}\n\n"
+                                     f"Generează {num_suggestions} posibile răspunsuri "
+                                     f"pentru a continua conversația în limba {language}. "
+                                     f"Răspunsurile trebuie să fie concise și naturale."}
+        ]
+    
+    @staticmethod
+    def _get_async_client():
+        """Returnează clientul async OpenAI pentru configurația curentă."""
+        api_key = settings.OPENAI_API_KEY
+        base_url = settings.OPENAI_BASE_URL or None
+        
+        key = (api_key, base_url)
+        client = AISuggestionService._async_clients.get(key)
+        if client is None:
+            client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url)
+            AISuggestionService._async_clients[key] = client
+        return client
 
 
 class SpeechProcessingService:
     """Serviciu pentru procesarea vorbirii (speech-to-text)."""
     
+    @staticmethod
+    def process_speech_chunk(audio_data, language='en-US'):
+        """
+        Procesează un fragment audio și îl convertește în text.
+        În implementarea reală, aici ar trebui să integrați un serviciu de Speech-to-Text
+        precum Google Speech-to-Text, Azure Speech, sau altele.
+        
+        Pentru exemplificare, vom returna un text static.
+        """
+        # În implementarea reală:
+        # 1. Trimiteți audio_data către un API de speech-to-text
+        # 2. Procesați răspunsul și returnați textul
+        
+        # Exemplu de implementare folosind Google Speech API (pseudocod)
+        """
+        try:
+            # Configurare client speech
+            client = speech.SpeechClient()
+            
+            # Configurare audio
+            audio = speech.RecognitionAudio(content=audio_data)
+            
+            # Configurare recunoaștere
+            config = speech.RecognitionConfig(
+                encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+                sample_rate_hertz=16000,
+                language_code=language,
+            )
+            
+            # Detectare speech
+            response = client.recognize(config=config, audio=audio)
+            
+            # Extragere text
+            text = ""
+            for result in response.results:
+                text += result.alternatives[0].transcript
+                
+            return text
+        except Exception as e:
+            logger.error(f"Eroare la procesarea audio: {str(e)}")
+            return ""
+        """
+        
+        # Pentru demonstrație, returnăm text static
+        return "Acesta este un text de exemplu, transformat din audio."
+
 
 class SessionManager:
     """
@@ -666,6 +1047,9 @@ class SessionManager:
         """
         Get all transcripts for a session, optionally in a specific language.
         
+        Delegates to meetings.services.session_manager, which also reads
+        archived meetings and routes the reads to replicas.
+        
         Args:
             session_id: ID of the session
             language: Language code to return transcripts in (optional)
@@ -676,59 +1060,7 @@ class SessionManager:
         Raises:
             Exception: If session doesn't exist
         """
-        try:
-            # Get session information
-            session = self.get_session(session_id)
-            meeting = session['meeting']
-            
-            # Get all transcripts
-            transcripts = Transcript.objects.filter(meeting=meeting).order_by('timestamp')
-            
-            result = []
-            
-            for transcript in transcripts:
-                item = {
-                    'id': transcript.id,
-                    'participant_id': transcript.participant.id,
-                    'participant_name': transcript.participant.name,
-                    'original_text': transcript.original_text,
-                    'original_language': transcript.source_language,
-                    'timestamp': transcript.timestamp.isoformat(),
-                    'translations': {}
-                }
-                
-                # Get translations
-                translations = Translation.objects.filter(transcript=transcript)
-                
-                for translation in translations:
-                    item['translations'][translation.target_language] = {
-                        'id': translation.id,
-                        'text': translation.translated_text,
-                        'timestamp': translation.timestamp.isoformat()
-                    }
-                
-                # If specific language is requested
-                if language:
-                    # If requested language is the original language
-                    if language == transcript.source_language:
-                        item['text'] = transcript.original_text
-                    # If requested language has a translation
-                    elif language in item['translations']:
-                        item['text'] = item['translations'][language]['text']
-                    # Otherwise use original text
-                    else:
-                        item['text'] = transcript.original_text
-                
-                result.append(item)
-            
-            return result
-            
-        except ObjectDoesNotExist:
-            logger.error(f"Meeting not found: session_id={session_id}")
-            raise Exception("Invalid session")
-        except Exception as e:
-            logger.error(f"Error getting session transcripts: {str(e)}")
-            raise
+        return meetings_session_manager.get_session_transcripts(session_id, language)
     
     def get_session_metrics(self, session_id: str) -> Dict:
         """
@@ -950,8 +1282,10 @@ class AIAssistantService:
         self.metrics = {
             'suggestions_generated': 0,
             'errors': 0,
-            'avg_response_time': [],
         }
+        
+        # Response times per meeting type and user role (fixed memory)
+        self.response_times = LabeledLatencyHistograms(('meeting_type', 'user_role'))
     
     def generate_suggestions(self, context: List[Dict], user_role: str, 
                            language: str, meeting_type: str = 'interview',
@@ -987,7 +1321,7 @@ class AIAssistantService:
             suggestions = self._mock_suggestions(user_role, meeting_type, language, formatted_context)
             
             execution_time = time.time() - start_time
-            self.metrics['avg_response_time'].append(execution_time)
+            self.response_times.record(execution_time, meeting_type, user_role)
             self.metrics['suggestions_generated'] += 1
             
             return suggestions[:num_suggestions]
@@ -1119,63 +1453,18 @@ class AIAssistantService:
         Returns:
             Dictionary with service metrics
         """
-        avg_time = 0
-        if self.metrics['avg_response_time']:
-            avg_time = sum(self.metrics['avg_response_time']) / len(self.metrics['avg_response_time'])
+        count, total_time = self.response_times.totals()
+        avg_time = total_time / count if count else 0
         
         return {
             'suggestions_generated': self.metrics['suggestions_generated'],
             'errors': self.metrics['errors'],
             'error_ratio': self.metrics['errors'] / max(1, self.metrics['suggestions_generated']),
-            'avg_response_time': round(avg_time, 3)
+            'avg_response_time': round(avg_time, 3),
+            # p50/p90/p99/max per "meeting_type/user_role" over the last window
+            'response_time': self.response_times.snapshot()
         }
 
 
 # Initialize a singleton instance
 ai_assistant_service = AIAssistantService()
-    
-    @staticmethod
-    def process_speech_chunk(audio_data, language='en-US'):
-        """
-        Procesează un fragment audio și îl convertește în text.
-        În implementarea reală, aici ar trebui să integrați un serviciu de Speech-to-Text
-        precum Google Speech-to-Text, Azure Speech, sau altele.
-        
-        Pentru exemplificare, vom returna un text static.
-        """
-        # În implementarea reală:
-        # 1. Trimiteți audio_data către un API de speech-to-text
-        # 2. Procesați răspunsul și returnați textul
-        
-        # Exemplu de implementare folosind Google Speech API (pseudocod)
-        """
-        try:
-            # Configurare client speech
-            client = speech.SpeechClient()
-            
-            # Configurare audio
-            audio = speech.RecognitionAudio(content=audio_data)
-            
-            # Configurare recunoaștere
-            config = speech.RecognitionConfig(
-                encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-                sample_rate_hertz=16000,
-                language_code=language,
-            )
-            
-            # Detectare speech
-            response = client.recognize(config=config, audio=audio)
-            
-            # Extragere text
-            text = ""
-            for result in response.results:
-                text += result.alternatives[0].transcript
-                
-            return text
-        except Exception as e:
-            logger.error(f"Eroare la procesarea audio: {str(e)}")
-            return ""
-        """
-        
-        # Pentru demonstrație, returnăm text static
-        return "Acesta este un text de exemplu, transformat din audio."
\ No newline at end of file
@@ -1,3 +1,209 @@
-from django.test import TestCase
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# Create your tests here.
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, override_settings
+
+from translate_api.glossary import AhoCorasick, GlossaryMatcher
+from translate_api.services import (AIAssistantService, AISuggestionService, LanguageDetectionService, SessionManager,
+                                    TranslationService)
+
+
+class StubCompletionHandler(BaseHTTPRequestHandler):
+    """Server OpenAI minimal care răspunde la chat completions cu un stream SSE."""
+
+    chunks = ["1. Puteți detalia", " experiența?\n", "2. Ce provocări", " ați avut?"]
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.server.requests.append(json.loads(self.rfile.read(length)))
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+
+        for text in self.chunks:
+            payload = {
+                'id': 'chatcmpl-stub',
+                'object': 'chat.completion.chunk',
+                'created': 0,
+                'model': 'stub',
+                'choices': [{'index': 0, 'delta': {'content': text}, 'finish_reason': None}],
+            }
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class AISuggestionStreamingTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubCompletionHandler)
+        cls.server.requests = []
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/v1"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def collect(self, **kwargs):
+        async def run():
+            return [delta async for delta in AISuggestionService.stream_suggestions(**kwargs)]
+
+        with override_settings(OPENAI_API_KEY='test', OPENAI_BASE_URL=self.base_url,
+                               OPENAI_SUGGESTIONS_MODEL='stub-model'):
+            return async_to_sync(run)()
+
+    def test_stream_yields_deltas_in_order(self):
+        deltas = self.collect(context="Candidat: Am lucrat cu Django.", language='ro',
+                              meeting_type='interview', user_role='interviewer')
+
+        self.assertEqual(deltas, StubCompletionHandler.chunks)
+
+        request = self.server.requests[-1]
+        self.assertTrue(request['stream'])
+        self.assertEqual(request['model'], 'stub-model')
+
+    def test_streamed_text_parses_into_suggestions(self):
+        deltas = self.collect(context="", language='en')
+
+        suggestions = AISuggestionService.parse_suggestions(''.join(deltas), 3)
+        self.assertEqual(suggestions, [
+            "1. Puteți detalia experiența?",
+            "2. Ce provocări ați avut?",
+        ])
+
+
+class LanguageDetectionTests(SimpleTestCase):
+
+    def test_canonical_codes(self):
+        self.assertEqual(LanguageDetectionService.canonical_language('en-US'), 'en')
+        self.assertEqual(LanguageDetectionService.canonical_language('ro_RO'), 'ro')
+        self.assertEqual(LanguageDetectionService.canonical_language('zh-tw'), 'zh-TW')
+        self.assertEqual(LanguageDetectionService.canonical_language('iw'), 'he')
+        self.assertIsNone(LanguageDetectionService.canonical_language(''))
+
+    def test_short_text_uses_hint(self):
+        self.assertEqual(LanguageDetectionService.detect_language("ok", hint='ro-RO'), 'ro')
+
+    def test_detection_is_cached_by_text(self):
+        text = "Bună ziua, vă mulțumesc că ați acceptat invitația la acest interviu."
+
+        with mock.patch.object(LanguageDetectionService, '_detect', return_value='ro') as detect:
+            self.assertEqual(LanguageDetectionService.detect_language(text, hint='en-US'), 'ro')
+            self.assertEqual(LanguageDetectionService.detect_language(f"  {text} ", hint='en-US'), 'ro')
+
+        detect.assert_called_once()
+
+    def test_same_language_skips_provider(self):
+        with mock.patch('translate_api.services.GoogleTranslator') as translator:
+            result = TranslationService.translate_text("Hello there", source_lang='en-US', target_lang='en')
+
+        self.assertEqual(result, "Hello there")
+        translator.assert_not_called()
+
+
+class GlossaryMatcherTests(SimpleTestCase):
+
+    def test_leftmost_longest_whole_words(self):
+        automaton = AhoCorasick(["Java", "JavaScript", "Script", "C++"])
+
+        matches = automaton.find("javascript, Java și C++, dar nu Javanese")
+
+        self.assertEqual([(start, end, automaton.lengths[index]) for start, end, index in matches],
+                         [(0, 10, 10), (12, 16, 4), (20, 23, 3)])
+
+    def test_protect_and_restore(self):
+        matcher = GlossaryMatcher({"Acme Cloud": "", "team lead": "lider de echipă"})
+
+        protected, replacements = matcher.protect("I was team lead at Acme Cloud.")
+        self.assertEqual(protected, "I was ⟦0⟧ at ⟦1⟧.")
+
+        restored = matcher.restore("Am fost ⟦ 0 ⟧ la ⟦1⟧.", replacements)
+        self.assertEqual(restored, "Am fost lider de echipă la Acme Cloud.")
+
+    def test_glossary_wraps_provider_call(self):
+        matcher = GlossaryMatcher({"Acme Cloud": ""})
+
+        with mock.patch('translate_api.services.GoogleTranslator') as translator:
+            translator.return_value.translate.side_effect = lambda text: text.replace("works at", "lucrează la")
+            result = TranslationService.translate_text("Ana works at Acme Cloud", source_lang='en',
+                                                       target_lang='ro', glossary=matcher)
+
+        translator.return_value.translate.assert_called_once_with("Ana works at ⟦0⟧")
+        self.assertEqual(result, "Ana lucrează la Acme Cloud")
+
+
+class TranslationChunkingTests(SimpleTestCase):
+
+    def test_placeholder_at_chunk_boundary_is_kept_whole(self):
+        text = "a" * 4996 + " ⟦12⟧ tail"  # the placeholder spans characters 4997-5000
+
+        chunks = TranslationService.split_text(text, 5000)
+
+        self.assertEqual(chunks, ["a" * 4996, "⟦12⟧ tail"])
+
+    def test_long_word_is_cut_before_placeholder(self):
+        text = "a" * 4998 + "⟦3⟧" + "b" * 10
+
+        chunks = TranslationService.split_text(text, 5000)
+
+        self.assertEqual(chunks, ["a" * 4998, "⟦3⟧" + "b" * 10])
+
+    def test_chunks_respect_limit_and_words(self):
+        text = " ".join(f"word{index} ⟦{index}⟧" for index in range(3000))
+
+        chunks = TranslationService.split_text(text, 5000)
+
+        self.assertTrue(all(len(chunk) <= 5000 for chunk in chunks))
+        self.assertEqual(" ".join(chunks), text)
+
+    def test_long_text_restores_every_placeholder(self):
+        matcher = GlossaryMatcher({"Acme Cloud": ""})
+        text = " ".join(["We migrated Acme Cloud last year."] * 400)
+
+        with mock.patch('translate_api.services.GoogleTranslator') as translator:
+            translator.return_value.translate.side_effect = lambda chunk: chunk
+            result = TranslationService.translate_text(text, source_lang='en', target_lang='ro', glossary=matcher)
+
+        self.assertGreater(translator.return_value.translate.call_count, 1)
+        self.assertEqual(result, text)
+
+
+class SessionManagerTests(SimpleTestCase):
+    def test_transcripts_come_from_meetings_session_manager(self):
+        with mock.patch('translate_api.services.meetings_session_manager') as meetings_session_manager:
+            meetings_session_manager.get_session_transcripts.return_value = [{'id': 1}]
+
+            transcripts = SessionManager().get_session_transcripts('7', 'ro')
+
+        # Archived meetings and replica reads are handled there
+        self.assertEqual(transcripts, [{'id': 1}])
+        meetings_session_manager.get_session_transcripts.assert_called_once_with('7', 'ro')
+
+
+class AIAssistantServiceTests(SimpleTestCase):
+    def test_response_times_are_kept_in_histograms(self):
+        service = AIAssistantService()
+        context = [{'participant_name': "Ana", 'text': "Tell me about the project."}]
+        for _ in range(3):
+            service.generate_suggestions(context, 'interviewer', 'en')
+
+        metrics = service.get_metrics()
+
+        self.assertEqual(metrics['suggestions_generated'], 3)
+        self.assertEqual(metrics['response_time']['interview/interviewer']['count'], 3)
+        self.assertEqual(service.response_times.totals()[0], 3)
@@ -0,0 +1,4 @@
+# Aplicația Celery este încărcată odată cu Django, astfel încât @shared_task o folosește
+from .celery import app as celery_app
+
+__all__ = ('celery_app',)
@@ -0,0 +1,24 @@
+"""
+Celery application for translate_interview_platform.
+
+Workers are started with:
+
+    celery -A translate_interview_platform worker -Q speech.0,speech.1 -c 1
+
+Speech tasks are routed to one queue per meeting shard (see
+meetings.tasks.route_by_meeting); each speech queue must be consumed by a
+single worker process with concurrency 1 so chunks of a meeting are
+processed in order.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'translate_interview_platform.settings')
+
+app = Celery('translate_interview_platform')
+
+# Toate setările CELERY_* din settings.py
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -0,0 +1,293 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = 'default'
+
+# Set by replica_reads(): the ORM reads of the block may be served by a replica
+_replica_reads = ContextVar('replica_reads', default=False)
+
+# User on whose behalf the current code runs: a user id, or the HttpRequest
+# (its user is only known after DRF authentication, so it is resolved lazily)
+_current_user = ContextVar('db_current_user', default=None)
+_resolving_user = ContextVar('db_resolving_user', default=False)
+
+# Seconds of replication delay on a replica (0 when it has replayed everything it received)
+REPLICA_LAG_SQL = (
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+@contextmanager
+def replica_reads():
+    """
+    Allow the reads of a block (or of a decorated function) to go to a replica.
+
+    Only for read-only code that tolerates data a few seconds old; writes and
+    reads inside a transaction always use the primary.
+    """
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def set_current_user(user):
+    """
+    Record the user the current request, consumer or task acts for.
+
+    Args:
+        user: User id, or an HttpRequest whose user is resolved when needed
+
+    Returns:
+        Token for reset_current_user
+    """
+    return _current_user.set(user)
+
+
+def reset_current_user(token) -> None:
+    _current_user.reset(token)
+
+
+@contextmanager
+def acting_user(user):
+    """Run a block on behalf of user (see set_current_user)."""
+    token = set_current_user(user)
+    try:
+        yield
+    finally:
+        reset_current_user(token)
+
+
+def current_user_id():
+    user = _current_user.get()
+    if user is None or isinstance(user, (int, str)):
+        return user
+    # Loading request.user runs queries, which are routed again
+    if _resolving_user.get():
+        return None
+    token = _resolving_user.set(True)
+    try:
+        request_user = getattr(user, 'user', None)
+        if request_user is None or not request_user.is_authenticated:
+            return None
+        return request_user.pk
+    finally:
+        _resolving_user.reset(token)
+
+
+class ReplicaMonitor:
+    """
+    Picks a replica for reads and keeps the read-your-writes marks of users.
+
+    Replication lag is measured on the replica itself and cached for
+    check_seconds, so routing a read costs no extra query most of the time.
+    A replica that lags more than max_lag_seconds, or cannot be reached, is
+    skipped until the next check; with no usable replica reads go to the
+    primary.
+
+    After a user writes, their reads stay on the primary for
+    read_your_writes_seconds. The mark lives in the Django cache, so it is
+    shared between processes when the cache is (CACHE_REDIS_URL).
+    """
+
+    def __init__(self, replicas: Optional[List[str]] = None, max_lag_seconds: Optional[float] = None,
+                 check_seconds: Optional[float] = None, read_your_writes_seconds: Optional[float] = None):
+        self._replicas = replicas
+        self.max_lag_seconds = max_lag_seconds if max_lag_seconds is not None else getattr(
+            settings, 'DB_REPLICA_MAX_LAG_SECONDS', 2.0)
+        self.check_seconds = check_seconds if check_seconds is not None else getattr(
+            settings, 'DB_REPLICA_LAG_CHECK_SECONDS', 5.0)
+        self.read_your_writes_seconds = read_your_writes_seconds if read_your_writes_seconds is not None else getattr(
+            settings, 'DB_READ_YOUR_WRITES_SECONDS', 5.0)
+
+        self.lag: Dict[str, float] = {}  # alias -> last measured lag (inf if unreachable)
+        self.checked_at: Dict[str, float] = {}  # alias -> monotonic time of the last check
+        self.marked_at: Dict[object, float] = {}  # user id -> monotonic time the cache mark was refreshed
+        self.next_replica = 0
+        self.lock = threading.Lock()
+
+        # Metrics for monitoring
+        self.metrics = {
+            'replica_reads': 0,
+            'primary_reads_pinned': 0,
+            'primary_reads_lagging': 0,
+            'lag_checks': 0,
+            'lag_check_errors': 0,
+        }
+
+    @property
+    def replicas(self) -> List[str]:
+        if self._replicas is None:
+            return [alias for alias in settings.DATABASES if alias.startswith('replica_')]
+        return self._replicas
+
+    def note_write(self, user_id) -> None:
+        """
+        Keep the reads of a user on the primary after one of their writes.
+
+        The cache mark expires 1.5 windows after it is set and is refreshed at
+        most every half window, so the last write is always covered for a full
+        window without a cache round trip on every insert.
+
+        Args:
+            user_id: ID of the writing user
+        """
+        if user_id is None or not self.read_your_writes_seconds:
+            return
+        now = time.monotonic()
+        with self.lock:
+            if now - self.marked_at.get(user_id, float('-inf')) < self.read_your_writes_seconds / 2:
+                return
+            self.marked_at[user_id] = now
+        try:
+            cache.set(self._mark_key(user_id), 1, timeout=self.read_your_writes_seconds * 1.5)
+        except Exception as e:
+            logger.warning(f"Could not record the write of user {user_id}: {str(e)}")
+
+    def is_pinned(self, user_id) -> bool:
+        """Whether the user wrote recently and must read from the primary."""
+        if user_id is None or not self.read_your_writes_seconds:
+            return False
+        try:
+            return cache.get(self._mark_key(user_id)) is not None
+        except Exception:
+            return True
+
+    def choose(self, user_id=None) -> str:
+        """
+        Pick the database for a read that may use a replica.
+
+        Args:
+            user_id: ID of the reading user
+
+        Returns:
+            Alias of a replica in sync, or the primary
+        """
+        replicas = self.replicas
+        if not replicas:
+            return PRIMARY
+
+        if self.is_pinned(user_id):
+            with self.lock:
+                self.metrics['primary_reads_pinned'] += 1
+            return PRIMARY
+
+        with self.lock:
+            start = self.next_replica
+            self.next_replica += 1
+        for offset in range(len(replicas)):
+            alias = replicas[(start + offset) % len(replicas)]
+            if self.replica_lag(alias) <= self.max_lag_seconds:
+                with self.lock:
+                    self.metrics['replica_reads'] += 1
+                return alias
+
+        with self.lock:
+            self.metrics['primary_reads_lagging'] += 1
+        return PRIMARY
+
+    def replica_lag(self, alias: str) -> float:
+        """
+        Replication lag of a replica in seconds (measured at most every check_seconds).
+
+        Returns:
+            Lag in seconds, inf if the replica cannot be reached
+        """
+        now = time.monotonic()
+        with self.lock:
+            if now - self.checked_at.get(alias, float('-inf')) < self.check_seconds:
+                return self.lag[alias]
+            # Other threads keep using the previous value while this one measures
+            self.checked_at[alias] = now
+            self.lag.setdefault(alias, float('inf'))
+            self.metrics['lag_checks'] += 1
+
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(REPLICA_LAG_SQL)
+                lag = float(cursor.fetchone()[0])
+        except Exception as e:
+            lag = float('inf')
+            with self.lock:
+                self.metrics['lag_check_errors'] += 1
+            logger.warning(f"Replica {alias} unavailable, reading from the primary: {str(e)}")
+
+        with self.lock:
+            self.lag[alias] = lag
+        return lag
+
+    def get_metrics(self) -> Dict:
+        """
+        Get replica routing metrics.
+
+        Returns:
+            Dictionary with replica routing metrics
+        """
+        with self.lock:
+            return dict(self.metrics, replica_lag=dict(self.lag))
+
+    def _mark_key(self, user_id) -> str:
+        return f"db_router:wrote:{user_id}"
+
+
+class ReplicaRouter:
+    """
+    Database router sending the reads of replica_reads() blocks to replicas.
+
+    Everything else (writes, reads outside those blocks, reads inside a
+    transaction on the primary, migrations) uses the primary. Writes mark
+    the current user for read-your-writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        return replica_monitor.choose(current_user_id())
+
+    def db_for_write(self, model, **hints):
+        replica_monitor.note_write(current_user_id())
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+class ReplicaReadMiddleware:
+    """
+    Serves the GET requests of the read-only dashboard endpoints from replicas.
+
+    Paths are listed in DB_REPLICA_READ_PATHS (prefixes). The request is also
+    recorded as the current user, so its writes pin the user to the primary.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.paths = tuple(getattr(settings, 'DB_REPLICA_READ_PATHS', ()))
+
+    def __call__(self, request):
+        with acting_user(request):
+            if request.method in ('GET', 'HEAD') and request.path.startswith(self.paths):
+                with replica_reads():
+                    return self.get_response(request)
+            return self.get_response(request)
+
+
+# Initialize a singleton instance
+replica_monitor = ReplicaMonitor()
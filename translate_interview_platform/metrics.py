@@ -0,0 +1,24 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponseForbidden
+from django_prometheus.exports import ExportToDjangoView
+
+
+def metrics_view(request):
+    """
+    Prometheus metrics, for the scraper or for staff users.
+
+    The scraper sends "Authorization: Bearer <METRICS_TOKEN>"; without a
+    configured token only authenticated staff users can read the endpoint.
+    """
+    token = settings.METRICS_TOKEN
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    if token and hmac.compare_digest(header.encode('utf-8'), f"Bearer {token}".encode('utf-8')):
+        return ExportToDjangoView(request)
+
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and user.is_staff:
+        return ExportToDjangoView(request)
+
+    return HttpResponseForbidden("Metrics require a token")
@@ -27,6 +27,7 @@ INSTALLED_APPS = [
     'rest_framework.authtoken',
     'corsheaders',
     'channels',
+    'django_prometheus',
     
     # Aplicații proprii
     'accounts',
@@ -36,14 +37,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'django_prometheus.middleware.PrometheusBeforeMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Citirile endpoint-urilor de dashboard pe replici + read-your-writes (vezi db_routers)
+    'translate_interview_platform.db_routers.ReplicaReadMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'django_prometheus.middleware.PrometheusAfterMiddleware',
 ]
 
 ROOT_URLCONF = 'translate_interview_platform.urls'
@@ -66,9 +71,12 @@ TEMPLATES = [
 
 # Configurare Channels pentru WebSockets
 ASGI_APPLICATION = 'translate_interview_platform.asgi.application'
+# Opțional: CHANNEL_LAYER_BACKEND=meetings.channel_layers.HybridChannelLayer livrează în proces
+# membrilor locali ai grupului și trece prin Redis doar pentru celelalte noduri; toate nodurile
+# trebuie să folosească același backend
 CHANNEL_LAYERS = {
     'default': {
-        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'BACKEND': os.getenv('CHANNEL_LAYER_BACKEND', 'channels_redis.core.RedisChannelLayer'),
         'CONFIG': {
             "hosts": [(os.getenv('REDIS_HOST', 'localhost'), 
                        int(os.getenv('REDIS_PORT', 6379)))],
@@ -76,6 +84,29 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Sharding pe mai multe instanțe Redis (consistent hashing; un meeting rămâne pe un singur shard):
+# REDIS_SHARD_HOSTS=redis1:6379,redis2:6379. La adăugarea unui host, lista veche se pune în
+# REDIS_PREVIOUS_SHARD_HOSTS, iar meeting-urile în desfășurare rămân pe shard-ul vechi până se termină
+def _redis_hosts(value):
+    hosts = []
+    for entry in value.split(','):
+        if entry.strip():
+            host, _, port = entry.strip().partition(':')
+            hosts.append((host, int(port or 6379)))
+    return hosts
+
+REDIS_SHARD_HOSTS = _redis_hosts(os.getenv('REDIS_SHARD_HOSTS', ''))
+REDIS_PREVIOUS_SHARD_HOSTS = _redis_hosts(os.getenv('REDIS_PREVIOUS_SHARD_HOSTS', ''))
+
+if REDIS_SHARD_HOSTS:
+    CHANNEL_LAYERS['default'] = {
+        'BACKEND': 'meetings.channel_layers.ShardedChannelLayer',
+        'CONFIG': {
+            'hosts': REDIS_SHARD_HOSTS,
+            'previous_hosts': REDIS_PREVIOUS_SHARD_HOSTS,
+        },
+    }
+
 WSGI_APPLICATION = 'translate_interview_platform.wsgi.application'
 
 # Configurare bază de date
@@ -88,6 +119,7 @@ DATABASES = {
         'HOST': os.environ.get('DB_HOST', 'localhost'),
         'PORT': os.environ.get('DB_PORT', '5432'),
         'CONN_MAX_AGE': 600,  # Păstrează conexiunea deschisă 10 minute
+        'CONN_HEALTH_CHECKS': True,  # Conexiunile refolosite sunt verificate înainte de prima interogare
         'OPTIONS': {
             'connect_timeout': 10,
         }
@@ -115,8 +147,125 @@ CORS_ALLOWED_ORIGINS = os.getenv('CORS_ALLOWED_ORIGINS',
 
 # Chei API servicii externe
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL', '')  # Gol = endpoint-ul implicit OpenAI
+OPENAI_SUGGESTIONS_MODEL = os.getenv('OPENAI_SUGGESTIONS_MODEL', 'gpt-4')
 GOOGLE_TRANSLATE_API_KEY = os.getenv('GOOGLE_TRANSLATE_API_KEY', '')
 
+# Replici de citire (Postgres streaming replication): DB_REPLICA_HOSTS=replica1:5432,replica2:5432.
+# Doar citirile marcate cu replica_reads() (transcrieri, metrici, dashboard) ajung pe replici
+_replica_hosts = [entry.strip() for entry in os.getenv('DB_REPLICA_HOSTS', '').split(',') if entry.strip()]
+for _index, _entry in enumerate(_replica_hosts, start=1):
+    _host, _, _port = _entry.partition(':')
+    DATABASES[f'replica_{_index}'] = dict(DATABASES['default'], HOST=_host, PORT=_port or '5432',
+                                          TEST={'MIRROR': 'default'})
+
+DATABASE_ROUTERS = ['translate_interview_platform.db_routers.ReplicaRouter']
+
+# Thread-uri dedicate pentru interogările consumer-elor (meetings.db_executor); fiecare thread ține o
+# conexiune deschisă, deci valoarea = conexiuni per proces (x procese <= max_connections / pool-ul PgBouncer)
+DB_EXECUTOR_WORKERS = int(os.getenv('DB_EXECUTOR_WORKERS', 10))
+
+# Replica este folosită doar dacă întârzierea ei este sub DB_REPLICA_MAX_LAG_SECONDS (verificată la
+# DB_REPLICA_LAG_CHECK_SECONDS); după o scriere, citirile utilizatorului rămân pe primary
+# DB_READ_YOUR_WRITES_SECONDS secunde (0 = dezactivat)
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv('DB_REPLICA_MAX_LAG_SECONDS', 2))
+DB_REPLICA_LAG_CHECK_SECONDS = float(os.getenv('DB_REPLICA_LAG_CHECK_SECONDS', 5))
+DB_READ_YOUR_WRITES_SECONDS = float(os.getenv('DB_READ_YOUR_WRITES_SECONDS', 5))
+# Endpoint-uri GET servite de pe replici (prefixe)
+DB_REPLICA_READ_PATHS = os.getenv('DB_REPLICA_READ_PATHS', '/api/meetings/,/api/usage-statistics/').split(',')
+
+# Cache partajat între procese (marcaje read-your-writes, contextul conversațiilor, sugestii, aliniere fragmente);
+# fără el se folosește cache-ul local al procesului
+if os.getenv('CACHE_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('CACHE_REDIS_URL'),
+        }
+    }
+
+# Rezumatul întâlnirii, construit în fundal câte o fereastră de transcrieri ('openai' sau 'local' = extractiv, fără API)
+MEETING_SUMMARY_BACKEND = os.getenv('MEETING_SUMMARY_BACKEND', 'openai' if OPENAI_API_KEY else 'local')
+MEETING_SUMMARY_MODEL = os.getenv('MEETING_SUMMARY_MODEL', 'gpt-4')
+MEETING_SUMMARY_WINDOW_TOKENS = int(os.getenv('MEETING_SUMMARY_WINDOW_TOKENS', 1500))
+MEETING_SUMMARY_TOKEN_BUDGET = int(os.getenv('MEETING_SUMMARY_TOKEN_BUDGET', 400))
+MEETING_SUMMARY_WORKERS = int(os.getenv('MEETING_SUMMARY_WORKERS', 2))
+
+# Cache pentru sugestiile AI (cheie = hash al ultimelor replici + rol, tip meeting, limbă)
+SUGGESTION_CACHE_TTL_SECONDS = int(os.getenv('SUGGESTION_CACHE_TTL_SECONDS', 300))
+SUGGESTION_CACHE_CONTEXT_LINES = int(os.getenv('SUGGESTION_CACHE_CONTEXT_LINES', 5))
+
+# Glosare (automat Aho-Corasick per meeting/vorbitor); versiunea din baza de date este verificată cel mult o dată la N secunde
+GLOSSARY_CACHE_CHECK_SECONDS = float(os.getenv('GLOSSARY_CACHE_CHECK_SECONDS', 5))
+
+# Debounce pentru cererile de sugestii (ultima cerere câștigă) și limită per meeting
+SUGGESTION_DEBOUNCE_SECONDS = float(os.getenv('SUGGESTION_DEBOUNCE_SECONDS', 0.3))
+SUGGESTION_MAX_CONCURRENT_PER_MEETING = int(os.getenv('SUGGESTION_MAX_CONCURRENT_PER_MEETING', 2))
+
+# Fereastra de context menținută pe server pentru sugestii (tokeni estimați)
+SUGGESTION_CONTEXT_TOKEN_BUDGET = int(os.getenv('SUGGESTION_CONTEXT_TOKEN_BUDGET', 800))
+SUGGESTION_SUMMARY_TOKEN_BUDGET = int(os.getenv('SUGGESTION_SUMMARY_TOKEN_BUDGET', 200))
+# Contextul unui meeting fără replici noi expiră din cache după acest interval (secunde)
+SUGGESTION_CONTEXT_IDLE_SECONDS = int(os.getenv('SUGGESTION_CONTEXT_IDLE_SECONDS', 3600))
+
+# Tracing per mesaj (trace ID propagat prin channel layer); exportatorul este configurabil
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'False') == 'True'
+TRACING_EXPORTER = os.getenv('TRACING_EXPORTER', 'meetings.tracing.JSONLSpanExporter')
+TRACING_JSONL_PATH = os.getenv('TRACING_JSONL_PATH', os.path.join(BASE_DIR, 'traces.jsonl'))
+
+# Token pentru /metrics (Prometheus trimite "Authorization: Bearer <token>"); fără token doar staff-ul are acces
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Arhivă pentru transcrierile meeting-urilor încheiate (segmente JSONL comprimate, citite prin mmap)
+# Directorul trebuie să fie un volum partajat, montat pe toate host-urile care servesc transcrieri
+TRANSCRIPT_ARCHIVE_DIR = os.getenv('TRANSCRIPT_ARCHIVE_DIR', os.path.join(BASE_DIR, 'archive'))
+TRANSCRIPT_ARCHIVE_AFTER_DAYS = int(os.getenv('TRANSCRIPT_ARCHIVE_AFTER_DAYS', 30))
+TRANSCRIPT_ARCHIVE_SEGMENT_MB = int(os.getenv('TRANSCRIPT_ARCHIVE_SEGMENT_MB', 256))
+
+# Partiții lunare (Postgres) pentru Transcript/Translation: câte luni se creează în avans și câte se păstrează
+# (0 = nu se șterge nimic); partițiile cu meeting-uri nearhivate nu sunt șterse
+TRANSCRIPT_PARTITION_MONTHS_AHEAD = int(os.getenv('TRANSCRIPT_PARTITION_MONTHS_AHEAD', 3))
+TRANSCRIPT_PARTITION_RETENTION_MONTHS = int(os.getenv('TRANSCRIPT_PARTITION_RETENTION_MONTHS', 0))
+
+# Coadă de intrare limitată per conexiune; politica la suprasarcină: merge, drop_oldest sau slow_down
+INGRESS_QUEUE_SIZE = int(os.getenv('INGRESS_QUEUE_SIZE', 8))
+INGRESS_OVERLOAD_POLICY = os.getenv('INGRESS_OVERLOAD_POLICY', 'merge')
+INGRESS_SLOW_DOWN_MS = int(os.getenv('INGRESS_SLOW_DOWN_MS', 2000))
+
+# Batching opțional: evenimentele de grup sunt trimise clientului într-un singur frame (array) per tick
+OUTBOUND_BATCHING_ENABLED = os.getenv('OUTBOUND_BATCHING_ENABLED', 'False') == 'True'
+OUTBOUND_BATCH_TICK_MS = int(os.getenv('OUTBOUND_BATCH_TICK_MS', 50))
+
+# Procesarea speech: 'inline' (în procesul ASGI) sau 'celery' (STT, traducere și salvare în workeri)
+SPEECH_PROCESSING_MODE = os.getenv('SPEECH_PROCESSING_MODE', 'inline')
+
+# Fragmentele transcrise se unesc până la finalul propoziției (sau o pauză), apoi sunt traduse și salvate o dată;
+# în modul celery propoziția deschisă este păstrată în cache (CACHE_REDIS_URL partajat de workeri)
+SPEECH_SEGMENTATION_ENABLED = os.getenv('SPEECH_SEGMENTATION_ENABLED', 'True') == 'True'
+SPEECH_UTTERANCE_PAUSE_MS = int(os.getenv('SPEECH_UTTERANCE_PAUSE_MS', 1200))
+SPEECH_UTTERANCE_MAX_CHARS = int(os.getenv('SPEECH_UTTERANCE_MAX_CHARS', 400))
+
+# Cuvintele repetate la granița dintre fragmente (ferestre suprapuse) sunt eliminate de la acest număr în sus
+SPEECH_OVERLAP_MIN_TOKENS = int(os.getenv('SPEECH_OVERLAP_MIN_TOKENS', 2))
+# După atâtea ms fără text (sau la finalul unei propoziții) fragmentul nou nu mai este comparat cu cel anterior
+SPEECH_OVERLAP_RESET_MS = int(os.getenv('SPEECH_OVERLAP_RESET_MS', 5000))
+
+# Configurare Celery; fiecare meeting este rutat mereu în aceeași coadă speech.N,
+# iar fiecare coadă trebuie consumată de un singur worker cu concurrency 1 (ordinea fragmentelor)
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://{}:{}/1'.format(
+    os.getenv('REDIS_HOST', 'localhost'), os.getenv('REDIS_PORT', 6379)))
+CELERY_TASK_ROUTES = ('meetings.tasks.route_by_meeting',)
+CELERY_SPEECH_QUEUES = int(os.getenv('CELERY_SPEECH_QUEUES', 4))
+CELERY_TASK_IGNORE_RESULT = True  # Rezultatele ajung la clienți prin channel layer
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_ACCEPT_CONTENT = ['json']
+
+# Pentru teste: CELERY_TASK_ALWAYS_EAGER=True și CELERY_BROKER_URL=memory://
+CELERY_TASK_ALWAYS_EAGER = os.getenv('CELERY_TASK_ALWAYS_EAGER', 'False') == 'True'
+CELERY_TASK_EAGER_PROPAGATES = CELERY_TASK_ALWAYS_EAGER
+
 # Configurări pentru serviciul de email
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
@@ -17,6 +17,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 
+from translate_interview_platform.metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    # Prometheus metrics (/metrics), protected by METRICS_TOKEN
+    path('metrics', metrics_view, name='prometheus-django-metrics'),
 ]